@@ -0,0 +1,39 @@
+"""Time typechecking a program dominated by `cond` and `select` forms.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.dispatch [count]
+
+Each form of the program is a `cond` or a `select` whose branches are themselves mostly `cond`s and
+`select`s, so the time is dominated by dispatching on the types of those forms.
+"""
+
+import sys
+import timeit
+
+from lispyc.parser import parse
+from lispyc.typechecker import TypeChecker
+
+
+def generate_program(count: int) -> str:
+    """Return a program with `count` top-level forms which alternate between `cond` and `select`."""
+    cond = "(cond ((cond (true false) (false true) true) 1) ((select 1 (2 true) false) 2) 3)"
+    select = f"(select (select 1 (2 3) 4) ({cond} {cond}) (5 (select 6 (7 8) 9)) 10)"
+
+    return " ".join(cond if i % 2 == 0 else select for i in range(count))
+
+
+def main() -> None:
+    """Time typechecking the program and print the best of several runs."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    program = parse(generate_program(count))
+
+    seconds = min(
+        timeit.repeat(lambda: list(TypeChecker.check_program(program)), number=1, repeat=20)
+    )
+
+    print(f"{count} forms: {seconds:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Time compiling and running a program with constant conditions, with and without optimising it.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.folding [branches]
+
+The program loops, and the body of its loop is a `cond` with `branches` branches whose predicates
+are arithmetic on constants, as generated code often has. All but the last are false, and the
+values of the false branches are large forms. `lispyc.optimiser.optimise` folds the predicates and
+removes the dead branches, so there's less code to generate, and the loop does less each time.
+"""
+
+import sys
+import timeit
+
+from lispyc.codegen import compile_program, execute
+from lispyc.optimiser import optimise
+from lispyc.parser import parse
+
+ITERATIONS = 100_000
+
+
+def generate_program(branches: int) -> str:
+    """Return a program whose loop has a `cond` of `branches` branches with constant predicates."""
+    dead_value = "(list " + " ".join(f"(sum n (prod {i} (expt 2 8)))" for i in range(20)) + ")"
+    dead = " ".join(
+        f"((greaterp (prod {i} 2) (sum {i} {i} 1)) {dead_value})" for i in range(branches)
+    )
+    live = "((lessp (div 10 3) (expt 2 2)) (list (sum n (prod 3 (expt 2 8)))))"
+
+    return f"""
+    (let ((loop nil))
+      (set loop
+        (lambda ((n int) (acc int))
+          (cond
+            ((lessp n 1) acc)
+            (loop (dec n) (sum acc (car (cond {dead} {live} (list 0))))))))
+      (progn 0 (neg 1) (loop {ITERATIONS} 0)))
+    """
+
+
+def main() -> None:
+    """Time compiling and running the program, optimised and not, and print the best of 5 runs."""
+    branches = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    program = parse(generate_program(branches))
+    optimised = optimise(program)
+
+    print(f"{optimised.removed} of the program's nodes were removed.")
+
+    for name, form in (("unoptimised", program), ("optimised", optimised.program)):
+        compile_time = min(timeit.repeat(lambda: compile_program(form), number=1, repeat=5))
+        code = compile_program(form)
+        run_time = min(timeit.repeat(lambda: execute(code), number=1, repeat=5))
+
+        print(f"{name:<12} compile: {compile_time:.4f} s; run: {run_time:.4f} s")
+
+    optimise_time = min(timeit.repeat(lambda: optimise(program), number=1, repeat=5))
+    print(f"optimise:    {optimise_time:.4f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Time typechecking a large program again after small edits, fully and incrementally.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.incremental [lines]
+
+The program has `lines` lines, each a top-level form. Each edit changes a number in one form,
+at random, as typing would.
+"""
+
+import random
+import sys
+import time
+
+from lispyc.incremental import IncrementalChecker
+from lispyc.parser import parse
+from lispyc.typechecker import TypeChecker
+
+FORMS = (
+    "(let ((f (lambda ((x int) (y (list float))) (cons 1.0 y)))) (f 1 (list 2.0 3.0)))",
+    "(lambda ((g (func (int bool) (list int))) (b bool)) (g 1 b))",
+    "(cond ((car (list true false)) (list (list 1) nil)) (cdr (list (list 2))))",
+)
+
+EDITS = 5
+
+
+def main() -> None:
+    """Time checking the program after each edit and print the average times."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    random.seed(1)
+    lines = [FORMS[i % len(FORMS)] for i in range(count)]
+
+    checker = IncrementalChecker()
+    checker.check("\n".join(lines))
+
+    full = incremental = 0.0
+    for _ in range(EDITS):
+        line = random.randrange(count)
+        lines[line] = lines[line].replace("1", str(random.randint(2, 9)), 1)
+        source = "\n".join(lines)
+
+        start = time.perf_counter()
+        list(TypeChecker.check_program(parse(source)))
+        full += time.perf_counter() - start
+
+        start = time.perf_counter()
+        checker.check(source)
+        incremental += time.perf_counter() - start
+
+    print(f"{count} lines, full: {full / EDITS * 1000:.1f} ms per edit")
+    print(f"{count} lines, incremental: {incremental / EDITS * 1000:.1f} ms per edit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Time a loop which calls small helper lambdas, with and without inlining them.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.inlining [iterations]
+
+The helpers are bound by a `let` and only called directly, as in the README's example, so
+`lispyc.optimiser.LambdaInliner` replaces each call with the helper's body. The loop
+itself is tail recursive, so it runs as a Python loop either way, and the difference is the
+overhead of calling the helpers.
+"""
+
+import sys
+import timeit
+
+from lispyc.codegen import compile_program, execute
+from lispyc.optimiser import LambdaInliner
+from lispyc.parser import parse
+
+PROGRAM = """
+(let ((square (lambda ((x int)) (prod x x)))
+      (clamp (lambda ((x int) (limit int)) (min x limit)))
+      (step (lambda ((acc int) (x int)) (sum acc (mod x 7))))
+      (loop nil))
+  (set loop
+    (lambda ((i int) (acc int))
+      (cond
+        ((lessp i 1) acc)
+        (loop (dec i) (step acc (clamp (square i) 1000))))))
+  loop)
+"""
+
+
+def main() -> None:
+    """Time the loop compiled with and without inlining, and print the best of 5 runs."""
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    program = parse(PROGRAM)
+
+    for name, form in (
+        ("called", program),
+        ("inlined", LambdaInliner.transform_program(program).program),
+    ):
+        [loop] = execute(compile_program(form))
+        seconds = min(timeit.repeat(lambda: loop(iterations, 0), number=1, repeat=5))
+
+        print(f"{name:<8} {iterations} iterations: {seconds:.4f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Measure the memory used by long lists stored in tuples and in arrays.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.list_memory [length]
+
+Lists of ints, floats, and bools are built as compiled code builds them: in a tuple of boxed
+Python objects, or in an array, as list literals whose types are known are. The memory allocated
+to build each list, and the time to walk it with `cdr`, are printed.
+"""
+
+import sys
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+from lispyc.codegen.runtime import NIL, LispyList, make_array_list, make_list
+
+# Functions which return the elements of a list of the given length, and the array typecode of
+# each kind of list.
+ELEMENTS: dict[str, tuple[Callable[[int], list[Any]], str]] = {
+    "int": (lambda length: list(range(1000, 1000 + length)), "q"),
+    "float": (lambda length: [i + 0.5 for i in range(length)], "d"),
+    "bool": (lambda length: [i % 3 == 0 for i in range(length)], "b"),
+}
+
+
+def measure(build: Callable[[], LispyList]) -> tuple[LispyList, int]:
+    """Return the list which `build` returns and the number of bytes allocated to build it."""
+    tracemalloc.start()
+    try:
+        list_ = build()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return list_, size
+
+
+def walk(list_: LispyList) -> None:
+    """Follow the cdrs of `list_` until it's nil, reading each car."""
+    while list_ is not NIL:
+        list_.car  # type: ignore[attr-defined]
+        list_ = list_.cdr  # type: ignore[attr-defined]
+
+
+def main() -> None:
+    """Build each kind of list both ways and print the memory allocated and the time to walk it."""
+    length = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    for name, (create, typecode) in ELEMENTS.items():
+        for storage, build in (
+            ("tuple", lambda: make_list(*create(length))),
+            ("array", lambda: make_array_list(typecode, *create(length))),
+        ):
+            list_, size = measure(build)
+            seconds = min(timeit.repeat(lambda: walk(list_), number=1, repeat=5))
+
+            print(
+                f"{name:<5} {storage}: {size / length:5.1f} bytes per element, walk {seconds:.3f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Time running compiled programs which build long lists and recurse through them.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.lists [length]
+
+One list is built with `cons`, which makes a chain of cons cells. Reversing it makes a view of a
+tuple, as built-in functions and list literals make. Each list is summed by a function which
+recurses through it with `car` and `cdr`, which are O(1) for both representations.
+"""
+
+import sys
+import timeit
+
+from lispyc.codegen import compile_program, execute
+from lispyc.parser import parse
+
+PROGRAM = """
+(let ((build nil) (total nil))
+  (set build
+    (lambda ((n int) (acc (list int)))
+      (cond ((eq n 0) acc) (build (dec n) (cons n acc)))))
+  (set total
+    (lambda ((l (list int)) (acc int))
+      (cond ((null l) acc) (total (cdr l) (sum acc (car l))))))
+  (let ((cells (build {length} nil)) (view (reverse (build {length} nil))))
+    (list
+      (lambda () (build {length} nil))
+      (lambda () (total cells 0))
+      (lambda () (total view 0)))))
+"""
+
+
+def main() -> None:
+    """Time building and summing the lists and print the best of several runs."""
+    length = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    [functions] = execute(compile_program(parse(PROGRAM.format(length=length))))
+
+    for name, function in zip(("build with cons", "sum cons cells", "sum view"), functions):
+        seconds = min(timeit.repeat(function, number=1, repeat=5))
+        print(f"{name}, length {length}: {seconds:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
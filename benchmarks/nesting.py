@@ -0,0 +1,55 @@
+"""Time parsing and typechecking of deeply nested and of wide programs.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.nesting [depth] [width]
+"""
+
+import sys
+import time
+
+from lispyc import sexpression
+from lispyc.parser import parse_program
+from lispyc.typechecker import TypeChecker
+
+
+def generate_deep_program(depth: int) -> str:
+    """Return a chain of `depth` nested `cons` forms."""
+    return "(cons 1 " * depth + "nil" + ")" * depth
+
+
+def generate_wide_program(width: int) -> str:
+    """Return a `list` of `width` shallow forms."""
+    elements = " ".join(
+        f"(car (cons {i} (cdr (list (progn true {i}) ((lambda ((x int)) x) {i})))))"
+        for i in range(width)
+    )
+    return f"(list {elements})"
+
+
+def time_program(name: str, program: str) -> None:
+    """Time parsing and typechecking `program` and print the results."""
+    sexp = sexpression.parse(program)
+
+    start = time.perf_counter()
+    program_node = parse_program(sexp)
+    parsed = time.perf_counter()
+    list(TypeChecker.check_program(program_node))
+    checked = time.perf_counter()
+
+    print(
+        f"{name:>20}: parse_program {parsed - start:.3f} s, check_program {checked - parsed:.3f} s"
+    )
+
+
+def main() -> None:
+    """Time a deeply nested program and a wide program."""
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+
+    time_program(f"depth {depth}", generate_deep_program(depth))
+    time_program(f"width {width}", generate_wide_program(width))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Time typechecking a large program sequentially and in parallel by a pool of processes.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.parallel_check [workers]
+
+`workers` defaults to the number of CPUs.
+"""
+
+import os
+import sys
+import time
+
+from lispyc.parser import parse
+from lispyc.typechecker import TypeChecker
+
+FORMS = (
+    "(let ((f (lambda ((x int) (y (list float))) (cons 1.0 y)))) (f 1 (list 2.0 3.0)))",
+    "(lambda ((g (func (int bool) (list int))) (b bool)) (g 1 b))",
+    "(cond ((car (list true false)) (list (list 1) nil)) (cdr (list (list 2))))",
+)
+
+COUNT = 20_000
+
+
+def main() -> None:
+    """Time checking the program sequentially and in parallel and print the times."""
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    program = parse("\n".join(FORMS[i % len(FORMS)] for i in range(COUNT)))
+
+    start = time.perf_counter()
+    list(TypeChecker.check_program(program))
+    print(f"{COUNT} forms, sequential: {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    list(TypeChecker.check_program(program, workers=workers))
+    print(f"{COUNT} forms, {workers} workers: {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Time resolving types which share nested types through the unifier.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.resolution [depth]
+
+Each type is a function type whose parameters and return type are all the previous type, so the
+types form a DAG of `depth` levels over a single type variable. Once the variable is unified,
+the transitive set representative is resolved for the deepest type, and then for every type in
+turn, as it would be when querying the type of every node of a program.
+"""
+
+import sys
+import timeit
+
+from lispyc.nodes import FunctionType, IntType, Type, UnknownType
+from lispyc.typechecker import Unifier
+
+
+def generate_types(depth: int) -> tuple[UnknownType, list[Type]]:
+    """Return the type variable and the `depth` function types built on it."""
+    unknown = UnknownType()
+    types: list[Type] = []
+    type_: Type = unknown
+    for _ in range(depth):
+        type_ = FunctionType((type_, type_), type_)
+        types.append(type_)
+
+    return unknown, types
+
+
+def resolve(depth: int, every: bool) -> None:
+    """Unify the type variable and resolve the deepest type, or every type if `every` is True."""
+    unifier = Unifier()
+    unknown, types = generate_types(depth)
+    unifier.unify(unknown, IntType())
+
+    for type_ in types if every else types[-1:]:
+        unifier.get_transitive_set_representative(type_)
+
+
+def main() -> None:
+    """Time resolving the types and print the best of several runs."""
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+
+    for every in (False, True):
+        seconds = min(timeit.repeat(lambda: resolve(depth, every), number=1, repeat=5))
+        print(f"depth {depth}, {'every type' if every else 'deepest type'}: {seconds:.4f} s")
+
+
+if __name__ == "__main__":
+    main()
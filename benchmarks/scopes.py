@@ -0,0 +1,46 @@
+"""Time typechecking deeply nested `let` forms with wide binding lists.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.scopes [depth] [width]
+
+Each `let` binds `width` new names and its body references names bound by outer `let`s.
+"""
+
+import sys
+import time
+
+from lispyc.parser import parse
+from lispyc.typechecker import TypeChecker
+
+
+def generate_program(depth: int, width: int) -> str:
+    """Return `depth` nested `let`s which each bind `width` names."""
+    program = "(list " + " ".join(f"v0_{i}" for i in range(width)) + ")"
+
+    for level in reversed(range(depth)):
+        bindings = " ".join(f"(v{level}_{i} {i})" for i in range(width))
+        references = " ".join(f"v0_{i}" for i in range(0, width, 10))
+        program = f"(let ({bindings}) (list {references}) {program})"
+
+    return program
+
+
+def main() -> None:
+    """Time typechecking for a few depths and print the results."""
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    for current_depth in (depth // 4, depth // 2, depth):
+        sys.setrecursionlimit(max(sys.getrecursionlimit(), current_depth * 20))
+        program = parse(generate_program(current_depth, width))
+
+        start = time.perf_counter()
+        list(TypeChecker.check_program(program))
+        seconds = time.perf_counter() - start
+
+        print(f"depth {current_depth:>5}, width {width}: {seconds:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare the parse times of the S-expression parser backends.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.sexpression_parser [size in bytes]
+
+The standalone backend is only included if it was generated with `make standalone`.
+"""
+
+import importlib.util
+import random
+import sys
+import timeit
+
+from lispyc.sexpression import parser
+
+ATOMS = ("a", "b2_1", "list", "lambda", "1", "-22", "3.5e2", "true", "false", "nil")
+
+
+def generate_program(size: int, seed: int = 1) -> str:
+    """Return a random program which is approximately `size` characters long."""
+    rng = random.Random(seed)
+    parts: list[str] = []
+    length = 0
+    depth = 0
+
+    while length < size or depth:
+        choice = rng.random()
+        if choice < 0.2 and depth < 20 and length < size:
+            part = "("
+            depth += 1
+        elif choice < 0.4 and depth:
+            part = ")"
+            depth -= 1
+        else:
+            part = rng.choice(ATOMS)
+
+        parts.append(part)
+        length += len(part) + 1
+
+    return " ".join(parts)
+
+
+def main() -> None:
+    """Time each backend on a generated program and print the results."""
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    program = generate_program(size)
+    backends: list[parser.Backend] = ["native", "lalr", "earley"]
+
+    if importlib.util.find_spec("lispyc.sexpression._standalone"):
+        backends.append("standalone")
+
+    print(f"Program size: {len(program)} characters")
+    for backend in backends:
+        parser.parse("()", backend)  # Build the parser outside of the timed region.
+        seconds = min(timeit.repeat(lambda: parser.parse(program, backend), number=1, repeat=3))
+        print(f"{backend:>10}: {seconds:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
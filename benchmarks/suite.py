@@ -0,0 +1,169 @@
+"""Time the compiler's phases on generated programs and compare the times with a stored baseline.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.suite [--save] [--threshold FRACTION] [--baseline PATH] [CASE...]
+
+Each case generates a program which stresses one shape of code. Reading the S-expressions
+(`sexpression.parse`), parsing them into forms (`parser.parse_program`), and typechecking the
+forms (`TypeChecker.check_program`) are timed separately, as the best of several runs.
+
+Times are divided by the time of a fixed, pure-Python calibration workload, so a baseline recorded
+on one machine is roughly comparable on another. If any phase of any case is slower than the
+baseline by more than the threshold, the regressions are listed and the exit status is 1. With
+`--save`, the baseline is replaced with the current results instead.
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from lispyc import sexpression
+from lispyc.parser import parse_program
+from lispyc.typechecker import TypeChecker
+
+BASELINE = Path(__file__).with_name("baseline.json")
+
+REPEAT = 5
+
+
+def deep_nesting(depth: int = 10000) -> str:
+    """Return a list nested `depth` lists deep."""
+    return "(list " * depth + "1" + ")" * depth
+
+
+def wide_list(width: int = 20000) -> str:
+    """Return a list literal of `width` elements."""
+    return f"(list {' '.join(map(str, range(width)))})"
+
+
+def let_chain(length: int = 5000) -> str:
+    """Return `length` nested lets, each binding a variable to the previous one."""
+    lets = "".join(f"(let ((x{i + 1} x{i})) " for i in range(length))
+    return f"(let ((x0 1)) {lets}(cons x{length} nil){')' * length})"
+
+
+def lambda_pipeline(length: int = 500, count: int = 20) -> str:
+    """Return `count` forms which each compose `length` higher-order lambdas into a pipeline."""
+    pipeline = "inc"
+    for _ in range(length):
+        pipeline = f"(compose inc {pipeline})"
+
+    form = (
+        "(let ((compose (lambda ((f (func (int) int)) (g (func (int) int))) "
+        "(lambda ((x int)) (g (f x))))) (inc (lambda ((x int)) x))) "
+        f"({pipeline} 1))"
+    )
+    return "\n".join([form] * count)
+
+
+def branch_tree(breadth: int = 8, depth: int = 4, count: int = 1) -> str:
+    """Return `count` trees of alternating cond and select forms, `depth` levels deep."""
+
+    def tree(level: int) -> str:
+        """Return a tree with `level` levels; its root is a cond if `level` is even."""
+        if level == 0:
+            return "(list 1)"
+
+        child = tree(level - 1)
+        if level % 2 == 0:
+            branches = " ".join(f"((car (list true)) {child})" for _ in range(breadth))
+            return f"(cond {branches} {child})"
+        else:
+            branches = " ".join(f"({i} {child})" for i in range(breadth))
+            return f"(select 1 {branches} {child})"
+
+    return "\n".join([tree(depth)] * count)
+
+
+CASES: dict[str, Callable[[], str]] = {
+    "deep_nesting": deep_nesting,
+    "wide_list": wide_list,
+    "let_chain": let_chain,
+    "lambda_pipeline": lambda_pipeline,
+    "branch_tree": branch_tree,
+}
+
+
+def calibrate() -> float:
+    """Return the best time of a fixed, pure-Python workload of dict, list, and call overhead."""
+
+    def workload() -> None:
+        """Build and look up a dictionary of lists."""
+        table: dict[int, list[int]] = {}
+        for i in range(100_000):
+            table.setdefault(i % 1000, []).append(i)
+
+        sum(len(table[i % 1000]) for i in range(100_000))
+
+    return min(timeit.repeat(workload, number=1, repeat=REPEAT))
+
+
+def time_case(source: str) -> dict[str, float]:
+    """Return the best time of each phase of compiling `source`."""
+    sexp = sexpression.parse(source)
+    program = parse_program(sexp)
+    list(TypeChecker.check_program(program))
+
+    phases: dict[str, Callable[[], Any]] = {
+        "sexpression.parse": lambda: sexpression.parse(source),
+        "parser.parse_program": lambda: parse_program(sexp),
+        "TypeChecker.check_program": lambda: list(TypeChecker.check_program(program)),
+    }
+
+    return {
+        phase: min(timeit.repeat(function, number=1, repeat=REPEAT))
+        for phase, function in phases.items()
+    }
+
+
+def main() -> None:
+    """Time each case, print the results, and compare them with or save them as the baseline."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("cases", nargs="*", metavar="CASE", choices=[[], *CASES])
+    parser.add_argument("--save", action="store_true", help="save the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.3, help="allowed fractional slowdown")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help="the baseline's path")
+    args = parser.parse_args()
+
+    calibration = calibrate()
+    print(f"calibration: {calibration:.4f} s")
+
+    results: dict[str, dict[str, float]] = {}
+    for case in args.cases or CASES:
+        source = CASES[case]()
+        results[case] = {
+            phase: seconds / calibration for phase, seconds in time_case(source).items()
+        }
+
+        for phase, relative in results[case].items():
+            print(f"{case:<16} {phase:<26} {relative * calibration:.4f} s ({relative:.3f})")
+
+    if args.save:
+        baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=4, sort_keys=True) + "\n")
+        print(f"Saved the baseline to {args.baseline}.")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    regressions = [
+        f"{case} {phase}: {relative / baseline[case][phase] - 1:+.0%}"
+        for case, phases in results.items()
+        for phase, relative in phases.items()
+        if relative > baseline[case][phase] * (1 + args.threshold)
+    ]
+
+    if regressions:
+        print(f"Regressions beyond {args.threshold:.0%} of the baseline:", *regressions, sep="\n  ")
+        sys.exit(1)
+
+    print(f"No regressions beyond {args.threshold:.0%} of the baseline.")
+
+
+if __name__ == "__main__":
+    main()
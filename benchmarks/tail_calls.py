@@ -0,0 +1,47 @@
+"""Time running compiled programs which recurse deeply through tail calls.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.tail_calls [depth]
+
+One program counts down with a function which calls itself in tail position, which compiles to a
+loop. The other alternates between two functions which call each other in tail position, which
+compiles to a trampoline. Without tail-call optimisation, both would exceed Python's recursion
+limit at the default depth.
+"""
+
+import sys
+import timeit
+
+from lispyc.codegen import compile_program, execute
+from lispyc.parser import parse
+
+SELF_RECURSIVE = """
+(let ((count nil))
+  (set count
+    (lambda ((n int) (acc int))
+      (cond ((eq n 0) acc) (count (dec n) (inc acc)))))
+  (count {depth} 0))
+"""
+
+MUTUALLY_RECURSIVE = """
+(let ((even nil) (odd nil))
+  (set even (lambda ((n int)) (cond ((eq n 0) true) (odd (dec n)))))
+  (set odd (lambda ((n int)) (cond ((eq n 0) false) (even (dec n)))))
+  (even {depth}))
+"""
+
+
+def main() -> None:
+    """Time running each program and print the best of several runs."""
+    depth = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    for name, program in (("self", SELF_RECURSIVE), ("mutual", MUTUALLY_RECURSIVE)):
+        code = compile_program(parse(program.format(depth=depth)))
+        seconds = min(timeit.repeat(lambda: execute(code), number=1, repeat=10))
+
+        print(f"{name}, depth {depth}: {seconds:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Measure the memory which typechecking a large program allocates.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.type_memory [size]
+
+The program is about `size` bytes of forms whose types are lists and functions of ground types.
+The program is parsed before tracing starts, so only the typechecker's allocations are measured:
+the peak while checking, and what remains allocated for the types of the top-level forms.
+"""
+
+import sys
+import tracemalloc
+
+from lispyc.parser import parse
+from lispyc.typechecker import TypeChecker
+
+FORMS = (
+    "(let ((f (lambda ((x int) (y (list float))) (cons 1.0 y)))) (f 1 (list 2.0 3.0)))",
+    "(lambda ((g (func (int bool) (list int))) (b bool)) (g 1 b))",
+    "(cond ((car (list true false)) (list (list 1) nil)) (cdr (list (list 2))))",
+    "(select 1 (2 (lambda ((l (list (list int)))) (car l))) (lambda ((m (list (list int)))) nil))",
+)
+
+
+def generate_program(size: int) -> str:
+    """Return a program of about `size` bytes which repeats `FORMS`."""
+    forms = []
+    length = 0
+    while length < size:
+        form = FORMS[len(forms) % len(FORMS)]
+        forms.append(form)
+        length += len(form) + 1
+
+    return " ".join(forms)
+
+
+def main() -> None:
+    """Typecheck the program and print the memory allocated."""
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    program = parse(generate_program(size))
+
+    tracemalloc.start()
+    types = list(TypeChecker.check_program(program))
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(types) == len(program.body)
+    print(f"{len(types)} forms: {current / 2**20:.1f} MiB retained, {peak / 2**20:.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Time typechecking programs with a growing number of inferred sub-expressions.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.type_variables [max count]
+
+Each `car` creates a new type variable (an `UnknownType`) for the element type. The time per
+sub-expression should stay roughly constant as the count grows.
+"""
+
+import sys
+import time
+
+from lispyc.parser import parse
+from lispyc.typechecker import TypeChecker
+
+
+def generate_program(count: int) -> str:
+    """Return a program with `count` sub-expressions whose types must be inferred."""
+    elements = " ".join(f"(car (list {i}))" for i in range(count))
+    return f"(list {elements})"
+
+
+def main() -> None:
+    """Time typechecking for doubling counts of inferred sub-expressions and print the results."""
+    max_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    count = max_count // 8
+
+    while count <= max_count:
+        program = parse(generate_program(count))
+
+        start = time.perf_counter()
+        list(TypeChecker.check_program(program))
+        seconds = time.perf_counter() - start
+
+        print(f"{count:>8}: {seconds:.3f} s ({seconds / count * 1e6:.2f} µs per sub-expression)")
+        count *= 2
+
+
+if __name__ == "__main__":
+    main()
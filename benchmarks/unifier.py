@@ -0,0 +1,63 @@
+"""Time long sequences of unifications of type variables.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.unifier [count]
+
+Each pattern unifies `count` type variables with each other into a single set, then resolves every
+variable's set representative.
+"""
+
+import sys
+import time
+from collections.abc import Callable
+
+from lispyc.nodes import IntType, UnknownType
+from lispyc.typechecker import Unifier
+
+
+def unify_forward(unifier: Unifier, unknowns: list[UnknownType]) -> None:
+    """Unify each variable with the next one."""
+    for left, right in zip(unknowns, unknowns[1:]):
+        unifier.unify(left, right)
+
+
+def unify_backward(unifier: Unifier, unknowns: list[UnknownType]) -> None:
+    """Unify each variable with the previous one."""
+    for left, right in zip(unknowns[1:], unknowns):
+        unifier.unify(left, right)
+
+
+def unify_first(unifier: Unifier, unknowns: list[UnknownType]) -> None:
+    """Unify the first variable with every other one."""
+    for unknown in unknowns[1:]:
+        unifier.unify(unknowns[0], unknown)
+
+
+PATTERNS: dict[str, Callable[[Unifier, list[UnknownType]], None]] = {
+    "forward": unify_forward,
+    "backward": unify_backward,
+    "first": unify_first,
+}
+
+
+def main() -> None:
+    """Time each pattern of unifications and print the results."""
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    for name, pattern in PATTERNS.items():
+        unifier = Unifier()
+        unknowns = [UnknownType() for _ in range(count)]
+
+        start = time.perf_counter()
+        pattern(unifier, unknowns)
+        unifier.unify(unknowns[-1], IntType())
+        for unknown in unknowns:
+            unifier.get_transitive_set_representative(unknown)
+        seconds = time.perf_counter() - start
+
+        print(f"{name:>10}: {seconds:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
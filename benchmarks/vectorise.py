@@ -0,0 +1,80 @@
+"""Time folds and maps over long lists of numbers, vectorised and by recursion.
+
+Run from the repository's root directory:
+
+    python -m benchmarks.vectorise [length]
+
+The program is typechecked and compiled by `lispyc.cache.compile_source`. Each lambda recurses
+through a list in a shape which `lispyc.codegen.patterns` recognises. Given a list stored in an
+array, it's vectorised, with NumPy for maps of floats if it's installed. Given the same
+elements in a tuple, it recurses as usual. A map and a right fold aren't tail recursive, so they
+can't recurse through a long list without exceeding Python's default recursion limit; they
+recurse through a list of at most 900 elements instead.
+"""
+
+import sys
+import timeit
+
+from lispyc.cache import compile_source
+from lispyc.codegen import execute
+from lispyc.codegen.runtime import make_array_list, make_list
+
+# Each form returns a lambda. A lambda must be bound before it can refer to itself, so it's first
+# bound to one of the same type, and then assigned with `set`.
+PROGRAM = """
+(let ((total (lambda ((l (list float)) (acc float)) acc)))
+  (set total
+    (lambda ((l (list float)) (acc float))
+      (cond ((null l) acc) (total (cdr l) (sum acc (car l))))))
+  total)
+(let ((biggest (lambda ((l (list int)) (acc int)) acc)))
+  (set biggest
+    (lambda ((l (list int)) (acc int))
+      (cond ((null l) acc) (biggest (cdr l) (max acc (car l))))))
+  biggest)
+(let ((product (lambda ((l (list int))) 1)))
+  (set product
+    (lambda ((l (list int))) (cond ((null l) 1) (prod (car l) (product (cdr l))))))
+  product)
+(let ((scale (lambda ((l (list float))) l)))
+  (set scale
+    (lambda ((l (list float)))
+      (cond ((null l) nil) (cons (sum (prod 2.0 (car l)) 1.0) (scale (cdr l))))))
+  scale)
+"""
+
+# The longest list a lambda which isn't tail recursive recurses through.
+RECURSION_LENGTH = 900
+
+
+def main() -> None:
+    """Time each lambda with an array and with a tuple and print the best of several runs."""
+    length = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    total, biggest, product, scale = execute(compile_source(PROGRAM).code)
+
+    floats = [i / 7 for i in range(length)]
+    ints = [(i * 7919) % 1000 for i in range(length)]
+    ones = [1] * length
+
+    cases = (
+        ("sum floats", lambda list_: total(list_, 0.0), "d", floats, length),
+        ("max ints", lambda list_: biggest(list_, 0), "q", ints, length),
+        ("prod ints", product, "q", ones, RECURSION_LENGTH),
+        ("map floats", scale, "d", floats, RECURSION_LENGTH),
+    )
+
+    for name, function, typecode, elements, recursion_length in cases:
+        array_list = make_array_list(typecode, *elements)
+        tuple_list = make_list(*elements[:recursion_length])
+
+        vectorised = min(timeit.repeat(lambda: function(array_list), number=1, repeat=5))
+        recursive = min(timeit.repeat(lambda: function(tuple_list), number=1, repeat=5))
+
+        print(
+            f"{name:<10} vectorised, length {length}: {vectorised:.4f} s; "
+            f"recursive, length {min(length, recursion_length)}: {recursive:.4f} s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,20 @@
-from importlib import metadata
+import typing
 
-try:
-    __version__ = metadata.version("lispyc")
-except metadata.PackageNotFoundError:  # pragma: no cover
-    __version__ = "0.0.0+unknown"
+
+def __getattr__(name: str) -> typing.Any:
+    """Return the version as `__version__`, reading it from the package's metadata on first use.
+
+    Importing importlib.metadata is slow, so it's deferred until the version is needed.
+    """
+    if name != "__version__":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    from importlib import metadata
+
+    try:
+        version = metadata.version("lispyc")
+    except metadata.PackageNotFoundError:  # pragma: no cover
+        version = "0.0.0+unknown"
+
+    globals()["__version__"] = version
+    return version
@@ -0,0 +1,214 @@
+"""A cache of compiled lispy programs, modelled on CPython's `__pycache__`.
+
+A cached program is a marshalled code object along with the types of the forms in its body. The
+cache key is a hash of the program's source, the version of lispyc, and the version of Python's
+bytecode, so a cached program is never used with a different source or compiler. Loading a
+cached program skips parsing, typechecking, and code generation entirely.
+
+Entries are written to a temporary file which then replaces the entry, so a reader never sees a
+partially written entry. Hence, concurrent processes may share a cache directory.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import importlib.util
+import marshal
+import os
+import tempfile
+import types
+import typing
+from dataclasses import dataclass
+from pathlib import Path
+
+import lispyc
+from lispyc import sexpression
+from lispyc.codegen import compile_program
+from lispyc.instrumentation import Metrics
+from lispyc.nodes import Type
+from lispyc.nodes.types import BoolType, FloatType, FunctionType, IntType, ListType, UnknownType
+from lispyc.optimiser import optimise
+from lispyc.parser import parse_program
+from lispyc.typechecker import TypeChecker
+
+__all__ = ("CACHE_DIRECTORY", "CompiledProgram", "get_cache_key", "compile_source", "load", "store")
+
+# The name of the directory which caches programs from the same directory, like `__pycache__`.
+CACHE_DIRECTORY = "__lispycache__"
+
+_SUFFIX = ".lispyc"
+
+# A marshallable encoding of a type: a tuple of a tag naming the type followed by its contents.
+_EncodedType = tuple[typing.Any, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledProgram:
+    """A compiled lispy program along with the types of the forms in its body."""
+
+    code: types.CodeType
+    types: tuple[Type, ...]
+
+
+def get_cache_key(source: str) -> str:
+    """Return the key of the cache entry for a program with the given `source`."""
+    digest = hashlib.sha256()
+    digest.update(lispyc.__version__.encode())
+    digest.update(importlib.util.MAGIC_NUMBER)
+    digest.update(source.encode())
+
+    return digest.hexdigest()
+
+
+def compile_source(
+    source: str,
+    cache_directory: str | os.PathLike[str] | None = None,
+    filename: str = "<lispy>",
+    backend: sexpression.Backend = "native",
+    timings: Metrics | None = None,
+) -> CompiledProgram:
+    """Parse, typecheck, optimise, and compile a lispy program.
+
+    If `cache_directory` is given, load the compiled program from it if it's cached there, and
+    otherwise cache it there. `backend` is the parser backend to use. If `timings` is given, the
+    time spent in each phase, "load", "parse", "check", "optimise", "generate", and "write", is
+    added to its timings.
+
+    Raise LispyError if the program fails to parse, typecheck, or compile.
+    """
+    time = _not_timed if timings is None else timings.time
+
+    if cache_directory is not None:
+        with time("load"):
+            compiled = load(source, cache_directory)
+
+        if compiled is not None:
+            return compiled
+
+    with time("parse"):
+        program = parse_program(sexpression.parse(source, backend))  # type: ignore
+
+    with time("check"):
+        # The code generator uses the types of all the forms.
+        table = TypeChecker.infer_types(program)
+        types_ = tuple(table[form] for form in program.body)
+
+    with time("optimise"):
+        optimised = optimise(program, table)
+
+    with time("generate"):
+        code = compile_program(optimised.program, filename, optimised.table)
+        compiled = CompiledProgram(code, types_)
+
+    if cache_directory is not None:
+        with time("write"):
+            store(source, compiled, cache_directory)
+
+    return compiled
+
+
+def _not_timed(phase: str) -> typing.ContextManager[None]:
+    """Return a context manager which doesn't time `phase`."""
+    return contextlib.nullcontext()
+
+
+def load(source: str, cache_directory: str | os.PathLike[str]) -> CompiledProgram | None:
+    """Return the cached compiled program for `source`, or None if it's not cached.
+
+    An entry which cannot be read or is invalid is treated as if it's not cached.
+    """
+    key = get_cache_key(source)
+
+    try:
+        data = Path(cache_directory, key + _SUFFIX).read_bytes()
+        cached_key, code, encoded_types = marshal.loads(data)
+        types_ = _decode_types(encoded_types)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+    if cached_key != key or not isinstance(code, types.CodeType):
+        return None
+
+    return CompiledProgram(code, types_)
+
+
+def store(source: str, compiled: CompiledProgram, cache_directory: str | os.PathLike[str]) -> None:
+    """Cache the compiled program for `source`, replacing the entry atomically.
+
+    Like writing `.pyc` files, caching is best-effort; OSErrors are ignored.
+    """
+    key = get_cache_key(source)
+    data = marshal.dumps((key, compiled.code, _encode_types(compiled.types)))
+    directory = Path(cache_directory)
+
+    with contextlib.suppress(OSError):
+        directory.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix=".tmp", prefix=f".{key}.", dir=directory)
+
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(data)
+
+            os.replace(temp_path, directory / (key + _SUFFIX))
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(temp_path)
+
+            raise
+
+
+def _encode_types(types_: tuple[Type, ...]) -> tuple[_EncodedType, ...]:
+    """Return a marshallable encoding of `types_`."""
+    return tuple(map(_encode_type, types_))
+
+
+def _encode_type(type_: Type) -> _EncodedType:
+    """Return a marshallable encoding of `type_`."""
+    match type_:
+        case IntType():
+            return ("int",)
+        case FloatType():
+            return ("float",)
+        case BoolType():
+            return ("bool",)
+        case ListType(element_type):
+            return ("list", _encode_type(element_type))
+        case FunctionType(parameter_types, return_type):
+            return ("func", _encode_type(return_type), *map(_encode_type, parameter_types))
+        case UnknownType(id_):
+            return ("unknown", id_)
+        case _:  # pragma: no cover
+            raise TypeError(f"Cannot encode type {type_!r}.")
+
+
+def _decode_types(encoded_types: tuple[_EncodedType, ...]) -> tuple[Type, ...]:
+    """Return the types which `encoded_types` encode.
+
+    Raise ValueError if an encoding is invalid. Unknown types are given new ids; encodings which
+    share an id decode to the same unknown type.
+    """
+    unknowns: dict[int, UnknownType] = {}
+
+    def decode(encoded: _EncodedType) -> Type:
+        """Return the type which `encoded` encodes. Raise ValueError if it's invalid."""
+        match encoded:
+            case ("int",):
+                return IntType()
+            case ("float",):
+                return FloatType()
+            case ("bool",):
+                return BoolType()
+            case ("list", element_type):
+                return ListType(decode(element_type))
+            case ("func", return_type, *parameter_types):
+                return FunctionType(tuple(map(decode, parameter_types)), decode(return_type))
+            case ("unknown", int() as id_):
+                if id_ not in unknowns:
+                    unknowns[id_] = UnknownType()
+
+                return unknowns[id_]
+            case _:
+                raise ValueError(f"Invalid encoded type {encoded!r}.")
+
+    return tuple(map(decode, encoded_types))
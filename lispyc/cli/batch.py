@@ -0,0 +1,126 @@
+"""Check or build files, in this process or in a pool of processes."""
+
+from __future__ import annotations
+
+import dataclasses
+from collections.abc import Iterator
+from concurrent import futures
+from pathlib import Path
+
+from lark.exceptions import UnexpectedInput
+
+from lispyc import cache, sexpression
+from lispyc.exceptions import LispyError
+from lispyc.incremental import IncrementalChecker
+from lispyc.instrumentation import Metrics, instrument
+from lispyc.parser import parse_program
+from lispyc.typechecker import TypeChecker
+
+from .protocol import Options, Result
+
+__all__ = ("process_files", "process_file", "warm_up", "describe_internal_error")
+
+# Compiled by each worker process before it processes files.
+_WARM_UP_PROGRAM = "(let ((f (lambda ((x int)) (cons x nil)))) (f 1))"
+
+
+def process_files(files: list[Path], options: Options, jobs: int) -> Iterator[Result]:
+    """Process `files` in a pool of `jobs` processes and yield the results as they're done.
+
+    If only one process is needed, process the files in this process instead, in order.
+    """
+    jobs = min(jobs, len(files))
+
+    if jobs == 1:
+        warm_up(options.backend)
+        yield from (process_file(file, options) for file in files)
+        return
+
+    with futures.ProcessPoolExecutor(
+        jobs, initializer=warm_up, initargs=(options.backend,)
+    ) as executor:
+        pending = {executor.submit(process_file, file, options): file for file in files}
+
+        try:
+            for future in futures.as_completed(pending):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # E.g. the worker process died, so the pool is broken.
+                    result = Result(pending[future], describe_internal_error(pending[future], e))
+
+                yield result
+        finally:
+            # If interrupted, don't wait for the remaining files to be processed.
+            executor.shutdown(cancel_futures=True)
+
+
+def warm_up(backend: str) -> None:
+    """Prepare this process to process files, so that the first file's timings aren't skewed.
+
+    The parser for `backend` is created, and the typechecker, optimiser, and code generator run
+    once. The version of lispyc, which cache keys include, is read too.
+    """
+    cache.get_cache_key(_WARM_UP_PROGRAM)
+    cache.compile_source(_WARM_UP_PROGRAM, backend=backend)  # type: ignore
+
+
+def process_file(path: Path, options: Options, checker: IncrementalChecker | None = None) -> Result:
+    """Check or build the file at `path` and return the result.
+
+    If `checker` is given, it checks the file instead, and it must have only checked previous
+    versions of the file. Only forms which changed since then are parsed and typechecked again,
+    so both are timed together as the check phase. It's only used with the native parser and if
+    the file isn't built.
+
+    If the options ask for metrics, the compiler is instrumented, and the result has its metrics.
+    """
+    if not options.metrics:
+        return _process_file(path, options, checker)
+
+    with instrument() as metrics:
+        result = _process_file(path, options, checker)
+
+    return dataclasses.replace(result, metrics=metrics.as_dict())
+
+
+def _process_file(path: Path, options: Options, checker: IncrementalChecker | None) -> Result:
+    """Check or build the file at `path` and return the result; see `process_file`."""
+    timings = Metrics()
+
+    try:
+        with timings.time("read"):
+            source = path.read_text(encoding="utf8")
+
+        if options.build:
+            cache_directory = path.parent / cache.CACHE_DIRECTORY
+            cache.compile_source(
+                source, cache_directory, str(path), options.backend, timings  # type: ignore
+            )
+        elif checker is not None and options.backend == "native":
+            with timings.time("check"):
+                checker.check(source)
+        else:
+            with timings.time("parse"):
+                program = parse_program(sexpression.parse(source, options.backend))  # type: ignore
+
+            with timings.time("check"):
+                list(TypeChecker.check_program(program))
+    except (OSError, UnicodeDecodeError) as e:
+        return Result(path, f"{path}: error: {e}", timings.timings)
+    except UnexpectedInput as e:
+        message = str(e).splitlines()[0]
+        return Result(path, f"{path}:{e.line}:{e.column}: syntax error: {message}", timings.timings)
+    except LispyError as e:
+        return Result(path, f"{path}: {type(e).__name__}: {e.message}", timings.timings)
+    except Exception as e:
+        # A bug in the compiler, or a limit such as the recursion limit, shouldn't stop the other
+        # files from being processed.
+        return Result(path, describe_internal_error(path, e), timings.timings)
+
+    return Result(path, None, timings.timings)
+
+
+def describe_internal_error(path: Path, error: BaseException) -> str:
+    """Return the diagnostic of an unexpected `error` raised while processing the file at `path`."""
+    return f"{path}: internal error: {type(error).__name__}: {error}"
@@ -0,0 +1,36 @@
+"""A client of the compile server, which sends it files to process.
+
+This module must not import the compiler, so that the client starts quickly.
+"""
+
+from __future__ import annotations
+
+import socket
+from collections.abc import Iterator
+from pathlib import Path
+
+from . import protocol
+from .protocol import Options, Result
+
+__all__ = ("process_files",)
+
+
+def process_files(socket_path: str, files: list[Path], options: Options) -> Iterator[Result]:
+    """Have the server listening at `socket_path` process `files`; yield results as they're done.
+
+    Raise OSError if the server can't be connected to, or ConnectionError if it stops replying
+    before every file is processed.
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(protocol.encode_request(files, options))
+        client.shutdown(socket.SHUT_WR)
+
+        count = 0
+        with client.makefile("rb") as stream:
+            for line in stream:
+                count += 1
+                yield protocol.decode_result(line)
+
+    if count != len(files):
+        raise ConnectionError("The server closed the connection before processing every file.")
@@ -0,0 +1,232 @@
+"""The command-line interface of the compiler, which checks or builds many files in parallel.
+
+    python -m lispyc check [-j JOBS] [--parser BACKEND] [--server SOCKET]
+                           [--metrics FILE] PATH...
+    python -m lispyc build [-j JOBS] [--parser BACKEND] [--server SOCKET]
+                           [--metrics FILE] PATH...
+    python -m lispyc serve SOCKET
+
+Each path is a file, a directory which is searched recursively for `.lispy` files, or a glob.
+`check` parses and typechecks the files. `build` also optimises and compiles them into the
+`__lispycache__` directory next to each file, skipping files which are already compiled there.
+
+Files are processed by a pool of processes, or by the compile server listening at SOCKET if
+`--server` is given; `serve` starts the server. Diagnostics are printed as soon as a file is done,
+and a summary of the time spent in each phase, summed over all files, is printed at the end. If
+`--metrics` is given, the compiler is instrumented, and the metrics it recorded for all files are
+written to FILE as JSON; see `lispyc.instrumentation`.
+
+The exit status is 0 if every file succeeded, 1 if any failed, and 2 if the arguments are invalid,
+the server can't be reached, or the metrics can't be written.
+
+The compiler is only imported when files are processed in this process, so a client of the server
+starts quickly.
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import socket
+import sys
+import time
+from collections.abc import Iterator, Sequence
+from pathlib import Path
+
+from lispyc.instrumentation import Metrics
+
+from .protocol import BACKENDS, Options, Result
+
+__all__ = ("SUFFIX", "main")
+
+# The suffix of lispy source files.
+SUFFIX = ".lispy"
+
+# The phases a file goes through, in order; timings are reported in this order.
+_PHASES = ("read", "load", "parse", "check", "optimise", "generate", "write")
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    """Run the command-line interface with the arguments `argv` and return the exit status.
+
+    If `argv` is None, use the arguments the program was run with.
+    """
+    parser = _create_argument_parser()
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        return _serve(parser, args.socket)
+
+    files: dict[Path, None] = {}  # An ordered set.
+    for pattern in args.paths:
+        if not (matches := _find_files(pattern)):
+            parser.error(f"no {SUFFIX} files match {pattern!r}")
+
+        files.update(dict.fromkeys(matches))
+
+    options = Options(args.command == "build", args.parser, args.metrics is not None)
+
+    if args.server is not None:
+        # The server may have a different working directory.
+        results = _process_with_server(args.server, [file.absolute() for file in files], options)
+    else:
+        from .batch import process_files
+
+        results = process_files(list(files), options, args.jobs)
+
+    metrics = None if args.metrics is None else Metrics()
+
+    try:
+        status = _report(results, len(files), options, metrics)
+    except _ServerError as e:
+        print(f"lispyc: error: {e}", file=sys.stderr)
+        return 2
+
+    if metrics is not None:
+        try:
+            Path(args.metrics).write_text(metrics.to_json() + "\n")
+        except OSError as e:
+            print(f"lispyc: error: cannot write the metrics: {e}", file=sys.stderr)
+            return 2
+
+    return status
+
+
+def _create_argument_parser() -> argparse.ArgumentParser:
+    """Return the parser of the command-line arguments."""
+    parser = argparse.ArgumentParser(prog="lispyc", description="Check or build lispy programs.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for command, help_ in (
+        ("check", "parse and typecheck files"),
+        ("build", "parse, typecheck, and compile files into __lispycache__"),
+    ):
+        subparser = subparsers.add_parser(command, help=help_, description=help_.capitalize())
+        subparser.add_argument(
+            "paths",
+            nargs="+",
+            metavar="PATH",
+            help=f"a file, a directory of {SUFFIX} files, or a glob",
+        )
+        subparser.add_argument(
+            "-j",
+            "--jobs",
+            type=_positive_int,
+            default=os.cpu_count() or 1,
+            help="the number of processes to use; defaults to the number of CPUs",
+        )
+        subparser.add_argument(
+            "--parser",
+            choices=BACKENDS,
+            default="native",
+            help="the parser backend to use; defaults to native",
+        )
+        subparser.add_argument(
+            "--server",
+            metavar="SOCKET",
+            help="have the compile server listening at the Unix socket SOCKET process the files",
+        )
+        subparser.add_argument(
+            "--metrics",
+            metavar="FILE",
+            help="instrument the compiler and write the metrics it records to FILE as JSON",
+        )
+
+    help_ = "run a compile server which listens at a Unix socket"
+    subparser = subparsers.add_parser("serve", help=help_, description=help_.capitalize())
+    subparser.add_argument("socket", metavar="SOCKET", help="the path of the socket")
+
+    return parser
+
+
+def _positive_int(value: str) -> int:
+    """Convert a command-line argument to a positive integer."""
+    try:
+        number = int(value)
+    except ValueError:
+        number = 0
+
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer but got {value!r}")
+
+    return number
+
+
+def _find_files(pattern: str) -> list[Path]:
+    """Return the files which `pattern`, a file, directory, or glob, refers to, sorted by path."""
+    path = Path(pattern)
+
+    if path.is_dir():
+        return sorted(file for file in path.rglob(f"*{SUFFIX}") if file.is_file())
+    elif path.is_file():
+        return [path]
+    else:
+        return sorted(
+            Path(match) for match in glob.glob(pattern, recursive=True) if Path(match).is_file()
+        )
+
+
+class _ServerError(Exception):
+    """Raised when the compile server can't be used to process files."""
+
+
+def _process_with_server(socket_path: str, files: list[Path], options: Options) -> Iterator[Result]:
+    """Have the server at `socket_path` process `files`; yield results as they're done.
+
+    Raise _ServerError if the server can't be reached, or its replies can't be read.
+    """
+    from .client import process_files
+
+    try:
+        yield from process_files(socket_path, files, options)
+    except (OSError, ValueError) as e:
+        raise _ServerError(f"cannot use the server at {socket_path}: {e}") from e
+
+
+def _report(
+    results: Iterator[Result], count: int, options: Options, metrics: Metrics | None
+) -> int:
+    """Print diagnostics as `results` arrive, then a summary; return the exit status.
+
+    If `metrics` is given, merge the metrics of the results into it.
+    """
+    start = time.perf_counter()
+    failed = 0
+    timings = dict.fromkeys(_PHASES, 0.0)
+
+    for result in results:
+        if result.diagnostic is not None:
+            failed += 1
+            print(result.diagnostic, file=sys.stderr, flush=True)
+
+        for phase, time_ in result.timings.items():
+            timings[phase] += time_
+
+        if metrics is not None and result.metrics is not None:
+            metrics.merge(Metrics.from_dict(result.metrics))
+
+    elapsed = time.perf_counter() - start
+    verb = "built" if options.build else "checked"
+    print(f"{count} files {verb} in {elapsed:.3f} s, {failed} failed.", file=sys.stderr)
+    for phase, time_ in timings.items():
+        if time_:
+            print(f"  {phase:<10}{time_:.3f} s", file=sys.stderr)
+
+    return 1 if failed else 0
+
+
+def _serve(parser: argparse.ArgumentParser, socket_path: str) -> int:
+    """Run the compile server at `socket_path` until interrupted and return the exit status."""
+    if not hasattr(socket, "AF_UNIX"):
+        parser.error("the compile server needs Unix sockets, which aren't supported here")
+
+    from .server import serve
+
+    try:
+        serve(socket_path)
+    except OSError as e:
+        print(f"lispyc: error: cannot serve at {socket_path}: {e}", file=sys.stderr)
+        return 2
+
+    return 0
@@ -0,0 +1,102 @@
+"""The options and results of processing files, and their encoding for the compile server.
+
+A client sends a request as one line of JSON: the options and the paths of the files to process.
+The server replies with one line of JSON per file, the file's result, as soon as it's processed.
+
+This module is imported by the client, so it must not import the compiler.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+__all__ = (
+    "BACKENDS",
+    "Options",
+    "Result",
+    "encode_request",
+    "decode_request",
+    "encode_result",
+    "decode_result",
+)
+
+# The parser backends which can be used. The standalone backend raises its own copies of lark's
+# exceptions, so it isn't offered.
+BACKENDS = ("native", "lalr", "earley")
+
+
+@dataclass(frozen=True, slots=True)
+class Options:
+    """The options which each file is processed with.
+
+    If `build` is False, files are only parsed and typechecked. `backend` is the parser backend.
+    If `metrics` is True, the compiler is instrumented while processing each file.
+    """
+
+    build: bool
+    backend: str
+    metrics: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class Result:
+    """The outcome of processing a file: the diagnostic if it failed, and the time of each phase.
+
+    If the compiler was instrumented, `metrics` is the dictionary of the metrics it recorded.
+    """
+
+    path: Path
+    diagnostic: str | None
+    timings: dict[str, float] = field(default_factory=dict)
+    metrics: dict[str, Any] | None = None
+
+
+def encode_request(files: list[Path], options: Options) -> bytes:
+    """Encode a request to process `files` with `options` as a line of JSON."""
+    request = {
+        "build": options.build,
+        "backend": options.backend,
+        "metrics": options.metrics,
+        "paths": list(map(str, files)),
+    }
+    return json.dumps(request).encode() + b"\n"
+
+
+def decode_request(line: bytes) -> tuple[list[Path], Options]:
+    """Decode a request from a line of JSON. Raise ValueError if it's invalid."""
+    try:
+        request = json.loads(line)
+        files = [Path(path) for path in request["paths"]]
+        options = Options(bool(request["build"]), str(request["backend"]), bool(request["metrics"]))
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Invalid request {line!r}.") from e
+
+    return files, options
+
+
+def encode_result(result: Result) -> bytes:
+    """Encode `result` as a line of JSON."""
+    encoded = {
+        "path": str(result.path),
+        "diagnostic": result.diagnostic,
+        "timings": result.timings,
+        "metrics": result.metrics,
+    }
+    return json.dumps(encoded).encode() + b"\n"
+
+
+def decode_result(line: bytes) -> Result:
+    """Decode a result from a line of JSON. Raise ValueError if it's invalid."""
+    try:
+        encoded = json.loads(line)
+        return Result(
+            Path(encoded["path"]),
+            encoded["diagnostic"],
+            dict(encoded["timings"]),
+            encoded["metrics"],
+        )
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Invalid result {line!r}.") from e
@@ -0,0 +1,151 @@
+"""A compile server, which processes files for clients and stays warm between requests.
+
+The server listens on a Unix socket. Since it keeps running, the interpreter, lark, and the
+compiler are only imported once, and the parsers which clients use are only created once. Types
+stay interned between requests. For each file which is checked with the native parser, the
+server keeps an `IncrementalChecker`, so checking a file again only checks forms which changed;
+only the checkers of the `Server.max_checkers` most recently checked files are kept.
+Compiled files are cached in `__lispycache__` as usual.
+
+Each connection is handled in its own thread, and its files are processed in that thread, in
+order. Thus, the server is meant for the latency of checking a few files at a time; large batches
+are faster in a pool of processes.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import traceback
+from collections import OrderedDict
+from pathlib import Path
+
+from lispyc.incremental import IncrementalChecker
+
+from . import protocol
+from .batch import describe_internal_error, process_file, warm_up
+from .protocol import Options, Result
+
+__all__ = ("Server", "serve")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Handle a request from a client: process its files and reply with their results."""
+
+    server: Server
+
+    def handle(self) -> None:
+        """Process the files which the client requested and send each result when it's done."""
+        if not (line := self.rfile.readline()):
+            return  # The client closed the connection without a request.
+
+        try:
+            files, options = protocol.decode_request(line)
+        except ValueError as e:
+            # Close the connection without replying; the client will report it.
+            print(f"lispyc: {e}", file=sys.stderr)
+            return
+
+        if options.backend not in protocol.BACKENDS:
+            error = f"error: unknown parser backend {options.backend!r}"
+            results = (Result(file, f"{file}: {error}") for file in files)
+        else:
+            results = (self._process_file(file, options) for file in files)
+
+        for result in results:
+            self.wfile.write(protocol.encode_result(result))
+
+    def _process_file(self, path: Path, options: Options) -> Result:
+        """Process the file at `path`, replying with a diagnostic if the server fails to."""
+        try:
+            return self.server.process_file(path, options)
+        except Exception as e:
+            traceback.print_exc()
+            return Result(path, describe_internal_error(path, e))
+
+
+class Server(socketserver.ThreadingUnixStreamServer):
+    """A server which processes files for clients connected to a Unix socket."""
+
+    daemon_threads = True
+
+    # The most incremental checkers which are kept; the least recently used one is evicted first.
+    max_checkers = 256
+
+    def __init__(self, socket_path: str):
+        super().__init__(socket_path, _Handler)
+
+        # An incremental checker for each recently checked file, from least to most recently used,
+        # with a lock since checkers aren't thread-safe.
+        self._checkers: OrderedDict[Path, tuple[threading.Lock, IncrementalChecker]] = OrderedDict()
+        self._checkers_lock = threading.Lock()
+
+    def process_file(self, path: Path, options: Options) -> Result:
+        """Check or build the file at `path`, reusing its incremental checker if it's checked."""
+        if options.build or options.backend != "native":
+            return process_file(path, options)
+
+        path = path.resolve()
+        with self._checkers_lock:
+            if (entry := self._checkers.get(path)) is not None:
+                self._checkers.move_to_end(path)
+            else:
+                entry = self._checkers[path] = (threading.Lock(), IncrementalChecker())
+                if len(self._checkers) > self.max_checkers:
+                    # A file being checked keeps its evicted checker until it's done.
+                    self._checkers.popitem(last=False)
+
+        lock, checker = entry
+        with lock:
+            return process_file(path, options, checker)
+
+
+def serve(socket_path: str) -> None:
+    """Serve clients on a Unix socket at `socket_path` until interrupted or terminated.
+
+    A socket file left by a server which is no longer running is replaced. Raise
+    FileExistsError if another server is listening at `socket_path`.
+    """
+    _remove_stale_socket(socket_path)
+    warm_up("native")
+
+    # Stop serving on SIGTERM as on SIGINT, so that the socket file is removed.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+
+    with Server(socket_path) as server:
+        print(f"Listening on {socket_path}", file=sys.stderr, flush=True)
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            with contextlib.suppress(OSError):
+                os.unlink(socket_path)
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """Remove the socket file at `socket_path` if no server is listening on it.
+
+    Raise FileExistsError if a server is listening on it. Files other than sockets are left for
+    binding the server's socket to fail.
+    """
+    try:
+        if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+            return
+    except FileNotFoundError:
+        return
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        try:
+            client.connect(socket_path)
+        except ConnectionRefusedError:
+            os.unlink(socket_path)
+        else:
+            raise FileExistsError(f"A server is already listening at {socket_path}.")
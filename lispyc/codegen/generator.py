@@ -0,0 +1,641 @@
+from __future__ import annotations
+
+import ast
+import dataclasses
+import types
+import typing
+from collections import ChainMap
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+from lispyc import exceptions, nodes
+from lispyc.instrumentation import phase
+from lispyc.nodes import (
+    BoolType,
+    ComposedForm,
+    Constant,
+    FloatType,
+    Form,
+    IntType,
+    ListType,
+    Node,
+    Program,
+    Type,
+    Variable,
+)
+from lispyc.typechecker import NIL, TypeTable
+
+from . import patterns, runtime
+
+__all__ = ("CodeGenerator", "compile_program", "execute")
+
+# The generated module appends the value of each top-level form to this list.
+VALUES_NAME = "_lispy_values"
+
+# Names of generated Python variables which aren't bindings are prefixed with this. Names of
+# bindings always end with a number, so they cannot collide with these names.
+_RUNTIME_PREFIX = "_lispy_"
+
+# Built-in functions which don't always evaluate all their arguments. They're lowered to Python's
+# operators rather than calls when they are called directly with at least two arguments.
+_SHORT_CIRCUITS: dict[str, ast.boolop] = {"and": ast.And(), "or": ast.Or()}
+
+# The typecodes of the arrays which store the elements of lists of these types, and of lists of
+# constants of these Python types.
+_ARRAY_TYPECODES: dict[Type, str] = {
+    ListType(IntType()): "q",
+    ListType(FloatType()): "d",
+    ListType(BoolType()): "b",
+}
+_CONSTANT_TYPECODES: dict[type, str] = {int: "q", float: "d", bool: "b"}
+
+
+@dataclass(slots=True, eq=False)
+class _Function:
+    """A Python function being generated. The module is the outermost function.
+
+    `binding` is the binding which the function's lambda is assigned to with `set`, if any. Tail
+    calls of it may loop back to the start of the function if `loops` is True.
+    """
+
+    parent: _Function | None
+    name: str = ""
+    binding: _Binding | None = None
+    parameters: list[str] = field(default_factory=list)
+    loops: bool = False
+    body: list[ast.stmt] = field(default_factory=list)
+    globals: set[str] = field(default_factory=set)
+    nonlocals: set[str] = field(default_factory=set)
+    looped: bool = False
+    tail_calls: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class _Binding:
+    """A lispy binding; `name` is the name of its Python variable, which `function` owns."""
+
+    name: str
+    function: _Function
+
+
+class CodeGenerator:
+    """Lower a lispy AST into a Python AST.
+
+    Every form is lowered to a Python expression. `let` and `set` assign with assignment
+    expressions, and a `progn` is the last element of a tuple of its forms. The exceptions are
+    lambdas, which become functions defined before the statement which uses them; defining a
+    function has no side effects, so this does not change the order of evaluation.
+
+    Each binding is given a unique Python name, which makes shadowing a non-issue. A `set` of a
+    binding owned by an outer function declares it `nonlocal` or `global`.
+
+    The body of a lambda is lowered to statements so that calls in tail position can be
+    optimised. A function which calls itself in tail position runs in a `while` loop, reassigning
+    its parameters for each call. Other calls of bindings in tail position return a
+    `runtime.TailCall` instead, and the function is wrapped with `runtime.trampoline`, which makes
+    the call once the function returns. Hence, neither kind of recursion grows the stack.
+
+    List literals of ints, floats, and bools are stored in arrays rather than tuples if the types
+    of the forms are known, or if their elements are all constants.
+    """
+
+    def __init__(self, table: TypeTable | None = None):
+        self._table = table
+        self._counter = 0
+        self._module = _Function(None)
+        self._function = self._module
+        self._scope: ChainMap[str, _Binding] = ChainMap()
+        self._runtime_names: set[str] = set()
+
+    @classmethod
+    def generate_program(cls, program: Program, table: TypeTable | None = None) -> ast.Module:
+        """Lower `program` into a Python module.
+
+        The module appends the value of each form in the program's body to a list named
+        `VALUES_NAME`, in order. `table` is the table of the types of the program's forms, if
+        known, which lets the code store lists more compactly.
+
+        Raise UnboundNameError if a name is neither bound nor the name of a built-in function.
+        """
+        generator = cls(table)
+        generator._module.body.append(
+            ast.Assign([ast.Name(VALUES_NAME, ast.Store())], ast.List([], ast.Load()))
+        )
+
+        for form in program.body:
+            value = generator._generate_form(form)
+            append = ast.Attribute(ast.Name(VALUES_NAME, ast.Load()), "append", ast.Load())
+            generator._module.body.append(ast.Expr(ast.Call(append, [value], [])))
+
+        if generator._runtime_names:
+            names = [
+                ast.alias(name, _RUNTIME_PREFIX + name) for name in sorted(generator._runtime_names)
+            ]
+            generator._module.body.insert(0, ast.ImportFrom(runtime.__name__, names, 0))
+
+        module = ast.Module(generator._module.body, [])
+        return ast.fix_missing_locations(module)
+
+    def _fresh_name(self, name: str) -> str:
+        """Return a new unique Python name based on `name`."""
+        self._counter += 1
+        return f"{name}_{self._counter}"
+
+    @contextmanager
+    def _nested_scope(
+        self, bindings: Mapping[str, _Binding], function: _Function | None = None
+    ) -> Iterator[None]:
+        """Generate code within a new scope, and optionally within a new function."""
+        outer_scope, outer_function = self._scope, self._function
+        self._scope = self._scope.new_child(dict(bindings))
+        self._function = function or outer_function
+
+        try:
+            yield
+        finally:
+            self._scope, self._function = outer_scope, outer_function
+
+    def _generate_form(self, form: Form) -> ast.expr:
+        """Return a Python expression which evaluates `form`."""
+        try:
+            generate = _GENERATORS[type(form)]
+        except KeyError:
+            raise TypeError(f"Unknown form {form!r}.") from None
+
+        return generate(self, form)
+
+    def _generate_forms(self, forms: Sequence[Form]) -> list[ast.expr]:
+        """Return Python expressions which evaluate `forms`."""
+        return [self._generate_form(form) for form in forms]
+
+    def _generate_constant(self, constant: Constant) -> ast.expr:
+        """Return the value of a `Constant`."""
+        return ast.Constant(constant.value)
+
+    def _generate_variable(self, variable: Variable) -> ast.expr:
+        """Return a reference to a binding, to a built-in function, or to nil.
+
+        Raise UnboundNameError if the name is neither.
+        """
+        if (binding := self._scope.get(variable.name)) is not None:
+            return ast.Name(binding.name, ast.Load())
+        elif variable.name == NIL:
+            return self._get_runtime_name("NIL")
+        elif (builtin := runtime.BUILTINS.get(variable.name)) is not None:
+            return self._get_runtime_name(builtin)
+        else:
+            raise exceptions.UnboundNameError(
+                f"Cannot retrieve binding {variable.name!r}: name is not in scope", variable.name
+            )
+
+    def _generate_composed_form(self, form: ComposedForm) -> ast.expr:
+        """Return a call of the function which `form` names."""
+        arguments = self._generate_forms(form.arguments)
+
+        match form.name:
+            case Variable(name) if (
+                name in _SHORT_CIRCUITS and name not in self._scope and len(arguments) > 1
+            ):
+                return ast.BoolOp(_SHORT_CIRCUITS[name], arguments)
+            case name:
+                return ast.Call(self._generate_form(name), arguments, [])
+
+    def _generate_lambda(self, lambda_: nodes.Lambda, binding: _Binding | None = None) -> ast.expr:
+        """Define a Python function for a `Lambda` and return a reference to it.
+
+        `binding` is the binding which the lambda is assigned to, if any.
+        """
+        # Each iteration of a loop would share the bindings of the function, so a nested lambda
+        # could observe them change. Hence, only functions without nested lambdas loop.
+        function = _Function(
+            self._function,
+            name=self._fresh_name("lambda"),
+            binding=binding,
+            loops=binding is not None and not _has_lambda(lambda_.body),
+        )
+        params = {
+            param.name.name: _Binding(self._fresh_name(param.name.name), function)
+            for param in lambda_.parameters
+        }
+        function.parameters = [param.name for param in params.values()]
+
+        with self._nested_scope(params, function):
+            statements = self._generate_tail(lambda_.body)
+
+            pattern = None
+            if binding is not None:
+                pattern = patterns.match_recursion(
+                    lambda_, lambda name: self._scope.get(name) is binding, self._scope.__contains__
+                )
+
+        body: list[ast.stmt] = []
+        if function.globals:
+            body.append(ast.Global(sorted(function.globals)))
+        if function.nonlocals:
+            body.append(ast.Nonlocal(sorted(function.nonlocals)))
+        body += function.body
+        if pattern is not None:
+            body.append(self._generate_vectorised(pattern, function, params))
+        if function.looped:
+            body.append(ast.While(ast.Constant(True), statements, []))
+        else:
+            body += statements
+
+        if function.tail_calls:
+            step = self._fresh_name("step")
+            self._function.body.append(self._define_function(step, function.parameters, body))
+            wrapper = self._call_runtime(runtime.trampoline, ast.Name(step, ast.Load()))
+            self._function.body.append(ast.Assign([ast.Name(function.name, ast.Store())], wrapper))
+        else:
+            self._function.body.append(
+                self._define_function(function.name, function.parameters, body)
+            )
+
+        return ast.Name(function.name, ast.Load())
+
+    def _generate_vectorised(
+        self,
+        pattern: patterns.Fold | patterns.Map,
+        function: _Function,
+        params: Mapping[str, _Binding],
+    ) -> ast.stmt:
+        """Return a statement which returns the fold or map which a lambda computes, if it can.
+
+        `function` is the lambda's function, and `params` are its parameters. The fold or map is
+        computed all at once by the runtime if the list is stored in an array of numbers, and the
+        lambda's binding still holds the lambda. Otherwise, the lambda runs as usual.
+        """
+        list_ = ast.Name(params[pattern.list_].name, ast.Load())
+
+        if isinstance(pattern, patterns.Fold):
+            if pattern.accumulator is not None:
+                initial: ast.expr = ast.Name(params[pattern.accumulator].name, ast.Load())
+            else:
+                initial = self._generate_form(pattern.initial)  # type: ignore[arg-type]
+
+            call = self._call_runtime(
+                runtime.fold_numeric,
+                ast.Constant(pattern.operator),
+                list_,
+                initial,
+                ast.Constant(pattern.accumulator is None),
+                ast.Constant(pattern.element_first),
+            )
+        else:
+            # The element-wise expression only refers to built-in functions and the element.
+            element = self._fresh_name("element")
+            parameter = {pattern.list_: _Binding(self._fresh_name(pattern.list_), self._function)}
+            with self._nested_scope(parameter):
+                value = self._generate_form(pattern.element)
+
+            self._function.body.append(
+                self._define_function(element, [parameter[pattern.list_].name], [ast.Return(value)])
+            )
+            call = self._call_runtime(runtime.map_numeric, ast.Name(element, ast.Load()), list_)
+
+        assert function.binding is not None
+        is_self = ast.Compare(
+            ast.Name(function.binding.name, ast.Load()),
+            [ast.Is()],
+            [ast.Name(function.name, ast.Load())],
+        )
+
+        result = self._fresh_name("vectorised")
+        computed = ast.Compare(
+            ast.NamedExpr(ast.Name(result, ast.Store()), call),
+            [ast.IsNot()],
+            [self._get_runtime_name("NOT_VECTORISED")],
+        )
+        test = ast.BoolOp(ast.And(), [is_self, computed])
+        return ast.If(test, [ast.Return(ast.Name(result, ast.Load()))], [])
+
+    def _generate_list(self, list_: nodes.List) -> ast.expr:
+        """Return a new list of the elements of a `List`, built all at once.
+
+        If the list is known to be a list of ints, floats, or bools, store it in an array.
+        """
+        if not list_.elements:
+            return self._get_runtime_name("NIL")
+
+        elements = self._generate_forms(list_.elements)
+        if (typecode := self._get_array_typecode(list_)) is not None:
+            return self._call_runtime(runtime.make_array_list, ast.Constant(typecode), *elements)
+
+        return self._call_runtime(runtime.make_list, *elements)
+
+    def _get_array_typecode(self, list_: nodes.List) -> str | None:
+        """Return the typecode of the array to store a `List` in, or None to store it in a tuple.
+
+        The list's type is looked up if the types are known. Otherwise, a list of constants of the
+        same type is known to be a list of that type.
+        """
+        if self._table is not None:
+            return _ARRAY_TYPECODES.get(self._table.get(list_))  # type: ignore[arg-type]
+
+        types_ = {
+            type(element.value) if isinstance(element, Constant) else None
+            for element in list_.elements
+        }
+        if len(types_) == 1:
+            return _CONSTANT_TYPECODES.get(types_.pop())  # type: ignore[arg-type]
+
+        return None
+
+    def _generate_cons(self, cons: nodes.Cons) -> ast.expr:
+        """Return a new list of the car of a `Cons` followed by its cdr, which isn't copied."""
+        car, cdr = self._generate_form(cons.car), self._generate_form(cons.cdr)
+        return self._call_runtime(runtime.ConsCell, car, cdr)
+
+    def _generate_car(self, car: nodes.Car) -> ast.expr:
+        """Return the first element of the list of a `Car`."""
+        return self._call_runtime(runtime.car, self._generate_form(car.list))
+
+    def _generate_cdr(self, cdr: nodes.Cdr) -> ast.expr:
+        """Return the list of a `Cdr` without its first element."""
+        return self._call_runtime(runtime.cdr, self._generate_form(cdr.list))
+
+    def _generate_progn(self, progn: nodes.Progn) -> ast.expr:
+        """Evaluate the forms of a `Progn` in order and return the value of the last one."""
+        return self._sequence(self._generate_forms(progn.forms))
+
+    def _generate_set(self, set_: nodes.Set) -> ast.expr:
+        """Assign the value of a `Set` to its binding and return the value."""
+        binding = self._scope.get(set_.name.name)
+        if binding is None:
+            raise exceptions.UnboundNameError(
+                f"Cannot bind to name {set_.name.name!r}: name is not in scope", set_.name.name
+            )
+
+        if binding.function is not self._function:
+            if binding.function is self._module:
+                self._function.globals.add(binding.name)
+            else:
+                self._function.nonlocals.add(binding.name)
+
+        if isinstance(set_.value, nodes.Lambda):
+            value = self._generate_lambda(set_.value, binding)
+        else:
+            value = self._generate_form(set_.value)
+
+        return ast.NamedExpr(ast.Name(binding.name, ast.Store()), value)
+
+    def _generate_let(self, let: nodes.Let) -> ast.expr:
+        """Bind the values of a `Let` and return the value of its body's last form."""
+        # The values are generated in the outer scope.
+        values = self._generate_forms([binding.value for binding in let.bindings])
+        bindings = {
+            binding.name.name: _Binding(self._fresh_name(binding.name.name), self._function)
+            for binding in let.bindings
+        }
+
+        assignments: list[ast.expr] = [
+            ast.NamedExpr(ast.Name(binding.name, ast.Store()), value)
+            for binding, value in zip(bindings.values(), values)
+        ]
+
+        with self._nested_scope(bindings):
+            body = self._generate_forms(let.body)
+
+        return self._sequence(assignments + body)
+
+    def _generate_cond(self, cond: nodes.Cond) -> ast.expr:
+        """Return the value of the first branch of a `Cond` whose predicate is true."""
+        predicates = self._generate_forms([branch.predicate for branch in cond.branches])
+        values = self._generate_forms([branch.value for branch in cond.branches])
+
+        result = self._generate_form(cond.default)
+        for predicate, value in zip(reversed(predicates), reversed(values)):
+            result = ast.IfExp(predicate, value, result)
+
+        return result
+
+    def _generate_select(self, select: nodes.Select) -> ast.expr:
+        """Return the value of the first branch of a `Select` whose predicate equals its value."""
+        name = self._fresh_name("select")
+        selected: ast.expr = ast.NamedExpr(
+            ast.Name(name, ast.Store()), self._generate_form(select.value)
+        )
+
+        tests = []
+        for branch in select.branches:
+            predicate = self._generate_form(branch.predicate)
+            tests.append(self._call_runtime(runtime.equal, selected, predicate))
+            selected = ast.Name(name, ast.Load())  # Only evaluate the value once.
+
+        values = self._generate_forms([branch.value for branch in select.branches])
+
+        result = self._generate_form(select.default)
+        for test, value in zip(reversed(tests), reversed(values)):
+            result = ast.IfExp(test, value, result)
+
+        return result
+
+    def _generate_tail(self, form: Form) -> list[ast.stmt]:
+        """Return statements which return the value of `form`, which is in tail position."""
+        if (generate := _TAIL_GENERATORS.get(type(form))) is not None:
+            return generate(self, form)
+
+        return [ast.Return(self._generate_form(form))]
+
+    def _generate_tail_composed_form(self, form: ComposedForm) -> list[ast.stmt]:
+        """Return statements which make the call of a `ComposedForm` in tail position.
+
+        A call of a built-in function is made as usual, since those don't call back into lispy in
+        tail position. A call of the function's own binding loops back to the start of the
+        function; the binding is checked first in case it was assigned a different function. Any
+        other call is returned as a `TailCall` for the function's trampoline to make.
+        """
+        if isinstance(form.name, Variable) and form.name.name not in self._scope:
+            return [ast.Return(self._generate_form(form))]
+
+        function = self._function
+        name = self._generate_form(form.name)
+        arguments = self._generate_forms(form.arguments)
+        statements: list[ast.stmt] = []
+
+        if (
+            function.loops
+            and isinstance(form.name, Variable)
+            and self._scope.get(form.name.name) is function.binding
+            and len(arguments) == len(function.parameters)
+        ):
+            function.looped = True
+            loop: list[ast.stmt] = [ast.Continue()]
+            if arguments:
+                parameters = [ast.Name(param, ast.Store()) for param in function.parameters]
+                assign = ast.Assign(
+                    [ast.Tuple(parameters, ast.Store())], ast.Tuple(arguments, ast.Load())
+                )
+                loop.insert(0, assign)
+
+            is_self = ast.Compare(name, [ast.Is()], [ast.Name(function.name, ast.Load())])
+            statements.append(ast.If(is_self, loop, []))
+
+            # The binding rarely holds another function, so it's called as usual in that case.
+            statements.append(ast.Return(ast.Call(name, arguments, [])))
+        else:
+            function.tail_calls = True
+            call = self._call_runtime(runtime.TailCall, name, *arguments)
+            statements.append(ast.Return(call))
+
+        return statements
+
+    def _generate_tail_progn(self, progn: nodes.Progn) -> list[ast.stmt]:
+        """Return statements which evaluate a `Progn` in tail position."""
+        *forms, last = progn.forms
+        statements: list[ast.stmt] = [ast.Expr(value) for value in self._generate_forms(forms)]
+
+        return statements + self._generate_tail(last)
+
+    def _generate_tail_let(self, let: nodes.Let) -> list[ast.stmt]:
+        """Return statements which evaluate a `Let` in tail position."""
+        values = self._generate_forms([binding.value for binding in let.bindings])
+        bindings = {
+            binding.name.name: _Binding(self._fresh_name(binding.name.name), self._function)
+            for binding in let.bindings
+        }
+
+        # Each binding has a new name which no value can refer to, so assigning them one by one is
+        # the same as assigning them in parallel.
+        statements: list[ast.stmt] = [
+            ast.Assign([ast.Name(binding.name, ast.Store())], value)
+            for binding, value in zip(bindings.values(), values)
+        ]
+
+        with self._nested_scope(bindings):
+            *body, last = let.body
+            statements += [ast.Expr(value) for value in self._generate_forms(body)]
+            statements += self._generate_tail(last)
+
+        return statements
+
+    def _generate_tail_cond(self, cond: nodes.Cond) -> list[ast.stmt]:
+        """Return statements which evaluate a `Cond` in tail position."""
+        predicates = self._generate_forms([branch.predicate for branch in cond.branches])
+        values = [self._generate_tail(branch.value) for branch in cond.branches]
+
+        result = self._generate_tail(cond.default)
+        for predicate, value in zip(reversed(predicates), reversed(values)):
+            result = [ast.If(predicate, value, result)]
+
+        return result
+
+    def _generate_tail_select(self, select: nodes.Select) -> list[ast.stmt]:
+        """Return statements which evaluate a `Select` in tail position."""
+        name = self._fresh_name("select")
+        selected: ast.expr = ast.NamedExpr(
+            ast.Name(name, ast.Store()), self._generate_form(select.value)
+        )
+
+        tests = []
+        for branch in select.branches:
+            predicate = self._generate_form(branch.predicate)
+            tests.append(self._call_runtime(runtime.equal, selected, predicate))
+            selected = ast.Name(name, ast.Load())  # Only evaluate the value once.
+
+        values = [self._generate_tail(branch.value) for branch in select.branches]
+
+        result = self._generate_tail(select.default)
+        for test, value in zip(reversed(tests), reversed(values)):
+            result = [ast.If(test, value, result)]
+
+        return result
+
+    def _get_runtime_name(self, value: Callable[..., typing.Any] | str) -> ast.expr:
+        """Return a reference to a function or class, or a name, from the runtime module.
+
+        Import it from the runtime module too.
+        """
+        name = value if isinstance(value, str) else value.__name__
+        self._runtime_names.add(name)
+        return ast.Name(_RUNTIME_PREFIX + name, ast.Load())
+
+    def _call_runtime(self, function: Callable[..., typing.Any], *args: ast.expr) -> ast.expr:
+        """Return a call of a function from the runtime module."""
+        return ast.Call(self._get_runtime_name(function), list(args), [])
+
+    @staticmethod
+    def _define_function(name: str, parameters: list[str], body: list[ast.stmt]) -> ast.stmt:
+        """Return a definition of a Python function."""
+        arguments = ast.arguments(
+            posonlyargs=[],
+            args=[ast.arg(param) for param in parameters],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[],
+        )
+        definition = ast.FunctionDef(name, arguments, body, decorator_list=[], returns=None)
+        if "type_params" in ast.FunctionDef._fields:  # pragma: no cover
+            definition.type_params = []  # Required since Python 3.12.
+
+        return definition
+
+    @staticmethod
+    def _sequence(expressions: list[ast.expr]) -> ast.expr:
+        """Return an expression which evaluates `expressions` in order and returns the last one."""
+        return ast.Subscript(ast.Tuple(expressions, ast.Load()), ast.Constant(-1), ast.Load())
+
+
+_GENERATORS: dict[type[Form], Callable[[CodeGenerator, typing.Any], ast.expr]] = {
+    Constant: CodeGenerator._generate_constant,
+    Variable: CodeGenerator._generate_variable,
+    ComposedForm: CodeGenerator._generate_composed_form,
+    **{
+        form: getattr(CodeGenerator, f"_generate_{id_}")
+        for id_, form in nodes.SpecialForm.forms_map.items()
+    },
+}
+
+_TAIL_GENERATORS: dict[type[Form], Callable[[CodeGenerator, typing.Any], list[ast.stmt]]] = {
+    ComposedForm: CodeGenerator._generate_tail_composed_form,
+    nodes.Progn: CodeGenerator._generate_tail_progn,
+    nodes.Let: CodeGenerator._generate_tail_let,
+    nodes.Cond: CodeGenerator._generate_tail_cond,
+    nodes.Select: CodeGenerator._generate_tail_select,
+}
+
+
+def _has_lambda(form: Form) -> bool:
+    """Return True if a `Lambda` is nested anywhere within `form`."""
+    stack: list[typing.Any] = [form]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, nodes.Lambda):
+            return True
+        elif isinstance(node, Node):
+            stack.extend(getattr(node, field_.name) for field_ in dataclasses.fields(node))
+        elif isinstance(node, tuple | list):
+            stack.extend(node)
+
+    return False
+
+
+def compile_program(
+    program: Program, filename: str = "<lispy>", table: TypeTable | None = None
+) -> types.CodeType:
+    """Compile `program` into a Python code object.
+
+    `table` is the table of the types of the program's forms, from `TypeChecker.infer_types`. If
+    given, lists whose elements are ints, floats, or bools are stored more compactly.
+
+    Raise NestingError if the forms are nested too deeply for Python to compile. Each form is
+    lowered to a nested Python expression, and Python's compiler recurses into those, so the
+    depth it can compile is limited by the recursion limit however the AST is built.
+    """
+    with phase("generate"):
+        try:
+            module = CodeGenerator.generate_program(program, table)
+            return compile(module, filename, "exec")
+        except RecursionError:
+            raise exceptions.NestingError(
+                "Cannot compile program: forms are nested too deeply"
+            ) from None
+
+
+def execute(code: types.CodeType) -> list[typing.Any]:
+    """Execute a compiled program and return the values of the forms in its body."""
+    namespace: dict[str, typing.Any] = {}
+    exec(code, namespace)
+
+    return namespace[VALUES_NAME]
@@ -0,0 +1,187 @@
+"""Recognise lambdas which recurse through a list to fold or map it, so they can be vectorised.
+
+Three shapes of recursion are recognised, where `f` is the binding which the lambda is assigned to
+with `set`, `l` is a parameter, and the names of built-in functions aren't shadowed:
+
+- A left fold, which is tail recursive and has an accumulator `acc`:
+  `(cond ((null l) acc) (f (cdr l) (op acc (car l))))`
+- A right fold from a constant `c`: `(cond ((null l) c) (op (car l) (f (cdr l))))`
+- A map: `(cond ((null l) nil) (cons e (f (cdr l))))`
+
+`op` is one of `FOLD_OPERATORS`, and its operands may be in either order. `e` is an element-wise
+expression: calls of `ELEMENT_OPERATORS` whose arguments are `(car l)`, numbers, or element-wise
+expressions.
+
+The types come from the lambda's parameters, which the typechecker checks the body against: `l`
+must be a list of ints or floats, and `acc` or `c` must be of the same type as its elements.
+Whether the list is stored in an array, and so can be vectorised, is checked when it's called.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from lispyc import nodes
+from lispyc.nodes import ComposedForm, Constant, Form, Type, Variable
+from lispyc.nodes.types import FloatType, IntType, ListType
+from lispyc.typechecker import NIL
+
+__all__ = ("FOLD_OPERATORS", "ELEMENT_OPERATORS", "Fold", "Map", "match_recursion")
+
+# Built-in functions which are associative and commutative for ints, so a fold of ints with them
+# can be reordered. Folds of floats are never reordered: sums and products round, and `max` and
+# `min` return their first argument if the other is NaN, or if they're 0.0 and -0.0.
+FOLD_OPERATORS = frozenset({"sum", "prod", "max", "min"})
+
+# Built-in functions which compute the same results element-wise for whole NumPy arrays.
+ELEMENT_OPERATORS = frozenset({"sum", "prod", "diff", "neg", "inc", "dec", "abs"})
+
+# The Python types of the values of the element types of lists which can be vectorised.
+_PYTHON_TYPES: dict[Type, type] = {IntType(): int, FloatType(): float}
+
+
+@dataclass(frozen=True, slots=True)
+class Fold:
+    """A fold of the list parameter `list_` with the built-in function `operator`.
+
+    If `accumulator` is the name of a parameter, it's a left fold which starts from the
+    accumulator's value. Otherwise, it's a right fold which starts from the constant `initial`.
+    `element_first` is True if each element is the first argument of `operator`.
+    """
+
+    operator: str
+    list_: str
+    accumulator: str | None = None
+    initial: Constant | None = None
+    element_first: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class Map:
+    """A map of the list parameter `list_` with an element-wise expression.
+
+    In `element`, the name of the list parameter refers to the element, rather than to the list.
+    """
+
+    list_: str
+    element: Form
+
+
+def match_recursion(
+    lambda_: nodes.Lambda, is_self: Callable[[str], bool], is_bound: Callable[[str], bool]
+) -> Fold | Map | None:
+    """Return the fold or map which `lambda_` recurses to compute, or None if it doesn't.
+
+    `is_self(name)` returns True if `name` refers to the lambda within its body, and
+    `is_bound(name)` returns True if `name` is bound there, and so isn't a built-in function.
+    """
+    parameters = [parameter.name.name for parameter in lambda_.parameters]
+    types = {parameter.name.name: parameter.type for parameter in lambda_.parameters}
+
+    match lambda_.body:
+        case nodes.Cond(
+            [nodes.Branch(ComposedForm(Variable("null"), [Variable(list_)]), base)], step
+        ):
+            if is_bound("null") or list_ not in parameters:
+                return None
+        case _:
+            return None
+
+    match types[list_]:
+        case ListType(IntType() | FloatType() as element_type):
+            pass
+        case _:
+            return None
+
+    car, recurse = nodes.Car(Variable(list_)), nodes.Cdr(Variable(list_))
+
+    def is_recursion(form: Form) -> bool:
+        """Return True if `form` calls the lambda itself with the cdr of the list."""
+        match form:
+            case ComposedForm(Variable(name), [argument]):
+                return is_self(name) and argument == recurse
+            case _:
+                return False
+
+    def get_operator(form: Form, other: Form) -> tuple[str, bool] | None:
+        """Return the fold operator which `form` calls with the element and `other`, if it does.
+
+        It's returned with whether the element is the first argument.
+        """
+        match form:
+            case ComposedForm(Variable(name), [x, y]) if (
+                name in FOLD_OPERATORS and not is_bound(name) and {x, y} == {car, other}
+            ):
+                return name, x == car
+            case _:
+                return None
+
+    if len(parameters) == 2:
+        accumulator = parameters[1 - parameters.index(list_)]
+
+        match base, step:
+            case Variable(name), ComposedForm(Variable(callee), [_, _]) if (
+                name == accumulator and types[accumulator] == element_type
+            ):
+                arguments = dict(zip(parameters, step.arguments))
+                operator = get_operator(arguments[accumulator], Variable(accumulator))
+                if is_self(callee) and arguments[list_] == recurse and operator is not None:
+                    return Fold(
+                        operator[0], list_, accumulator=accumulator, element_first=operator[1]
+                    )
+    elif len(parameters) == 1:
+        match base, step:
+            case Constant(value), ComposedForm(Variable(_), [x, y]) if _is_of_type(
+                value, element_type
+            ):
+                recursion = y if x == car else x
+                operator = get_operator(step, recursion)
+                if operator is not None and is_recursion(recursion):
+                    return Fold(operator[0], list_, initial=base, element_first=operator[1])
+            case Variable(name), nodes.Cons(element, recursion) if name == NIL:
+                if (
+                    not is_bound(NIL)
+                    and is_recursion(recursion)
+                    and _is_element_wise(element, car, is_bound)
+                    and _contains(element, car)
+                ):
+                    return Map(list_, _replace(element, car, Variable(list_)))
+
+    return None
+
+
+def _is_of_type(value: object, type_: Type) -> bool:
+    """Return True if `value` is an int of `IntType` or a float of `FloatType`."""
+    return type(value) is _PYTHON_TYPES.get(type_)
+
+
+def _is_element_wise(form: Form, car: nodes.Car, is_bound: Callable[[str], bool]) -> bool:
+    """Return True if `form` is an element-wise expression of `car`; see the module's docs."""
+    match form:
+        case Constant(value):
+            return type(value) in (int, float)
+        case ComposedForm(Variable(name), arguments) if name in ELEMENT_OPERATORS:
+            return not is_bound(name) and all(
+                _is_element_wise(argument, car, is_bound) for argument in arguments
+            )
+        case _:
+            return form == car
+
+
+def _contains(form: Form, part: Form) -> bool:
+    """Return True if `part` is `form` or one of the arguments nested in it."""
+    if form == part:
+        return True
+
+    return isinstance(form, ComposedForm) and any(_contains(arg, part) for arg in form.arguments)
+
+
+def _replace(form: Form, old: Form, new: Form) -> Form:
+    """Return `form` with `old`, and any arguments nested in it which are `old`, replaced."""
+    if form == old:
+        return new
+    elif isinstance(form, ComposedForm):
+        return ComposedForm(form.name, tuple(_replace(arg, old, new) for arg in form.arguments))
+
+    return form
@@ -0,0 +1,763 @@
+"""Runtime support for compiled lispy programs.
+
+Lists are immutable `LispyList`s, and nil is the single empty list, `NIL`. A list is one of:
+
+- A `ListView`: a tuple and an offset into it. List literals and the built-in functions which
+  return lists build a tuple of all the elements at once, and `cdr` of a view is a view of the
+  same tuple from the next offset, so it doesn't copy the elements.
+- A `ConsCell`: a car and a cdr, which may be any list. `cons` is O(1) since the cdr is shared.
+
+A view's items may be an `array.array` rather than a tuple. The code generator builds literals of
+lists of ints, floats, and bools in arrays if their types are known, which stores each element in
+8 bytes or fewer rather than as a pointer to a boxed Python object. Built-in functions which
+return a list of the same elements as an array-backed list store it in the same kind of array.
+
+Hence, `car`, `cdr`, and `cons` are all O(1), and recursing through a list with `car` and `cdr` is
+linear. Lists are never mutated, so sharing their structure is safe. For Python code using the
+values of a program, a list compares equal to a tuple of the same elements.
+
+A lambda which recurses through a list to fold or map it, which `patterns` recognises, first calls
+`fold_numeric` or `map_numeric`. If the list is stored in an array of ints or floats, they compute
+the result without recursing, with NumPy for maps of floats if it's installed. Otherwise, they
+return `NOT_VECTORISED`, and the lambda recurses as usual.
+
+The built-in functions from the manual are defined here; compiled programs import the ones they
+use. Arithmetic functions follow the manual's rules for mixing types: a result is a `float` if any
+argument is a `float`, and otherwise it is an `int`, truncated if needed.
+"""
+
+from __future__ import annotations
+
+import array
+import builtins
+import functools
+import math
+import sys
+import types
+import typing
+from collections.abc import Callable, Iterator, Sequence
+
+from lispyc.exceptions import RuntimeError
+
+__all__ = (
+    "BUILTINS",
+    "NIL",
+    "ConsCell",
+    "LispyList",
+    "ListView",
+    "BoolListView",
+    "TailCall",
+    "car",
+    "cdr",
+    "format_value",
+    "make_list",
+    "make_array_list",
+    "NOT_VECTORISED",
+    "fold_numeric",
+    "map_numeric",
+    "trampoline",
+)
+
+Number = int | float
+
+
+class LispyList:
+    """An immutable lispy list. Non-empty lists have a `car` and a `cdr`; see the subclasses."""
+
+    __slots__ = ()
+
+    def __iter__(self) -> Iterator[typing.Any]:
+        """Return an iterator over the elements of the list."""
+        raise NotImplementedError  # pragma: no cover
+
+    def __len__(self) -> int:
+        """Return the number of elements in the list."""
+        return builtins.sum(1 for _ in self)
+
+    def __bool__(self) -> bool:
+        """Return False if the list is nil, without counting its elements."""
+        return self is not NIL
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if `other` is a list or tuple whose elements are equal to this list's."""
+        if isinstance(other, LispyList | tuple):
+            return tuple(self) == tuple(other)
+
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        """Return the hash of a tuple of the list's elements, to be consistent with `__eq__`."""
+        return hash(tuple(self))
+
+    def __repr__(self) -> str:
+        """Return the class's name followed by a tuple of the list's elements."""
+        return f"{type(self).__name__}{tuple(self)!r}"
+
+
+class _Nil(LispyList):
+    """The empty list; `NIL` is its only instance."""
+
+    __slots__ = ()
+
+    def __iter__(self) -> Iterator[typing.Any]:
+        """Return an empty iterator."""
+        return iter(())
+
+    def __len__(self) -> int:
+        """Return 0."""
+        return 0
+
+    def __repr__(self) -> str:
+        """Return "NIL"."""
+        return "NIL"
+
+
+NIL: LispyList = _Nil()
+
+
+class ListView(LispyList):
+    """A non-empty list of the elements of the sequence `items` from index `start` onwards.
+
+    `car` is computed when the view is created. `cdr` is a view of the same items from the next
+    index, or nil.
+    """
+
+    __slots__ = ("car", "_items", "_start")
+
+    def __init__(self, items: Sequence[typing.Any], start: int = 0):
+        self.car = items[start]
+        self._items = items
+        self._start = start
+
+    @property
+    def cdr(self) -> LispyList:
+        """Return a view of the items after the car, or nil if there are none."""
+        start = self._start + 1
+        return ListView(self._items, start) if start < len(self._items) else NIL
+
+    def __iter__(self) -> Iterator[typing.Any]:
+        """Return an iterator over the items from `start` onwards."""
+        return iter(self._items[self._start :])
+
+    def __len__(self) -> int:
+        """Return the number of items from `start` onwards."""
+        return len(self._items) - self._start
+
+
+class BoolListView(ListView):
+    """A `ListView` of bools stored as integers, e.g. in an array of bytes."""
+
+    __slots__ = ()
+
+    def __init__(self, items: Sequence[typing.Any], start: int = 0):
+        self.car = bool(items[start])
+        self._items = items
+        self._start = start
+
+    @property
+    def cdr(self) -> LispyList:
+        """Return a view of the items after the car, or nil if there are none."""
+        start = self._start + 1
+        return BoolListView(self._items, start) if start < len(self._items) else NIL
+
+    def __iter__(self) -> Iterator[typing.Any]:
+        """Return an iterator over the items from `start` onwards, as bools."""
+        return map(bool, self._items[self._start :])
+
+
+class ConsCell(LispyList):
+    """A non-empty list of `car` followed by the elements of the list `cdr`."""
+
+    __slots__ = ("car", "cdr")
+
+    def __init__(self, car: typing.Any, cdr: LispyList):
+        self.car = car
+        self.cdr = cdr
+
+    def __iter__(self) -> Iterator[typing.Any]:
+        """Return an iterator over the cars of the cells, then the elements of the last cdr."""
+        list_: LispyList = self
+        while type(list_) is ConsCell:
+            yield list_.car
+            list_ = list_.cdr
+
+        yield from list_
+
+
+def make_list(*elements: typing.Any) -> LispyList:
+    """Return a new list of `elements`, or nil if there are none."""
+    return ListView(elements) if elements else NIL
+
+
+def make_array_list(typecode: str, *elements: typing.Any) -> LispyList:
+    """Return a new list of `elements` stored in an array of `typecode`, or nil if there are none.
+
+    If the typecode is "b", the elements are bools. If an element doesn't fit in the array, e.g.
+    an int which needs more than 64 bits, the elements are stored in a tuple instead.
+    """
+    if not elements:
+        return NIL
+
+    try:
+        items = array.array(typecode, elements)
+    except OverflowError:
+        return ListView(elements)
+
+    return BoolListView(items) if typecode == "b" else ListView(items)
+
+
+def _make_list_like(list_: LispyList, elements: Sequence[typing.Any]) -> LispyList:
+    """Return a new list of `elements`, stored in the same kind of array as `list_` if it is."""
+    if isinstance(list_, ListView) and isinstance(list_._items, array.array):
+        return make_array_list(list_._items.typecode, *elements)
+
+    return make_list(*elements)
+
+
+def car(list_: LispyList) -> typing.Any:
+    """Return the first element of `list_`. Raise RuntimeError if it's nil."""
+    if list_ is NIL:
+        raise RuntimeError("Cannot get the car of nil.")
+
+    return list_.car  # type: ignore[attr-defined]
+
+
+def cdr(list_: LispyList) -> LispyList:
+    """Return `list_` without its first element. Raise RuntimeError if it's nil."""
+    if list_ is NIL:
+        raise RuntimeError("Cannot get the cdr of nil.")
+
+    return list_.cdr  # type: ignore[attr-defined]
+
+
+def format_value(value: typing.Any) -> str:
+    """Return the S-expression representation of a lispy value."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    elif isinstance(value, LispyList):
+        if value is NIL:
+            return "nil"
+
+        return "(" + " ".join(map(format_value, value)) + ")"
+    elif callable(value):
+        return f"<function at {id(value):#x}>"
+    else:
+        return repr(value)
+
+
+class TailCall:
+    """A call in tail position, which a trampoline makes after the calling function returns."""
+
+    __slots__ = ("function", "arguments")
+
+    def __init__(self, function: Callable[..., typing.Any], *arguments: typing.Any):
+        self.function = function
+        self.arguments = arguments
+
+
+def trampoline(step: Callable[..., typing.Any]) -> Callable[..., typing.Any]:
+    """Return a function which calls `step` and then makes the tail calls it returns, in a loop.
+
+    `step` returns a `TailCall` rather than making a call in tail position, so mutually recursive
+    tail calls don't grow the stack. The returned function keeps `step` as its `lispy_step`
+    attribute; a tail call to it from another trampoline calls the step directly.
+    """
+
+    def function(*arguments: typing.Any) -> typing.Any:
+        result = step(*arguments)
+        while type(result) is TailCall:
+            callee = result.function
+            result = getattr(callee, "lispy_step", callee)(*result.arguments)
+
+        return result
+
+    function.lispy_step = step  # type: ignore[attr-defined]
+    return function
+
+
+def _trunc_div(x: int, y: int) -> int:
+    """Return `x / y` truncated towards 0, computed exactly."""
+    quotient = x // y
+    if quotient < 0 and quotient * y != x:
+        quotient += 1  # Floor division rounded it away from 0.
+
+    return quotient
+
+
+def _any_float(*args: Number) -> bool:
+    """Return True if any of `args` is a `float`."""
+    return any(isinstance(arg, float) for arg in args)
+
+
+def _to_type_of(value: float, *args: Number) -> Number:
+    """Return `value` as a `float` if any of `args` is a `float`; otherwise, truncate it."""
+    return value if _any_float(*args) else math.trunc(value)
+
+
+# Predicates
+
+
+def eq(e_1: typing.Any, e_2: typing.Any) -> bool:
+    """Return True if `e_1` and `e_2` are the same object."""
+    return e_1 is e_2
+
+
+def equal(e_1: typing.Any, e_2: typing.Any) -> bool:
+    """Return True if `e_1` and `e_2` are equivalent; lists are compared element-wise."""
+    if isinstance(e_1, LispyList):
+        return len(e_1) == len(e_2) and all(map(equal, e_1, e_2))
+    elif isinstance(e_1, float) or isinstance(e_2, float):
+        return math.isclose(e_1, e_2)
+    else:
+        return e_1 == e_2
+
+
+def greaterp(n_1: Number, n_2: Number) -> bool:
+    """Return True if `n_1 > n_2`."""
+    return n_1 > n_2
+
+
+def evenp(n: int) -> bool:
+    """Return True if `n` is even."""
+    return n % 2 == 0
+
+
+def lessp(n_1: Number, n_2: Number) -> bool:
+    """Return True if `n_1 < n_2`."""
+    return n_1 < n_2
+
+
+def null(list_: LispyList) -> bool:
+    """Return True if `list_` is nil."""
+    return list_ is NIL
+
+
+def member(e: typing.Any, list_: LispyList) -> bool:
+    """Return True if `e` is equal to any element of `list_`."""
+    return any(equal(e, element) for element in list_)
+
+
+def not_(p: bool) -> bool:
+    """Return the negation of `p`."""
+    return not p
+
+
+def and_(*p: bool) -> bool:
+    """Return True if all arguments are True. Only used when `and` isn't called directly."""
+    return all(p)
+
+
+def or_(*p: bool) -> bool:
+    """Return True if any argument is True. Only used when `or` isn't called directly."""
+    return any(p)
+
+
+# Arithmetic
+
+
+def sum_(*x: Number) -> Number:
+    """Return the sum of the arguments."""
+    return builtins.sum(x)
+
+
+def prod(*x: Number) -> Number:
+    """Return the product of the arguments."""
+    return math.prod(x)
+
+
+def diff(x: Number, y: Number) -> Number:
+    """Return `x - y`."""
+    return x - y
+
+
+def neg(x: Number) -> Number:
+    """Return `-x`."""
+    return -x
+
+
+def inc(x: Number) -> Number:
+    """Return `x + 1`."""
+    return x + 1
+
+
+def dec(x: Number) -> Number:
+    """Return `x - 1`."""
+    return x - 1
+
+
+def div(x: Number, y: Number) -> Number:
+    """Return `x / y`; truncated towards 0 if both are `int`s."""
+    if _any_float(x, y):
+        return x / y
+
+    return _trunc_div(x, y)  # type: ignore
+
+
+def mod(x: Number, y: Number) -> Number:
+    """Return the remainder of the truncated division of `x` by `y`."""
+    if _any_float(x, y):
+        return math.fmod(x, y)
+
+    return x - y * _trunc_div(x, y)  # type: ignore
+
+
+def expt(x: Number, y: Number) -> Number:
+    """Return `x` to the power of `y`."""
+    if not _any_float(x, y) and y >= 0:
+        return x**y
+
+    return _to_type_of(math.pow(x, y), x, y)
+
+
+def sqrt(x: Number) -> Number:
+    """Return the square root of `x`."""
+    if isinstance(x, int):
+        return math.isqrt(x)
+
+    return math.sqrt(x)
+
+
+def log(x: Number, y: Number) -> Number:
+    """Return the logarithm of `x` to base `y`."""
+    return _to_type_of(math.log(x, y), x, y)
+
+
+def lb(x: Number) -> Number:
+    """Return the binary logarithm of `x`."""
+    return _to_type_of(math.log2(x), x)
+
+
+def lg(x: Number) -> Number:
+    """Return the common logarithm of `x`."""
+    return _to_type_of(math.log10(x), x)
+
+
+def ln(x: Number) -> Number:
+    """Return the natural logarithm of `x`."""
+    return _to_type_of(math.log(x), x)
+
+
+def recip(x: Number) -> Number:
+    """Return the reciprocal of `x`."""
+    return div(1, x)
+
+
+def abs_(x: Number) -> Number:
+    """Return the absolute value of `x`."""
+    return builtins.abs(x)
+
+
+def min_(*x: Number) -> Number:
+    """Return the smallest argument."""
+    result = builtins.min(x)
+    return float(result) if _any_float(*x) else result
+
+
+def max_(*x: Number) -> Number:
+    """Return the largest argument."""
+    result = builtins.max(x)
+    return float(result) if _any_float(*x) else result
+
+
+# Numeric conversion
+
+
+def float_(x: int) -> float:
+    """Return the `float` equivalent of `x`."""
+    return float(x)
+
+
+def floor(x: float) -> int:
+    """Return `x` rounded down to an `int`."""
+    return math.floor(x)
+
+
+def ceil(x: float) -> int:
+    """Return `x` rounded up to an `int`."""
+    return math.ceil(x)
+
+
+def trunc(x: float) -> int:
+    """Return `x` truncated to an `int`."""
+    return math.trunc(x)
+
+
+def round_(x: float) -> int:
+    """Return `x` rounded to the nearest `int`; halfway cases round to the even choice."""
+    return builtins.round(x)
+
+
+# Bit-wise
+
+
+def logand(x: int, y: int) -> int:
+    """Return the bit-wise AND of `x` and `y`."""
+    return x & y
+
+
+def logior(x: int, y: int) -> int:
+    """Return the bit-wise OR of `x` and `y`."""
+    return x | y
+
+
+def logxor(x: int, y: int) -> int:
+    """Return the bit-wise EXCLUSIVE OR of `x` and `y`."""
+    return x ^ y
+
+
+def lognot(x: int) -> int:
+    """Return the bit-wise NOT of `x`."""
+    return ~x
+
+
+def shift(x: int, y: int) -> int:
+    """Return `x` shifted left by `y` bits, or right if `y` is negative."""
+    return x << y if y >= 0 else x >> -y
+
+
+# Lists
+
+
+def append(e: typing.Any, list_: LispyList) -> LispyList:
+    """Return a copy of `list_` with `e` added to its end."""
+    return _make_list_like(list_, (*list_, e))
+
+
+def extend(list_1: LispyList, list_2: LispyList) -> LispyList:
+    """Return a new list of the elements of `list_1` followed by those of `list_2`."""
+    if list_1 is NIL:
+        return _make_list_like(list_2, tuple(list_2))
+
+    return _make_list_like(list_1, (*list_1, *list_2))
+
+
+def copy(list_: LispyList) -> LispyList:
+    """Return a shallow copy of `list_` which is a different object (unless it's nil)."""
+    return _make_list_like(list_, tuple(list_))
+
+
+def reverse(list_: LispyList) -> LispyList:
+    """Return a new list of the elements of `list_` in reverse order."""
+    return _make_list_like(list_, tuple(list_)[::-1])
+
+
+def length(list_: LispyList) -> int:
+    """Return the number of elements in `list_`."""
+    return len(list_)
+
+
+def efface(e: typing.Any, list_: LispyList) -> LispyList:
+    """Return a copy of `list_` without the first element equal to `e`."""
+    elements = tuple(list_)
+    for i, element in enumerate(elements):
+        if equal(e, element):
+            return _make_list_like(list_, elements[:i] + elements[i + 1 :])
+
+    return _make_list_like(list_, elements)
+
+
+# Input and output
+
+
+def print_(*e: typing.Any) -> LispyList:
+    """Write the arguments to stdout on a single line, without terminating it."""
+    sys.stdout.write(" ".join(map(format_value, e)) or " ")
+    return NIL
+
+
+def println(*e: typing.Any) -> LispyList:
+    """Write the arguments to stdout on a single line, and terminate the line."""
+    sys.stdout.write(" ".join(map(format_value, e)) + "\n")
+    return NIL
+
+
+# Mapping
+
+
+def map_(list_: LispyList, f: Callable[[LispyList], typing.Any]) -> LispyList:
+    """Return the results of calling `f` with `list_` and with each successive cdr of it."""
+    results = []
+    while list_ is not NIL:
+        results.append(f(list_))
+        list_ = list_.cdr  # type: ignore[attr-defined]
+
+    return make_list(*results)
+
+
+def mapcar(list_: LispyList, f: Callable[[typing.Any], typing.Any]) -> LispyList:
+    """Return the results of calling `f` with each element of `list_`."""
+    return make_list(*map(f, list_))
+
+
+# Vectorised recursion
+
+# Returned by `fold_numeric` and `map_numeric` if they can't compute the result.
+NOT_VECTORISED = object()
+
+# The Python types of the elements of arrays of the typecodes which can be vectorised.
+_NUMERIC_TYPECODES = {"q": int, "d": float}
+
+# The built-in functions which folds of floats call for each element, by name.
+_FOLD_STEPS: dict[str, Callable[..., Number]] = {
+    "sum": sum_,
+    "prod": prod,
+    "max": max_,
+    "min": min_,
+}
+
+
+@functools.cache
+def _import_numpy() -> types.ModuleType | None:
+    """Return NumPy, or None if it isn't installed. It's slow to import, so it's imported lazily."""
+    try:
+        import numpy
+    except ModuleNotFoundError:
+        return None
+
+    return numpy
+
+
+def _get_numeric_items(
+    list_: LispyList, element_type: type | None = None
+) -> array.array[typing.Any] | None:
+    """Return the elements of `list_` if it's stored in an array of ints or floats, or None.
+
+    If `element_type` is given, return None unless the elements are of that type too. That's
+    checked before the elements are copied.
+    """
+    items = list_._items if type(list_) is ListView else None  # type: ignore[attr-defined]
+    if not isinstance(items, array.array) or items.typecode not in _NUMERIC_TYPECODES:
+        return None
+    elif element_type is not None and _NUMERIC_TYPECODES[items.typecode] is not element_type:
+        return None
+
+    return items[list_._start :]  # type: ignore[attr-defined]
+
+
+def _fold(operator: str, items: Sequence[Number], initial: Number, element_first: bool) -> Number:
+    """Return the fold of `items` with the built-in function `operator`, from `initial`.
+
+    `operator` is called with each element and the result so far, in that order if
+    `element_first` is True.
+    """
+    if type(initial) is int:
+        match operator:
+            case "sum":
+                return builtins.sum(items, initial)
+            case "prod":
+                return math.prod(items, start=initial)
+            case "max":
+                return builtins.max(initial, builtins.max(items, default=initial))
+            case "min":
+                return builtins.min(initial, builtins.min(items, default=initial))
+
+    # Rounding makes sums and products of floats depend on the order of the operations, and
+    # `builtins.sum` compensates for rounding since Python 3.12. `max` and `min` return their first
+    # argument if the other is NaN, or if they're 0.0 and -0.0. Hence, the elements are folded one
+    # at a time, with the arguments in the same order as the lambda's.
+    step = _FOLD_STEPS[operator]
+    result = initial
+    if element_first:
+        for item in items:
+            result = step(item, result)
+    else:
+        for item in items:
+            result = step(result, item)
+
+    return result
+
+
+def fold_numeric(
+    operator: str, list_: LispyList, initial: Number, right: bool, element_first: bool
+) -> typing.Any:
+    """Return the fold of `list_` with the built-in function `operator`, starting from `initial`.
+
+    `operator` is one of `patterns.FOLD_OPERATORS`. If `right` is True, the elements are folded
+    from last to first. `operator` is called with each element and the result so far, in that
+    order if `element_first` is True. The result is the same as the lambda's: folds of ints are
+    computed all at once, and folds of floats one element at a time, without recursing.
+
+    Return `NOT_VECTORISED` if `list_` isn't stored in an array of ints or floats, or `initial`
+    isn't of the same type as the elements.
+    """
+    items = _get_numeric_items(list_, type(initial))
+    if items is None:
+        return NOT_VECTORISED
+
+    return _fold(operator, items[::-1] if right else items, initial, element_first)
+
+
+def map_numeric(function: Callable[[typing.Any], Number], list_: LispyList) -> typing.Any:
+    """Return a new list of the results of calling `function` with each element of `list_`.
+
+    `function` computes an element-wise expression of `patterns.ELEMENT_OPERATORS`. If it's
+    installed, NumPy calls it once with an array of all the elements of a list of floats.
+
+    Return `NOT_VECTORISED` if `list_` isn't stored in an array of ints or floats.
+    """
+    items = _get_numeric_items(list_)
+    if items is None:
+        return NOT_VECTORISED
+
+    if items.typecode == "d" and (numpy := _import_numpy()) is not None:
+        results = numpy.asarray(function(numpy.frombuffer(items)), dtype=numpy.float64)
+        return ListView(array.array("d", results.tobytes()))
+
+    results = [function(item) for item in items]
+    return make_array_list("d" if type(results[0]) is float else "q", *results)
+
+
+# Maps the names of the built-in functions to their implementations.
+BUILTINS: dict[str, Callable[..., typing.Any]] = {
+    function.__name__.rstrip("_"): function
+    for function in (
+        eq,
+        equal,
+        greaterp,
+        evenp,
+        lessp,
+        null,
+        member,
+        not_,
+        and_,
+        or_,
+        sum_,
+        prod,
+        diff,
+        neg,
+        inc,
+        dec,
+        div,
+        mod,
+        expt,
+        sqrt,
+        log,
+        lb,
+        lg,
+        ln,
+        recip,
+        abs_,
+        min_,
+        max_,
+        float_,
+        floor,
+        ceil,
+        trunc,
+        round_,
+        logand,
+        logior,
+        logxor,
+        lognot,
+        shift,
+        append,
+        extend,
+        copy,
+        reverse,
+        length,
+        efface,
+        print_,
+        println,
+        map_,
+        mapcar,
+    )
+}
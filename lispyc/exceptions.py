@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import NoReturn
+import copyreg
+from typing import Any, NoReturn
 
 
 class LispyError(Exception):
@@ -10,6 +11,13 @@ class LispyError(Exception):
         super().__init__(message)
         self.message = message
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        """Pickle the exception without calling `__init__`, whose parameters vary by subclass.
+
+        The message and attributes such as `name` are restored as they were.
+        """
+        return copyreg.__newobj__, (self.__class__, *self.args), self.__dict__
+
 
 class SyntaxError(LispyError):
     """Raised when a syntax error is encountered."""
@@ -76,3 +84,11 @@ class InvalidNameError(BindingError):
 
 class UnboundNameError(BindingError):
     """Raised when referencing a name that is unbound (i.e. not in scope)."""
+
+
+class NestingError(LispyError):
+    """Raised when a program's forms are nested too deeply to compile."""
+
+
+class RuntimeError(LispyError):
+    """Raised when evaluating a compiled lispy program fails."""
@@ -0,0 +1,162 @@
+"""Incremental typechecking of a program which is edited between checks, e.g. in an editor."""
+
+from __future__ import annotations
+
+import bisect
+from dataclasses import dataclass
+
+from lark.exceptions import UnexpectedInput
+
+from lispyc import sexpression
+from lispyc.exceptions import LispyError
+from lispyc.nodes import Form, Program, Type
+from lispyc.parser import parse_form
+from lispyc.typechecker import TypeChecker
+
+__all__ = ("IncrementalChecker",)
+
+# The sources are compared in chunks of this many characters, to avoid comparing each character.
+_CHUNK_SIZE = 4096
+
+
+@dataclass(frozen=True, slots=True)
+class _Entry:
+    """The result of parsing and typechecking a top-level form; either a type or an error.
+
+    If the form failed to parse, `form` is None as well.
+    """
+
+    text: str
+    form: Form | None
+    type: Type | None
+    error: LispyError | None
+
+
+class IncrementalChecker:
+    """Typecheck successive versions of a program, only checking the top-level forms which changed.
+
+    Top-level forms never refer to each other, since a binding only exists within the form which
+    creates it. Thus, each top-level form is parsed and typechecked on its own, with its own
+    unifier, and no form depends on another. The result for each form is kept along with its text,
+    which is its fingerprint.
+
+    To find the forms which changed without reading the whole source again, the source is compared
+    with the previous version. A form which ends before their common prefix or starts after their
+    common suffix is unchanged. Only the text between such forms is read again, and a form from it
+    is only checked if its text differs from every form it replaces.
+    """
+
+    def __init__(self):
+        self._source = ""
+        self._entries: list[_Entry] = []
+        self._starts: list[int] = []
+        self._ends: list[int] = []
+
+    def check(self, source: str) -> list[Type]:
+        """Typecheck the program `source` and return the types of its top-level forms.
+
+        Raise lark's UnexpectedInput if the source can't be read. Raise LispyError if a form fails
+        to parse or typecheck. As with `parse` and `TypeChecker.check_program`, the error of the
+        first form which fails to parse is raised before that of the first which fails to check.
+        """
+        self._update(source)
+
+        errors = [entry for entry in self._entries if entry.error is not None]
+        if errors:
+            entry = next((entry for entry in errors if entry.form is None), errors[0])
+            raise entry.error.with_traceback(None)  # type: ignore
+
+        return [entry.type for entry in self._entries]  # type: ignore
+
+    def _update(self, source: str) -> None:
+        """Update the entries for the new `source`.
+
+        If the source can't be read, raise an error and keep the entries for the previous source.
+        """
+        old_source = self._source
+        prefix = _common_prefix_length(old_source, source)
+        suffix = _common_suffix_length(
+            old_source, source, min(len(old_source), len(source)) - prefix
+        )
+        delta = len(source) - len(old_source)
+
+        # The character after a form, which delimits it, must be unchanged too, and likewise the
+        # character before a form.
+        first = bisect.bisect_left(self._ends, prefix)
+        last = bisect.bisect_right(self._starts, len(old_source) - suffix)
+        start = self._ends[first - 1] if first > 0 else 0
+        end = self._starts[last] + delta if last < len(self._starts) else len(source)
+
+        try:
+            body = sexpression.parse(source[start:end]).body
+        except UnexpectedInput:
+            # The changed text is not a sequence of complete forms; read the whole source instead,
+            # so that positions in the error are correct.
+            first, last, start, end = 0, len(self._entries), 0, len(source)
+            body = sexpression.parse(source).body
+
+        replaced = {entry.text: entry for entry in self._entries[first:last]}
+        entries: list[_Entry] = []
+        starts: list[int] = []
+        ends: list[int] = []
+
+        for sexp in body:
+            form_start = start + sexp.meta.start_pos
+            form_end = start + sexp.meta.end_pos
+            text = source[form_start:form_end]
+
+            entries.append(replaced.get(text) or _check_form(sexp, text))
+            starts.append(form_start)
+            ends.append(form_end)
+
+        self._source = source
+        self._entries[first:last] = entries
+        self._starts[first:] = starts + [pos + delta for pos in self._starts[last:]]
+        self._ends[first:] = ends + [pos + delta for pos in self._ends[last:]]
+
+
+def _check_form(sexp: sexpression.SExpression, text: str) -> _Entry:
+    """Parse and typecheck a top-level form in its own program."""
+    try:
+        form = parse_form(sexp)
+    except LispyError as e:
+        return _Entry(text, None, None, e)
+
+    try:
+        [type_] = TypeChecker.check_program(Program((form,)))
+    except LispyError as e:
+        return _Entry(text, form, None, e)
+
+    return _Entry(text, form, type_, None)
+
+
+def _common_prefix_length(left: str, right: str) -> int:
+    """Return the length of the longest common prefix of `left` and `right`."""
+    length = min(len(left), len(right))
+    pos = 0
+
+    while pos < length and left[pos : pos + _CHUNK_SIZE] == right[pos : pos + _CHUNK_SIZE]:
+        pos += _CHUNK_SIZE
+
+    while pos < length and left[pos] == right[pos]:
+        pos += 1
+
+    return min(pos, length)
+
+
+def _common_suffix_length(left: str, right: str, limit: int) -> int:
+    """Return the length of the longest common suffix of `left` and `right`, up to `limit`."""
+    left_end, right_end = len(left), len(right)
+    length = 0
+
+    while (
+        length + _CHUNK_SIZE <= limit
+        and left[left_end - length - _CHUNK_SIZE : left_end - length]
+        == right[right_end - length - _CHUNK_SIZE : right_end - length]
+    ):
+        length += _CHUNK_SIZE
+
+    while length < limit and left[left_end - length - 1] == right[right_end - length - 1]:
+        length += 1
+
+    return length
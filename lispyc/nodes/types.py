@@ -1,45 +1,151 @@
+from __future__ import annotations
+
+import itertools
 from collections.abc import Sequence
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 from .base import Type
 
-__all__ = ("IntType", "FloatType", "BoolType", "ListType", "FunctionType", "UnknownType")
+__all__ = (
+    "IntType",
+    "FloatType",
+    "BoolType",
+    "ListType",
+    "FunctionType",
+    "UnknownType",
+    "is_closed",
+)
 
+_unknown_type_ids = itertools.count()
 
-@dataclass(frozen=True, slots=True)
-class IntType(Type):
+# Maps the class and fields of every closed type created so far to the type.
+_interned: dict[tuple[Any, ...], Type] = {}
+
+
+class _InternedType(Type, abstract=True):
+    """Base class for types which are interned if they are closed.
+
+    A type is closed if no `UnknownType` is nested within it. Creating a closed type returns the
+    existing instance with the same fields if there is one. Thus, equal closed types are the same
+    object, and comparing them is an identity check. Since an unknown type is only equal to
+    itself, a closed type is never equal to a type which isn't closed.
+
+    Subclasses are dataclasses which don't generate `__init__` or `__eq__`; fields are set by
+    `__new__`, in the order of `__match_args__`.
+    """
+
+    __slots__ = ("_closed",)
+
+    _closed: bool
+
+    def __new__(cls, *fields: Any) -> Any:
+        """Return the interned instance of `cls` with `fields`, creating it if needed."""
+        names: tuple[str, ...] = cls.__match_args__  # type: ignore
+        if len(fields) != len(names):
+            raise TypeError(f"{cls.__name__}() takes {len(names)} arguments ({len(fields)} given)")
+
+        # Types which aren't closed are never looked up, so their fields are never hashed.
+        key = (cls, *fields)
+        if closed := all(map(_is_closed, fields)):
+            if (interned := _interned.get(key)) is not None:
+                return interned
+
+        self = super().__new__(cls)
+        for name, value in zip(names, fields):
+            object.__setattr__(self, name, value)
+
+        object.__setattr__(self, "_closed", closed)
+        if closed:
+            # If another thread created an equal type meanwhile, use the one which was interned.
+            return _interned.setdefault(key, self)
+
+        return self
+
+    def __eq__(self, other: Any) -> bool:
+        if self is other:
+            return True
+        elif other.__class__ is not self.__class__:
+            return NotImplemented
+        elif self._closed or other._closed:
+            return False
+        else:
+            return self._fields() == other._fields()
+
+    def __hash__(self) -> int:
+        return object.__hash__(self) if self._closed else hash(self._fields())
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return self.__class__, self._fields()
+
+    def _fields(self) -> tuple[Any, ...]:
+        """Return the values of the fields of this type."""
+        return tuple(getattr(self, name) for name in self.__match_args__)  # type: ignore
+
+
+def is_closed(type_: Type) -> bool:
+    """Return True if no `UnknownType` is nested within `type_`, and it is not one either."""
+    return getattr(type_, "_closed", False)
+
+
+def _is_closed(value: Any) -> bool:
+    """Return True if `value`, a field of a type, is a closed type or a tuple of them."""
+    if isinstance(value, tuple):
+        return all(map(_is_closed, value))
+
+    return is_closed(value)
+
+
+@dataclass(frozen=True, slots=True, init=False, eq=False)
+class IntType(_InternedType):
     """An integer type."""
 
 
-@dataclass(frozen=True, slots=True)
-class FloatType(Type):
+@dataclass(frozen=True, slots=True, init=False, eq=False)
+class FloatType(_InternedType):
     """A floating-point number type."""
 
 
-@dataclass(frozen=True, slots=True)
-class BoolType(Type):
+@dataclass(frozen=True, slots=True, init=False, eq=False)
+class BoolType(_InternedType):
     """A Boolean type (true or false)."""
 
 
-@dataclass(frozen=True, slots=True)
-class ListType(Type):
+@dataclass(frozen=True, slots=True, init=False, eq=False)
+class ListType(_InternedType):
     """A generic list type."""
 
     element_type: Type
 
 
-@dataclass(frozen=True, slots=True)
-class FunctionType(Type):
+@dataclass(frozen=True, slots=True, init=False, eq=False)
+class FunctionType(_InternedType):
     """A function type."""
 
     parameter_types: Sequence[Type]
     return_type: Type
 
+    def __new__(cls, parameter_types: Sequence[Type], return_type: Type) -> FunctionType:
+        """Return the interned function type, creating it if needed; parameters become a tuple."""
+        return _InternedType.__new__(cls, tuple(parameter_types), return_type)
+
 
 @dataclass(frozen=True, slots=True)
 class UnknownType(Type):
-    """A type which is currently unknown; a placeholder."""
+    """A type which is currently unknown; a placeholder.
+
+    Every instance is distinct from all others. `id` is unique for each instance and is its hash.
+    Thus, unpickling an unknown type creates a new one, e.g. when it's sent from another process;
+    unknown types which are pickled together still share instances.
+    """
+
+    id: int = field(default_factory=_unknown_type_ids.__next__)
 
     def __eq__(self, other: Any) -> bool:
         return self is other
+
+    def __hash__(self) -> int:
+        return self.id
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return UnknownType, ()
@@ -0,0 +1,4 @@
+from .folding import *
+from .inlining import *
+from .passes import *
+from .transformer import *
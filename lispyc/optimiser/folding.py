@@ -0,0 +1,250 @@
+"""Fold calls of built-in functions on constants, and remove branches and forms which do nothing.
+
+`ConstantFolder` rewrites a typechecked program bottom-up:
+
+- Calls of the built-in functions in `FOLDABLE` whose arguments are all constants are evaluated,
+  and replaced with their values. Calls which raise an error, or whose results would be very large
+  ints, are left to fail or be computed when the program runs.
+- Branches of a `Cond` whose predicates are constant are removed if false; if true, the branch's
+  value replaces the default, and the branches after it are removed. Branches of a `Select` with a
+  constant value and constant predicates are removed likewise. A `Cond` or `Select` which has no
+  branches left is replaced with its default.
+- Nested `Progn`s are flattened, and forms which are evaluated only for their side effects are
+  removed from a `Progn` or the body of a `Let` if they're pure. A `Progn` of one form is replaced
+  with it.
+
+Built-in functions are only recognised where their names aren't shadowed by bindings. Programs may
+be optimised without being typechecked, so calls of them are only folded if they can be evaluated,
+and only forms which can't raise errors when compiled or run are removed.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Sequence
+
+from lispyc import nodes
+from lispyc.codegen import runtime
+from lispyc.nodes import ComposedForm, Constant, Form, Variable
+from lispyc.typechecker import NIL
+
+from .transformer import Rewrite, Transformer, get_free_names, walk
+
+__all__ = ("FOLDABLE", "ConstantFolder")
+
+# Built-in functions which are deterministic and have no side effects, so calls of them can be
+# evaluated while compiling. `eq` isn't, since whether equal numbers are the same object can differ.
+FOLDABLE = frozenset(
+    {
+        "equal",
+        "greaterp",
+        "evenp",
+        "lessp",
+        "not",
+        "and",
+        "or",
+        "sum",
+        "prod",
+        "diff",
+        "neg",
+        "inc",
+        "dec",
+        "div",
+        "mod",
+        "expt",
+        "sqrt",
+        "log",
+        "lb",
+        "lg",
+        "ln",
+        "recip",
+        "abs",
+        "min",
+        "max",
+        "float",
+        "floor",
+        "ceil",
+        "trunc",
+        "round",
+        "logand",
+        "logior",
+        "logxor",
+        "lognot",
+        "shift",
+    }
+)
+
+# Folded ints are limited to this many bits, so big numbers aren't computed or stored in bytecode.
+_MAX_BITS = 1024
+
+
+class ConstantFolder(Transformer):
+    """Fold constant calls of built-in functions, and remove dead branches and pure forms."""
+
+    __slots__ = ()
+
+    def _transform_composed_form(self, form: ComposedForm, bound: frozenset[str]) -> Rewrite[Form]:
+        """Return a `ComposedForm`, or its value if it calls a built-in function on constants."""
+        form = yield from super()._transform_composed_form(form, bound)  # type: ignore
+
+        match form:
+            case ComposedForm(Variable(name), arguments) if (
+                name in FOLDABLE
+                and name not in bound
+                and all(isinstance(argument, Constant) for argument in arguments)
+            ):
+                values = [argument.value for argument in arguments]  # type: ignore
+                if name in ("and", "or") and any(type(value) is not bool for value in values):
+                    return form  # Called directly, they return one of their arguments.
+                elif name in ("expt", "shift") and not _is_small_power(values):
+                    return form
+
+                try:
+                    value = runtime.BUILTINS[name](*values)
+                except (ArithmeticError, ValueError, TypeError):
+                    return form
+
+                if type(value) in (bool, float) or (type(value) is int and _is_small(value)):
+                    return self._replace(form, Constant(value))
+
+        return form
+
+    def _transform_progn(self, progn: nodes.Progn, bound: frozenset[str]) -> Rewrite[Form]:
+        """Return a `Progn` without its pure leading forms, or its only remaining form."""
+        progn = yield from super()._transform_progn(progn, bound)  # type: ignore
+        forms = _remove_pure_forms(progn.forms, bound)
+
+        if len(forms) == 1:
+            return forms[0]
+
+        return self._rebuild(progn, forms=forms)
+
+    def _transform_let(self, let: nodes.Let, bound: frozenset[str]) -> Rewrite[Form]:
+        """Return a `Let` without the pure leading forms of its body."""
+        let = yield from super()._transform_let(let, bound)  # type: ignore
+        names = {binding.name.name for binding in let.bindings}
+
+        return self._rebuild(let, body=_remove_pure_forms(let.body, bound | names))
+
+    def _transform_cond(self, cond: nodes.Cond, bound: frozenset[str]) -> Rewrite[Form]:
+        """Return a `Cond` without its branches whose predicates are constant."""
+        cond = yield from super()._transform_cond(cond, bound)  # type: ignore
+        branches = []
+
+        for branch in cond.branches:
+            match branch.predicate:
+                case Constant(value) if value:
+                    default = branch.value
+                    break
+                case Constant():
+                    continue
+                case _:
+                    branches.append(branch)
+        else:
+            default = cond.default
+
+        return self._prune(cond, branches, default)
+
+    def _transform_select(self, select: nodes.Select, bound: frozenset[str]) -> Rewrite[Form]:
+        """Return a `Select` without its branches whose predicates are constant, if its value is."""
+        select = yield from super()._transform_select(select, bound)  # type: ignore
+        if not isinstance(select.value, Constant):
+            return select
+
+        branches = []
+        for branch in select.branches:
+            match branch.predicate:
+                case Constant(value) if runtime.equal(select.value.value, value):
+                    default = branch.value
+                    break
+                case Constant():
+                    continue
+                case _:
+                    branches.append(branch)
+        else:
+            default = select.default
+
+        return self._prune(select, branches, default)
+
+    def _prune(
+        self, form: nodes.Cond | nodes.Select, branches: list[nodes.Branch], default: Form
+    ) -> Form:
+        """Return `form` with only `branches` and `default`, or `default` if there are none."""
+        if not branches:
+            return self._replace(form, default)
+
+        return self._rebuild(form, branches=tuple(branches), default=default)
+
+
+def _remove_pure_forms(forms: Sequence[Form], bound: frozenset[str]) -> tuple[Form, ...]:
+    """Return `forms` with nested `Progn`s flattened and pure forms removed, except the last."""
+    flattened: list[Form] = []
+    for form in forms:
+        if isinstance(form, nodes.Progn):
+            flattened.extend(form.forms)
+        else:
+            flattened.append(form)
+
+    *leading, last = flattened
+    return (*(form for form in leading if not _is_pure(form, bound)), last)
+
+
+def _is_pure(form: Form, bound: frozenset[str]) -> bool:
+    """Return True if evaluating `form` can't have side effects or raise an error.
+
+    `bound` are the names bound in the scope of `form`.
+    """
+    forms = [form]
+    while forms:
+        match forms.pop():
+            case Constant():
+                pass
+            case Variable(name) if _is_defined(name, bound):
+                pass
+            case nodes.Lambda() as lambda_ if _is_compilable(lambda_, bound):
+                pass
+            case nodes.List(elements):
+                forms.extend(elements)
+            case nodes.Cons(car, cdr):
+                forms += (car, cdr)
+            case _:
+                return False
+
+    return True
+
+
+def _is_defined(name: str, bound: frozenset[str]) -> bool:
+    """Return True if `name` refers to a binding, nil, or a built-in function.
+
+    Otherwise, referring to it raises UnboundNameError when compiled.
+    """
+    return name in bound or name == NIL or name in runtime.BUILTINS
+
+
+def _is_compilable(lambda_: nodes.Lambda, bound: frozenset[str]) -> bool:
+    """Return True if `lambda_` can be compiled, i.e. every name it uses or assigns is defined.
+
+    Only bindings can be assigned, so if a free name is assigned anywhere in the lambda, it's
+    treated as undefined, even if the assignment is to a binding of the same name in the lambda.
+    """
+    free = get_free_names(lambda_, bound)
+    assigned = {form.name.name for form in walk(lambda_) if isinstance(form, nodes.Set)}
+
+    return free.isdisjoint(assigned) and all(_is_defined(name, bound) for name in free)
+
+
+def _is_small(value: int) -> bool:
+    """Return True if the int `value` is small enough to be folded."""
+    return value.bit_length() <= _MAX_BITS
+
+
+def _is_small_power(values: list[int | float | bool]) -> bool:
+    """Return True if `expt` or `shift` of the ints `values` gives an int small enough to fold."""
+    if len(values) != 2:
+        return True  # The call raises TypeError.
+
+    x, y = values
+    if not isinstance(x, int) or not isinstance(y, int) or y <= 0:
+        return True
+
+    return _is_small(x) and math.log2(max(abs(x), 2)) * y <= _MAX_BITS
@@ -0,0 +1,327 @@
+"""Inline small lambdas which are bound by a `let` and only called directly.
+
+`LambdaInliner` rewrites a program bottom-up. A binding of a `Let` to a `Lambda` is a helper if
+its body has at most `INLINE_BUDGET` nodes, and within the body of the `Let`:
+
+- its name is never assigned with `set`,
+- its name is only used to call it directly with as many arguments as it has parameters, so the
+  lambda doesn't escape, and
+- none of its calls are in a scope which binds a name which is free in the lambda's body, so the
+  names in the body refer to the same bindings wherever the lambda is called.
+
+Each call of a helper is replaced with its body. Arguments which are constants, or variables which
+are never assigned with `set`, are substituted for their parameters, unless the parameter is
+assigned in the body or the body binds the variable's name. The last other argument is moved to
+its parameter's only use in the body if nothing but constants and such variables is evaluated
+before it. The other parameters are bound to their arguments by a `Let` around the body, so those
+arguments are still evaluated once, in order. The helper's binding is then removed, and a `Let`
+with no bindings left is replaced with its body.
+"""
+
+from __future__ import annotations
+
+import itertools
+from collections import Counter
+from collections.abc import Iterator, Sequence
+
+from lispyc import nodes
+from lispyc.codegen import runtime
+from lispyc.nodes import ComposedForm, Constant, Form, Node, Program, Variable
+from lispyc.typechecker import NIL, TypeTable
+
+from .transformer import NameFinder, Rewrite, Transformer, count_nodes, get_free_names, walk
+
+__all__ = ("INLINE_BUDGET", "LambdaInliner")
+
+# The most nodes the body of a lambda can have to be inlined at each of its calls.
+INLINE_BUDGET = 32
+
+
+class LambdaInliner(Transformer):
+    """Inline the calls of small lambdas bound by a `let` which don't escape it."""
+
+    __slots__ = ("_assigned",)
+
+    def __init__(self, table: TypeTable | None = None):
+        super().__init__(table)
+        self._assigned: frozenset[str] = frozenset()
+
+    def _prepare(self, program: Program) -> None:
+        """Find the names which are assigned anywhere in `program`."""
+        self._assigned = _get_assigned_names(program)
+
+    def _transform_let(self, let: nodes.Let, bound: frozenset[str]) -> Rewrite[Form]:
+        """Return a `Let` with its helpers' calls inlined and their bindings removed."""
+        let = yield from super()._transform_let(let, bound)  # type: ignore
+        helpers = _find_helpers(let)
+        if not helpers:
+            return let
+
+        names = {binding.name.name for binding in let.bindings}
+        inliner = _CallInliner(self._table, helpers, bound | names, self._assigned)
+        self._share_types(inliner)
+        body = tuple(inliner._transform(form, frozenset()) for form in let.body)
+
+        bindings = tuple(binding for binding in let.bindings if binding.name.name not in helpers)
+        if bindings:
+            return self._rebuild(let, bindings=bindings, body=body)
+        elif len(body) == 1:
+            return self._replace(let, body[0])
+        else:
+            return self._replace(let, nodes.Progn(body))
+
+
+class _CallInliner(Transformer):
+    """Replace the calls of `helpers` with their bodies; see `LambdaInliner`.
+
+    The names given to its methods are those bound between the `Let` of the helpers and the form,
+    and `outer` are the names bound in the body of the `Let`. `assigned` are the names which are
+    assigned anywhere in the program.
+    """
+
+    __slots__ = ("_helpers", "_outer", "_assigned")
+
+    def __init__(
+        self,
+        table: TypeTable | None,
+        helpers: dict[str, nodes.Lambda],
+        outer: frozenset[str],
+        assigned: frozenset[str],
+    ):
+        super().__init__(table)
+        self._helpers = helpers
+        self._outer = outer
+        self._assigned = assigned
+
+    def _transform_composed_form(self, form: ComposedForm, bound: frozenset[str]) -> Rewrite[Form]:
+        """Return a `ComposedForm`, or the body of the helper it calls."""
+        form = yield from super()._transform_composed_form(form, bound)  # type: ignore
+
+        match form:
+            case ComposedForm(Variable(name), arguments) if (
+                name in self._helpers and name not in bound
+            ):
+                return self._replace(form, self._inline(self._helpers[name], arguments, bound))
+
+        return form
+
+    def _inline(
+        self, lambda_: nodes.Lambda, arguments: Sequence[Form], bound: frozenset[str]
+    ) -> Form:
+        """Return the body of `lambda_` evaluated with `arguments`, where `bound` are bound."""
+        body = lambda_.body
+        parameters = [parameter.name for parameter in lambda_.parameters]
+        assigned = _get_assigned_names(body)
+        # Substituted arguments mustn't be captured by names bound in the body, or by parameters
+        # which the `Let` binds.
+        capturing = _get_bound_names(body) | {parameter.name for parameter in parameters}
+
+        values: dict[str, Form] = {}
+        bindings = []
+        # Only the last argument which isn't a constant or variable can be moved into the body;
+        # moving any other would change the order in which the arguments are evaluated. Large
+        # arguments aren't moved, so inlining deeply nested calls doesn't search them repeatedly.
+        movable = True
+        for parameter, argument in zip(reversed(parameters), reversed(arguments)):
+            name = parameter.name
+            match argument:
+                case Constant() if name not in assigned:
+                    values[name] = argument
+                    continue
+                case Variable(variable) if (
+                    name not in assigned
+                    and variable not in self._assigned
+                    and (variable == name or variable not in capturing)
+                    and self._is_bound(variable, bound)
+                ):
+                    values[name] = argument
+                    continue
+
+            if (
+                movable
+                and name not in assigned
+                and name not in capturing - {name}
+                and _is_small(argument)
+            ):
+                if get_free_names(argument).isdisjoint(capturing) and self._is_evaluated_first(
+                    body, name
+                ):
+                    values[name] = argument
+                else:
+                    bindings.append(nodes.LetBinding(parameter, argument))
+            else:
+                bindings.append(nodes.LetBinding(parameter, argument))
+
+            movable = False
+
+        if values:
+            substituter = _Substituter(self._table, values)
+            self._share_types(substituter)
+            body = substituter._transform(body, frozenset())
+
+        if bindings:
+            return self._replace(body, nodes.Let(tuple(reversed(bindings)), (body,)))
+
+        return body
+
+    def _is_evaluated_first(self, body: Form, name: str) -> bool:
+        """Return True if an argument can be evaluated at the only use of `name` in `body`.
+
+        That's if only constants and names which are never assigned are evaluated before it.
+        """
+        uses = [form for form in walk(body) if isinstance(form, Variable) and form.name == name]
+        if len(uses) != 1:
+            return False
+
+        for form in _evaluate(body):
+            match form:
+                case _ if form is uses[0]:
+                    return True
+                case Constant():
+                    continue
+                case Variable(variable) if variable not in self._assigned:
+                    continue
+                case _:
+                    return False
+
+        return False
+
+    def _is_bound(self, name: str, bound: frozenset[str]) -> bool:
+        """Return True if `name` refers to a binding, nil, or a built-in function here."""
+        return name in bound or name in self._outer or name == NIL or name in runtime.BUILTINS
+
+
+class _Substituter(Transformer):
+    """Replace the variables whose names are keys of `values` with the forms they map to."""
+
+    __slots__ = ("_values",)
+
+    def __init__(self, table: TypeTable | None, values: dict[str, Form]):
+        super().__init__(table)
+        self._values = values
+
+    def _transform_variable(self, variable: Variable, bound: frozenset[str]) -> Form:
+        """Return the form which replaces a `Variable`, unless its name is shadowed."""
+        if variable.name in self._values and variable.name not in bound:
+            return self._replace(variable, self._values[variable.name])
+
+        return variable
+
+
+class _CallFinder(NameFinder):
+    """Find the free names which forms use, and how they use them, without rewriting the forms.
+
+    `uses` maps each free name to a list of its uses: the names bound where it's called directly
+    with `arity[name]` arguments, or None for other uses.
+    """
+
+    __slots__ = ("_arity", "uses")
+
+    def __init__(self, arity: dict[str, int]):
+        super().__init__()
+        self._arity = arity
+        self.uses: dict[str, list[frozenset[str] | None]] = {}
+
+    def _use(self, name: str, bound: frozenset[str], call: bool = False) -> None:
+        """Record a use of `name` where `bound` are bound, which is a direct call if `call`."""
+        if name not in bound:
+            super()._use(name, bound)
+            self.uses.setdefault(name, []).append(bound if call else None)
+
+    def _transform_composed_form(self, form: ComposedForm, bound: frozenset[str]) -> Rewrite[Form]:
+        """Record the call of a `ComposedForm` if it's a direct call with the expected arguments."""
+        match form:
+            case ComposedForm(Variable(name), arguments) if len(arguments) == self._arity.get(name):
+                self._use(name, bound, call=True)
+                yield from self._transform_forms(arguments, bound)
+                return form
+
+        return (yield from super()._transform_composed_form(form, bound))
+
+
+def _find_helpers(let: nodes.Let) -> dict[str, nodes.Lambda]:
+    """Return the lambdas of the bindings of `let` which can be inlined, by name."""
+    counts = Counter(binding.name.name for binding in let.bindings)
+    candidates = {
+        binding.name.name: binding.value
+        for binding in let.bindings
+        if isinstance(binding.value, nodes.Lambda)
+        and counts[binding.name.name] == 1
+        and count_nodes(binding.value.body) < INLINE_BUDGET
+    }
+    if not candidates:
+        return {}
+
+    finder = _CallFinder({name: len(lambda_.parameters) for name, lambda_ in candidates.items()})
+    for form in let.body:
+        finder._transform(form, frozenset())
+
+    helpers = {}
+    for name, lambda_ in candidates.items():
+        free = get_free_names(lambda_)
+        if free.isdisjoint(counts) and all(
+            scope is not None and free.isdisjoint(scope) for scope in finder.uses.get(name, [])
+        ):
+            helpers[name] = lambda_
+
+    return helpers
+
+
+def _is_small(form: Form) -> bool:
+    """Return True if `form` has at most `INLINE_BUDGET` nodes, without walking a larger one."""
+    return sum(1 for _ in itertools.islice(walk(form), INLINE_BUDGET + 1)) <= INLINE_BUDGET
+
+
+def _get_assigned_names(node: Node) -> frozenset[str]:
+    """Return the names which are assigned with `set` anywhere within `node`."""
+    return frozenset(set_.name.name for set_ in walk(node) if isinstance(set_, nodes.Set))
+
+
+def _get_bound_names(node: Node) -> frozenset[str]:
+    """Return the names which are bound by a `Let` or `Lambda` anywhere within `node`."""
+    names: set[str] = set()
+    for form in walk(node):
+        if isinstance(form, nodes.Let):
+            names.update(binding.name.name for binding in form.bindings)
+        elif isinstance(form, nodes.Lambda):
+            names.update(parameter.name.name for parameter in form.parameters)
+
+    return frozenset(names)
+
+
+def _evaluate(form: Form) -> Iterator[Form | None]:
+    """Yield the forms which evaluating `form` evaluates, in order, until one which may not be.
+
+    Only constants, variables, calls, `car`, `cdr`, and `set` are yielded. If the next form to be
+    evaluated depends on a condition, None is yielded instead, and then no more forms are.
+    """
+    match form:
+        case Constant() | Variable():
+            yield form
+        case ComposedForm(name, arguments):
+            for part in (name, *arguments):
+                yield from _evaluate(part)
+            yield form
+        case nodes.List(parts) | nodes.Progn(parts):
+            for part in parts:
+                yield from _evaluate(part)
+        case nodes.Cons(car, cdr):
+            yield from _evaluate(car)
+            yield from _evaluate(cdr)
+        case nodes.Car(list_) | nodes.Cdr(list_):
+            yield from _evaluate(list_)
+            yield form
+        case nodes.Set(_, value):
+            yield from _evaluate(value)
+            yield form
+        case nodes.Let(bindings, body):
+            for binding in bindings:
+                yield from _evaluate(binding.value)
+            for part in body:
+                yield from _evaluate(part)
+        case nodes.Cond(branches):
+            yield from _evaluate(branches[0].predicate)
+            yield None
+        case nodes.Select(value):
+            yield from _evaluate(value)
+            yield None
@@ -0,0 +1,38 @@
+"""Run the optimisation passes over a program, between typechecking and code generation."""
+
+from __future__ import annotations
+
+from lispyc.instrumentation import current_metrics, phase
+from lispyc.nodes import Program
+from lispyc.typechecker import TypeTable
+
+from .folding import ConstantFolder
+from .inlining import LambdaInliner
+from .transformer import Optimised, Transformer
+
+__all__ = ("PASSES", "optimise")
+
+# The passes which `optimise` runs, in order. Inlining comes first, so that the forms it removes
+# from lets can be folded.
+PASSES: tuple[type[Transformer], ...] = (LambdaInliner, ConstantFolder)
+
+
+def optimise(program: Program, table: TypeTable | None = None) -> Optimised:
+    """Run each of `PASSES` over `program`, whose types are in `table` if given.
+
+    The optimised program has the same types table as the original, except that rewritten forms
+    have the types of the forms they replaced. The optimisations don't change the program's
+    behaviour, but may remove errors which would be raised by forms that are never evaluated.
+    """
+    removed = 0
+
+    with phase("optimise"):
+        for pass_ in PASSES:
+            optimised = pass_.transform_program(program, table)
+            program, table = optimised.program, optimised.table
+            removed += optimised.removed
+
+    if (metrics := current_metrics()) is not None:
+        metrics.count("nodes_removed", removed)
+
+    return Optimised(program, table, removed)
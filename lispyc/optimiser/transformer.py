@@ -0,0 +1,336 @@
+"""The base class of optimisation passes, which rewrite the forms of a typechecked program."""
+
+from __future__ import annotations
+
+import dataclasses
+import typing
+from collections.abc import Generator, Iterator, Sequence
+from dataclasses import dataclass
+
+from lispyc import nodes
+from lispyc.nodes import ComposedForm, Constant, Form, Node, Program, Type, Variable
+from lispyc.typechecker import TypeTable
+
+__all__ = (
+    "NameFinder",
+    "Optimised",
+    "Rewrite",
+    "Transformer",
+    "count_nodes",
+    "get_free_names",
+    "walk",
+)
+
+_Bound = frozenset[str]
+
+T = typing.TypeVar("T")
+
+# A generator which rewrites a form and returns the result. To rewrite a nested form, it yields the
+# form along with the names bound in its scope, and then it is sent the rewritten form.
+Rewrite = Generator[tuple[Form, _Bound], Form, T]
+
+
+@dataclass(frozen=True, slots=True)
+class Optimised:
+    """An optimised program, the types of its forms if known, and the number of nodes removed.
+
+    `removed` is the net number, which is negative if inlining added more nodes than were removed.
+    """
+
+    program: Program
+    table: TypeTable | None
+    removed: int
+
+
+class Transformer:
+    """Rewrite the forms of a program bottom-up; subclasses override `_transform_<id>` methods.
+
+    The default methods transform the nested forms and rebuild a form only if one of them changed,
+    so forms which aren't rewritten keep their identity, and with it their entry in the types table.
+    A rewritten form takes the type of the form it replaces, unless it's already in the table.
+
+    Each method gets the names bound where the form is, which shadow the built-in functions. The
+    methods of forms other than constants and variables are generators, like the checks of
+    `TypeChecker`: to rewrite a nested form, they yield it along with the names bound in its scope,
+    and then they're sent the rewritten form. An override calls the default method with
+    `yield from`.
+    """
+
+    __slots__ = ("_table", "_types", "_replacements")
+
+    def __init__(self, table: TypeTable | None = None):
+        self._table = table
+        self._types: dict[int, Type] = {}
+        # Keeps replacements alive, so their ids in `_types` can't be reused by other objects.
+        self._replacements: list[Form] = []
+
+    @classmethod
+    def transform_program(cls, program: Program, table: TypeTable | None = None) -> Optimised:
+        """Rewrite the forms of `program`, whose types are in `table` if given."""
+        transformer = cls(table)
+        transformer._prepare(program)
+        body = tuple(transformer._transform(form, frozenset()) for form in program.body)
+
+        if all(new is old for new, old in zip(body, program.body)):
+            return Optimised(program, table, 0)
+
+        optimised = Program(body)
+        removed = count_nodes(program) - count_nodes(optimised)
+
+        return Optimised(optimised, transformer._create_table(optimised), removed)
+
+    def _prepare(self, program: Program) -> None:
+        """Prepare to rewrite the forms of `program`; subclasses can gather information here."""
+
+    def _transform(self, form: Form, bound: _Bound) -> Form:
+        """Return `form` rewritten, where `bound` are the names bound in its scope.
+
+        Nested forms are rewritten with an explicit stack of rewrites rather than recursively, so
+        the depth of nesting is not limited by the recursion limit.
+        """
+        rewrites: list[Rewrite[Form]] = []
+
+        while True:
+            if isinstance(form, Variable):
+                result: Form | None = self._transform_variable(form, bound)
+            elif isinstance(form, Constant):
+                result = self._transform_constant(form, bound)
+            else:
+                rewrites.append(self._create_rewrite(form, bound))
+                result = None  # Start the new rewrite.
+
+            # Resume the innermost rewrite until it yields a nested form or there are none left.
+            while rewrites:
+                try:
+                    form, bound = rewrites[-1].send(result)  # type: ignore[arg-type]
+                    break
+                except StopIteration as e:
+                    rewrites.pop()
+                    result = e.value
+            else:
+                assert result is not None
+                return result
+
+    def _create_rewrite(self, form: Form, bound: _Bound) -> Rewrite[Form]:
+        """Return a rewrite of a `Form` other than a constant or variable."""
+        try:
+            transform = getattr(self, _TRANSFORMERS[type(form)])
+        except KeyError:
+            raise TypeError(f"Unknown form {form!r}.") from None
+
+        return transform(form, bound)
+
+    def _transform_forms(self, forms: Sequence[Form], bound: _Bound) -> Rewrite[tuple[Form, ...]]:
+        """Rewrite `forms`, where `bound` are the names bound in their scope, and return them."""
+        transformed = []
+        for form in forms:
+            transformed.append((yield form, bound))
+
+        return tuple(transformed)
+
+    def _replace(self, old: Form, new: Form) -> Form:
+        """Return `new`, which replaces `old`; it gets the type of `old` if it has none."""
+        if (
+            new is not old
+            and self._table is not None
+            and new not in self._table
+            and id(new) not in self._types
+            and (type_ := self._types.get(id(old), self._table.get(old))) is not None
+        ):
+            self._types[id(new)] = type_
+            self._replacements.append(new)
+
+        return new
+
+    def _share_types(self, other: Transformer) -> None:
+        """Have `other` record the types of the forms it rewrites along with this transformer's."""
+        other._types, other._replacements = self._types, self._replacements
+
+    def _rebuild(self, form: Form, **fields: typing.Any) -> Form:
+        """Return `form` with `fields` replaced, or `form` itself if none of them changed."""
+        if all(_is_same(getattr(form, name), value) for name, value in fields.items()):
+            return form
+
+        return self._replace(form, dataclasses.replace(form, **fields))  # type: ignore
+
+    def _create_table(self, program: Program) -> TypeTable | None:
+        """Return the types table of the rewritten `program`, if the original's was given."""
+        if self._table is None:
+            return None
+
+        types = {}
+        for node in walk(program):
+            if isinstance(node, Form):
+                type_ = self._types.get(id(node), self._table.get(node))
+                if type_ is not None:
+                    types[id(node)] = type_
+
+        return TypeTable(program, types)
+
+    def _transform_constant(self, constant: Constant, bound: _Bound) -> Form:
+        """Return a `Constant` rewritten."""
+        return constant
+
+    def _transform_variable(self, variable: Variable, bound: _Bound) -> Form:
+        """Return a `Variable` rewritten."""
+        return variable
+
+    def _transform_composed_form(self, form: ComposedForm, bound: _Bound) -> Rewrite[Form]:
+        """Return a `ComposedForm` rewritten."""
+        name = yield form.name, bound
+        arguments = yield from self._transform_forms(form.arguments, bound)
+
+        return self._rebuild(form, name=name, arguments=arguments)
+
+    def _transform_lambda(self, lambda_: nodes.Lambda, bound: _Bound) -> Rewrite[Form]:
+        """Return a `Lambda` rewritten; its parameters are bound in its body."""
+        parameters = {parameter.name.name for parameter in lambda_.parameters}
+        body = yield lambda_.body, bound | parameters
+
+        return self._rebuild(lambda_, body=body)
+
+    def _transform_list(self, list_: nodes.List, bound: _Bound) -> Rewrite[Form]:
+        """Return a `List` rewritten."""
+        elements = yield from self._transform_forms(list_.elements, bound)
+        return self._rebuild(list_, elements=elements)
+
+    def _transform_cons(self, cons: nodes.Cons, bound: _Bound) -> Rewrite[Form]:
+        """Return a `Cons` rewritten."""
+        car = yield cons.car, bound
+        cdr = yield cons.cdr, bound
+
+        return self._rebuild(cons, car=car, cdr=cdr)
+
+    def _transform_car(self, car: nodes.Car, bound: _Bound) -> Rewrite[Form]:
+        """Return a `Car` rewritten."""
+        return self._rebuild(car, list=(yield car.list, bound))
+
+    def _transform_cdr(self, cdr: nodes.Cdr, bound: _Bound) -> Rewrite[Form]:
+        """Return a `Cdr` rewritten."""
+        return self._rebuild(cdr, list=(yield cdr.list, bound))
+
+    def _transform_progn(self, progn: nodes.Progn, bound: _Bound) -> Rewrite[Form]:
+        """Return a `Progn` rewritten."""
+        forms = yield from self._transform_forms(progn.forms, bound)
+        return self._rebuild(progn, forms=forms)
+
+    def _transform_set(self, set_: nodes.Set, bound: _Bound) -> Rewrite[Form]:
+        """Return a `Set` rewritten; the name it assigns is left as it is."""
+        return self._rebuild(set_, value=(yield set_.value, bound))
+
+    def _transform_let(self, let: nodes.Let, bound: _Bound) -> Rewrite[Form]:
+        """Return a `Let` rewritten; its names are bound in its body but not in its values."""
+        bindings = []
+        for binding in let.bindings:
+            bindings.append(_rebuild_node(binding, value=(yield binding.value, bound)))
+
+        names = {binding.name.name for binding in let.bindings}
+        body = yield from self._transform_forms(let.body, bound | names)
+
+        return self._rebuild(let, bindings=tuple(bindings), body=body)
+
+    def _transform_branches(
+        self, branches: Sequence[nodes.Branch], bound: _Bound
+    ) -> Rewrite[tuple[nodes.Branch, ...]]:
+        """Rewrite the branches of a `Cond` or `Select` and return them."""
+        transformed = []
+        for branch in branches:
+            predicate = yield branch.predicate, bound
+            value = yield branch.value, bound
+            transformed.append(_rebuild_node(branch, predicate=predicate, value=value))
+
+        return tuple(transformed)
+
+    def _transform_cond(self, cond: nodes.Cond, bound: _Bound) -> Rewrite[Form]:
+        """Return a `Cond` rewritten."""
+        branches = yield from self._transform_branches(cond.branches, bound)
+        default = yield cond.default, bound
+
+        return self._rebuild(cond, branches=branches, default=default)
+
+    def _transform_select(self, select: nodes.Select, bound: _Bound) -> Rewrite[Form]:
+        """Return a `Select` rewritten."""
+        value = yield select.value, bound
+        branches = yield from self._transform_branches(select.branches, bound)
+        default = yield select.default, bound
+
+        return self._rebuild(select, value=value, branches=branches, default=default)
+
+
+class NameFinder(Transformer):
+    """Find the names which forms use but don't bind, without rewriting the forms.
+
+    `free` is the set of names which are referred to or assigned but bound neither in the forms
+    nor in the names given with them. Subclasses can record more about each use in `_use`.
+    """
+
+    __slots__ = ("free",)
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.free: set[str] = set()
+
+    def _use(self, name: str, bound: _Bound) -> None:
+        """Record a use of `name` where `bound` are bound."""
+        if name not in bound:
+            self.free.add(name)
+
+    def _transform_variable(self, variable: Variable, bound: _Bound) -> Form:
+        """Record a use of a `Variable`."""
+        self._use(variable.name, bound)
+        return variable
+
+    def _transform_set(self, set_: nodes.Set, bound: _Bound) -> Rewrite[Form]:
+        """Record the assignment of a `Set`."""
+        self._use(set_.name.name, bound)
+        return (yield from super()._transform_set(set_, bound))
+
+
+# The name of the method which rewrites each type of form other than constants and variables.
+_TRANSFORMERS: dict[type[Form], str] = {
+    ComposedForm: "_transform_composed_form",
+    **{form: f"_transform_{id_}" for id_, form in nodes.SpecialForm.forms_map.items()},
+}
+
+
+def count_nodes(node: Node) -> int:
+    """Return the number of nodes within `node`, not counting `node` itself."""
+    return sum(1 for _ in walk(node)) - 1
+
+
+def get_free_names(form: Form, bound: _Bound = frozenset()) -> set[str]:
+    """Return the names which are used in `form` but not bound in it or in `bound`."""
+    finder = NameFinder()
+    finder._transform(form, bound)
+    return finder.free
+
+
+def walk(node: Node) -> Iterator[Node]:
+    """Yield `node` and every node nested within it."""
+    stack: list[typing.Any] = [node]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, Node):
+            yield value
+            stack.extend(getattr(value, field_.name) for field_ in dataclasses.fields(value))
+        elif isinstance(value, tuple | list):
+            stack.extend(value)
+
+
+def _is_same(old: typing.Any, new: typing.Any) -> bool:
+    """Return True if `new` is `old`, or a sequence of the same objects as the sequence `old`."""
+    if isinstance(new, tuple):
+        return len(new) == len(old) and all(x is y for x, y in zip(new, old))
+
+    return new is old
+
+
+_N = typing.TypeVar("_N", nodes.Branch, nodes.LetBinding)
+
+
+def _rebuild_node(node: _N, **fields: typing.Any) -> _N:
+    """Return `node`, which isn't a form, with `fields` replaced if any of them changed."""
+    if all(_is_same(getattr(node, name), value) for name, value in fields.items()):
+        return node
+
+    return dataclasses.replace(node, **fields)
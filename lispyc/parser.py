@@ -1,10 +1,30 @@
+import threading
+
 from lispyc import exceptions, nodes, sexpression
 from lispyc.exceptions import TypeSyntaxError
+from lispyc.instrumentation import phase
 from lispyc.sexpression import Atom, List, Program, SExpression
 
 __all__ = ("parse", "parse_form", "parse_program", "parse_type")
 
 
+# Lists nested deeper than this are parsed with an explicit stack rather than recursively.
+_MAX_RECURSION_DEPTH = 100
+
+
+class _ParseState(threading.local):
+    """The state of the `parse_form` call in progress on the current thread, if any."""
+
+    def __init__(self):
+        self.depth = 0
+        # Maps the ids of list S-expressions to their forms or to the errors from parsing them.
+        self.parsed: dict[int, nodes.Form | exceptions.LispyError] | None = None
+
+
+_state = _ParseState()
+_special_forms = nodes.SpecialForm.forms_map
+
+
 def parse(program: str) -> nodes.Program:
     """Parse a lispy program into an AST."""
     program_node = sexpression.parse(program)
@@ -12,28 +32,81 @@ def parse(program: str) -> nodes.Program:
 
 
 def parse_form(form: SExpression) -> nodes.Form:
-    """Parse an `SExpression` into a `Form`."""
-    match form:
-        case Atom(str() as value):
-            return nodes.Variable(value)
-        case Atom(int() | float() | bool() as value):
-            return nodes.Constant(value)
-        case List([Atom(str() as name), *_]) if name in nodes.SpecialForm.forms_map:
-            return nodes.SpecialForm.forms_map[name].from_sexp(form)
-        case List([name, *forms]):
-            name = parse_form(name)
-            arguments = tuple(map(parse_form, forms))
-            return nodes.ComposedForm(name, arguments)
-        case List([]):
+    """Parse an `SExpression` into a `Form`.
+
+    Lists are parsed recursively up to a fixed depth. Lists nested any deeper are parsed with an
+    explicit stack, so the depth of nesting is not limited by the recursion limit.
+    """
+    if isinstance(form, List):
+        if not form.elements:
             return nodes.List(())  # It's nil.
-        case _:  # pragma: no cover
-            # Precaution; unreachable in practice because the match is (currently) exhaustive.
-            raise exceptions.SyntaxError("Invalid syntax: unknown form for S-expression")
+
+        state = _state
+        if (parsed := state.parsed) is not None:
+            # Called by a special form's from_sexp() from within _parse_nested_lists().
+            result = parsed[id(form)]
+            if isinstance(result, exceptions.LispyError):
+                raise result
+
+            return result
+
+        if state.depth >= _MAX_RECURSION_DEPTH:
+            return _parse_nested_lists(form, state)
+
+        state.depth += 1
+        try:
+            return _parse_list(form)
+        finally:
+            state.depth -= 1
+
+    value = form.value
+    if isinstance(value, str):
+        return nodes.Variable(value)
+    else:
+        return nodes.Constant(value)
+
+
+def _parse_nested_lists(form: List, state: _ParseState) -> nodes.Form:
+    """Parse `form` and every non-empty list nested in it, from the innermost lists outwards.
+
+    Whether a nested list is a form depends on the syntax of the special form which contains it;
+    some are e.g. parameters or bindings instead. However, parsing a list as a form doesn't depend
+    on where the list is. Thus, every list is parsed as a form before the lists which contain it,
+    and `parse_form` only has to look up the result. Errors are stored rather than raised, and are
+    only raised if `parse_form` looks up the list.
+    """
+    # Breadth-first order; each list comes after the list which contains it.
+    lists = [form]
+    for current in lists:
+        lists.extend(e for e in current.elements if isinstance(e, List) and e.elements)
+
+    state.parsed = parsed = {}
+    try:
+        for current in reversed(lists):
+            try:
+                parsed[id(current)] = _parse_list(current)
+            except exceptions.LispyError as e:
+                parsed[id(current)] = e
+
+        return parse_form(form)
+    finally:
+        state.parsed = None
+
+
+def _parse_list(form: List) -> nodes.Form:
+    """Parse a non-empty list `SExpression` into a `Form`."""
+    name, *forms = form.elements
+    if isinstance(name, Atom) and (special_form := _special_forms.get(name.value)) is not None:
+        return special_form.from_sexp(form)
+
+    return nodes.ComposedForm(parse_form(name), tuple(map(parse_form, forms)))
 
 
 def parse_program(program: Program) -> nodes.Program:
     """Parse the `SExpression`s in a `Program` into `Form`s."""
-    body = tuple(map(parse_form, program.body))
+    with phase("parse_form"):
+        body = tuple(map(parse_form, program.body))
+
     return nodes.Program(body)
 
 
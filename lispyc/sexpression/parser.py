@@ -1,38 +1,114 @@
 # pyright: reportPrivateImportUsage=false
-from typing import Any, cast
+import functools
+import importlib
+import importlib.resources
+from typing import Any, Literal, cast, get_args
 
 import lark
 from lark import Lark
 from lark.ast_utils import create_transformer  # pyright: ignore [reportUnknownVariableType]
 
+from lispyc.instrumentation import phase
+
 from . import nodes
+from .reader import read
 
-__all__ = ("parse",)
+__all__ = ("Backend", "parse")
 
+Backend = Literal["native", "lalr", "earley", "standalone"]
+
+# Generated from grammar.lark by `make standalone`.
+_STANDALONE_MODULE = f"{__package__}._standalone"
 
-class AstTransformer(lark.Transformer[lark.Token, nodes.Program]):
-    """Transform a lispy parse tree (CST) into an S-expression AST."""
+
+class _TokenConverters:
+    """Convert the tokens of a lispy parse tree (CST) into Python objects."""
 
     SIGNED_INT = int
     FLOAT = float
     LITERAL_ATOM = str
 
-    def BOOL(self, token: lark.Token) -> bool:  # noqa: N802
+    def BOOL(self, token: str) -> bool:  # noqa: N802
         """Convert the current token to a Python `bool`."""
         return token == "true"
 
-    def WS(self, _: lark.Token) -> Any:  # noqa: N802
-        """Discard the current whitespace token."""
-        return lark.visitors.Discard
 
+class AstTransformer(_TokenConverters, lark.Transformer[lark.Token, nodes.Program]):
+    """Transform a lispy parse tree (CST) into an S-expression AST."""
+
+
+def _load_standalone() -> tuple[Any, Any]:
+    """Return the standalone parser and a transformer built from the standalone module's classes.
+
+    The standalone module bundles its own copies of lark's classes. A parse tree it produces can
+    only be transformed by a `Transformer` from the same module.
+    """
+    try:
+        module = importlib.import_module(_STANDALONE_MODULE)
+    except ModuleNotFoundError as e:
+        if e.name != _STANDALONE_MODULE:
+            raise  # pragma: no cover
+
+        raise ModuleNotFoundError(
+            "The standalone parser has not been generated; run `make standalone` to generate it.",
+            name=_STANDALONE_MODULE,
+        ) from None
+
+    transformer_cls = type("StandaloneAstTransformer", (_TokenConverters, module.Transformer), {})
+    transformer = create_transformer(nodes, transformer_cls(), module.v_args)
+
+    return module.Lark_StandAlone(), transformer
+
+
+@functools.cache
+def _get_parser(backend: Backend) -> tuple[Any, Any]:
+    """Return the parser and transformer for the given `backend`, creating them if needed.
+
+    Nothing is created until a backend is first used, so importing this module stays cheap. The
+    grammar is read from the package's resources rather than from a path relative to the working
+    directory. The LALR(1) parser's analysis of the grammar is cached in a file in the temporary
+    directory by lark, so only the first process to use it analyses the grammar.
+    """
+    if backend not in get_args(Backend):
+        raise ValueError(f"Unknown parser backend {backend!r}.")
+
+    if backend == "standalone":
+        return _load_standalone()
+
+    grammar = importlib.resources.files(__package__).joinpath("grammar.lark")
+    parser = Lark(
+        grammar.read_text(encoding="utf8"),
+        parser=backend,
+        start="program",
+        propagate_positions=True,
+        maybe_placeholders=False,
+        cache=backend == "lalr",  # Only supported for LALR(1).
+    )
+    transformer = cast(AstTransformer, create_transformer(nodes, AstTransformer()))
+
+    return parser, transformer
+
+
+def parse(program: str, backend: Backend = "native") -> nodes.Program:
+    """Parse a lispy program into an S-expression AST.
+
+    `backend` selects the parser which is used:
+
+    - "native": a hand-written reader which creates the AST directly. This is the default.
+    - "lalr": a LALR(1) parser; parses in linear time.
+    - "earley": an Earley parser; slower, but kept for comparison.
+    - "standalone": the LALR(1) parser from a module generated by lark's standalone tool. It does
+      not need to analyse the grammar at runtime. Raise ModuleNotFoundError if it wasn't generated.
+      Errors raised by this backend are the standalone module's copies of lark's exceptions.
+    """
+    if backend == "native":
+        with phase("sexpression_read"):
+            return read(program)
 
-with open("resources/grammar.lark", "r", encoding="utf8") as _f:
-    _grammar = _f.read()
-    _parser = Lark(_grammar, start="program", propagate_positions=True, maybe_placeholders=False)
-    _transformer = cast(AstTransformer, create_transformer(nodes, AstTransformer()))
+    parser, transformer = _get_parser(backend)
 
+    with phase("lark_parse"):
+        tree = parser.parse(program)
 
-def parse(program: str) -> nodes.Program:
-    """Parse a lispy program into an S-expression AST."""
-    tree = _parser.parse(program)
-    return _transformer.transform(tree)
+    with phase("lark_transform"):
+        return transformer.transform(tree)
@@ -0,0 +1,141 @@
+import re
+
+from lark import Token
+from lark.exceptions import UnexpectedCharacters, UnexpectedToken
+from lark.tree import Meta
+
+from .nodes import Atom, List, Program, SExpression
+
+__all__ = ("read",)
+
+_ATOM_END = r"(?![^\s()])"
+_TOKEN = re.compile(
+    rf"""
+    (?P<WS>[ \t\f\r\n]+)
+    | (?P<LPAR>\()
+    | (?P<RPAR>\))
+    | (?P<FLOAT>[+-]?(?:[0-9]+[eE][+-]?[0-9]+|(?:[0-9]+\.[0-9]*|\.[0-9]+)(?:[eE][+-]?[0-9]+)?|inf|nan){_ATOM_END})
+    | (?P<BOOL>(?:true|false){_ATOM_END})
+    | (?P<SIGNED_INT>[+-]?[0-9]+{_ATOM_END})
+    | (?P<LITERAL_ATOM>[_a-zA-Z][_a-zA-Z0-9]*{_ATOM_END})
+    """,  # noqa: E501
+    re.VERBOSE,
+)
+
+_ATOM_TERMINALS = frozenset({"SIGNED_INT", "FLOAT", "BOOL", "LITERAL_ATOM"})
+_CONVERTERS = {
+    "SIGNED_INT": int,
+    "FLOAT": float,
+    "BOOL": lambda token: token == "true",
+    "LITERAL_ATOM": str,
+}
+
+
+def _create_meta(
+    line: int, column: int, start_pos: int, end_line: int, end_column: int, end_pos: int
+) -> Meta:
+    """Return a new `Meta` with the given positions, as lark would with `propagate_positions`."""
+    meta = Meta()
+    meta.empty = False
+    meta.line = meta.container_line = line
+    meta.column = meta.container_column = column
+    meta.start_pos = meta.container_start_pos = start_pos
+    meta.end_line = meta.container_end_line = end_line
+    meta.end_column = meta.container_end_column = end_column
+    meta.end_pos = meta.container_end_pos = end_pos
+
+    return meta
+
+
+def _end_token(program: str) -> Token:
+    """Return an end-of-input token positioned at the last token of `program`, like lark does."""
+    end_pos = len(program.rstrip(" \t\f\r\n"))
+    start_pos = end_pos - 1
+
+    if program[start_pos] not in "()":
+        while start_pos > 0 and program[start_pos - 1] not in "() \t\f\r\n":
+            start_pos -= 1
+
+    line = program.count("\n", 0, start_pos) + 1
+    column = start_pos - program.rfind("\n", 0, start_pos)
+
+    return Token("$END", "", start_pos, line, column)
+
+
+def read(program: str) -> Program:
+    """Read a lispy program into an S-expression AST in a single pass.
+
+    The accepted syntax is the same as that of grammar.lark, and the same lark exceptions are raised
+    as with the LALR(1) parser. However, no parse tree is created, which would then have to be
+    transformed.
+
+    Raise UnexpectedCharacters if the program contains a character sequence which isn't a token.
+    Raise UnexpectedToken if the program's parentheses are unbalanced.
+    """
+    match_token = _TOKEN.match
+    converters = _CONVERTERS
+
+    # Each entry holds the elements and start position of a list which has yet to be closed.
+    # The bottom entry holds the program's body.
+    stack: list[tuple[list[SExpression], int, int, int]] = []
+    elements: list[SExpression] = []
+    pos = 0
+    line = 1
+    line_start = 0
+    end = len(program)
+
+    while pos < end:
+        match = match_token(program, pos)
+        if match is None:
+            allowed = set(_ATOM_TERMINALS | {"LPAR"})
+            if stack:
+                allowed.add("RPAR")
+
+            raise UnexpectedCharacters(
+                program, pos, line, pos - line_start + 1, allowed=allowed, token_history=None
+            )
+
+        kind = match.lastgroup
+        text = match.group()
+        column = pos - line_start + 1
+        next_pos = match.end()
+
+        if kind == "WS":
+            newlines = text.count("\n")
+            if newlines:
+                line += newlines
+                line_start = pos + text.rindex("\n") + 1
+        elif kind == "LPAR":
+            stack.append((elements, line, column, pos))
+            elements = []
+        elif kind == "RPAR":
+            if not stack:
+                token = Token("RPAR", ")", pos, line, column, line, column + 1, next_pos)
+                expected = set(_ATOM_TERMINALS | {"LPAR"})
+                if elements:
+                    expected.add("$END")
+
+                raise UnexpectedToken(token, expected)
+
+            meta = _create_meta(*stack[-1][1:], line, column + 1, next_pos)
+            node = List(meta, elements)
+            elements = stack.pop()[0]
+            elements.append(node)
+        else:
+            meta = _create_meta(line, column, pos, line, column + len(text), next_pos)
+            elements.append(Atom(meta, converters[kind](text)))  # type: ignore
+
+        pos = next_pos
+
+    if stack:
+        raise UnexpectedToken(_end_token(program), set(_ATOM_TERMINALS | {"LPAR", "RPAR"}))
+
+    if elements:
+        first, last = elements[0].meta, elements[-1].meta
+        meta = _create_meta(
+            first.line, first.column, first.start_pos, last.end_line, last.end_column, last.end_pos
+        )
+    else:
+        meta = Meta()
+
+    return Program(meta, elements)
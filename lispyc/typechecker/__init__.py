@@ -1,2 +1,5 @@
 from .checker import *
+from .scope import *
+from .signatures import *
+from .table import *
 from .unifier import *
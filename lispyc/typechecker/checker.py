@@ -1,74 +1,150 @@
-import copy
-from collections.abc import Iterable, Iterator, MutableMapping
+import typing
+from collections.abc import Callable, Generator, Iterable, Iterator, Sequence
+from concurrent import futures
 
 from lispyc import exceptions, nodes
+from lispyc.instrumentation import current_metrics, phase
 from lispyc.nodes import ComposedForm, Constant, Form, Program, SpecialForm, Type, Variable
 from lispyc.nodes.types import BoolType, FloatType, FunctionType, IntType, ListType, UnknownType
 
-from .unifier import Unifier
+from .scope import Scope
+from .signatures import FUNCTION_TYPES, NUMBER, SIGNATURES
+from .table import TypeTable
+from .unifier import InstrumentedUnifier, Unifier
 
 __all__ = ("TypeChecker", "NIL")
 
-Scope = MutableMapping[Variable, Type]
-
 NIL = "nil"
 
+T = typing.TypeVar("T", bound=Type)
+
+# A generator which typechecks a form and returns its type. To typecheck a nested form, it yields
+# the form along with the scope to check it in, and then it is sent the nested form's type.
+_Check = Generator[tuple[Form, Scope], Type, T]
+
+_CONSTANT_TYPES: dict[type, type[Type]] = {bool: BoolType, int: IntType, float: FloatType}
+
 
 class TypeChecker:
     """Enforce type safety - that there are no discrepancies between expected and actual types."""
 
-    def __init__(self, program: Program):
+    def __init__(self, program: Program, record: bool = False):
         self._program = program
-        self._unifier = Unifier()
+
+        # If instrumenting, the metrics which the checker and its unifier record.
+        self._metrics = current_metrics()
+        self._unifier = Unifier() if self._metrics is None else InstrumentedUnifier(self._metrics)
+
+        # If recording, the type of each checked form is appended, before unification finishes.
+        self._records: list[tuple[Form, Type]] | None = [] if record else None
+
+        # The names of the special forms and the types of the arguments which must be numbers, but
+        # were still unknown when they were checked. They're checked again once the top-level form
+        # they're in is checked, since top-level forms never share bindings.
+        self._numbers: list[tuple[str, Type]] = []
 
     @classmethod
-    def check_program(cls, program: Program) -> Iterator[Type]:
+    def check_program(cls, program: Program, workers: int | None = None) -> Iterator[Type]:
         """Typecheck `program` and return the set representatives for its body's form's types.
 
-        Raise LispyError if a form in the body fails to typecheck.
+        If `workers` is given, the body's forms are checked in parallel by a pool of that many
+        processes. Top-level forms never share bindings, so each form is checked on its own, and
+        the resolved types are merged in order.
+
+        Raise LispyError if a form in the body fails to typecheck. Either way, the error raised is
+        that of the first form which fails. Raise ValueError if `workers` is less than 1.
         """
+        if workers is not None and workers < 1:
+            raise ValueError(f"The number of workers must be at least 1, not {workers}.")
+
+        if workers is not None:
+            with phase("check"):
+                return iter(_check_forms_in_parallel(program.body, workers))
+
         checker = cls(program)
-        global_scope = {}
+        global_scope = Scope()
 
-        types = [checker._check_form(form, global_scope) for form in program.body]
+        with phase("check"):
+            types = [checker._check_form(form, global_scope) for form in program.body]
 
         return (checker._unifier.get_transitive_set_representative(t) for t in types)
 
+    @classmethod
+    def infer_types(cls, program: Program) -> TypeTable:
+        """Typecheck `program` and return a table of the types of all its forms.
+
+        The type of every form is recorded as it's checked. Once the whole program is checked, and
+        so no more types will be unified, the set representatives of the types are resolved.
+
+        Raise LispyError if a form in the body fails to typecheck.
+        """
+        checker = cls(program, record=True)
+        global_scope = Scope()
+
+        with phase("check"):
+            for form in program.body:
+                checker._check_form(form, global_scope)
+
+            assert checker._records is not None
+            resolve = checker._unifier.get_transitive_set_representative
+            types = {id(form): resolve(type_) for form, type_ in checker._records}
+
+        return TypeTable(program, types)
+
     def _check_form(self, form: Form, scope: Scope) -> Type:
-        """Typecheck a `Form` and return its type."""
-        match form:
-            case Constant(bool()):
-                return BoolType()
-            case Constant(int()):
-                return IntType()
-            case Constant(float()):
-                return FloatType()
-            case Variable() as variable:
-                return self._get_binding(variable, scope)
-            case ComposedForm() as form:
-                return self._check_composed_form(form, scope)
-            case nodes.Lambda() as lambda_:
-                return self._check_lambda(lambda_, scope)
-            case nodes.List() as list_:
-                return self._check_list(list_, scope)
-            case nodes.Cons() as cons:
-                return self._check_cons(cons, scope)
-            case nodes.Car() as car:
-                return self._check_car(car, scope)
-            case nodes.Cdr() as cdr:
-                return self._check_cdr(cdr, scope)
-            case nodes.Progn() as progn:
-                return self._check_progn(progn, scope)
-            case nodes.Set(variable, value):
-                return self._bind(variable, value, scope)
-            case nodes.Let() as let:
-                return self._check_let(let, scope)
-            case nodes.Cond() as cond:
-                return self._check_cond(cond, scope)
-            case nodes.Select() as select:
-                return self._check_select(select, scope)
-            case _:
-                raise TypeError(f"Unknown form {form!r}.")
+        """Typecheck a `Form` and return its type.
+
+        Nested forms are checked with an explicit stack of checks rather than recursively, so the
+        depth of nesting is not limited by the recursion limit.
+        """
+        checks: list[_Check[Type]] = []
+        forms: list[Form] = []  # The form each check is checking.
+        records = self._records
+        visited = 0
+
+        while True:
+            visited += 1
+            if isinstance(form, Variable):
+                type_ = self._get_binding(form, scope)
+            elif isinstance(form, Constant):
+                type_ = _CONSTANT_TYPES[type(form.value)]()
+            else:
+                checks.append(self._create_check(form, scope))
+                forms.append(form)
+                type_ = None  # Start the new check.
+
+            if records is not None and type_ is not None:
+                records.append((form, type_))
+
+            # Resume the innermost check until it yields a nested form or there are no checks left.
+            while checks:
+                try:
+                    form, scope = checks[-1].send(type_)  # type: ignore
+                    break
+                except StopIteration as e:
+                    checks.pop()
+                    type_ = e.value
+
+                    if records is not None:
+                        records.append((forms.pop(), type_))
+                    else:
+                        forms.pop()
+            else:
+                assert type_ is not None
+                self._check_numbers()
+                if self._metrics is not None:
+                    self._metrics.count("forms_checked", visited)
+
+                return type_
+
+    def _create_check(self, form: Form, scope: Scope) -> _Check[Type]:
+        """Return a check which typechecks a non-elementary `Form`."""
+        try:
+            check = _CHECKS[type(form)]
+        except KeyError:
+            raise TypeError(f"Unknown form {form!r}.") from None
+
+        return check(self, form, scope)
 
     def _assert_name_valid(self, name: str) -> None:
         """Raise InvalidNameError if `name` is not allowed to be rebound."""
@@ -82,26 +158,27 @@ class TypeChecker:
                 f"Cannot bind to name {name!r}: rebinding {NIL!r} is disallowed", name
             )
 
-    def _bind(self, variable: Variable, value: Form, scope: Scope) -> Type:
+    def _check_set(self, set_: nodes.Set, scope: Scope) -> _Check[Type]:
         """Rebind a variable in the given `scope` and return the type of its new value.
 
         The variable's name must not be the name of a special form or "nil".
         """
+        variable = set_.name
         self._assert_name_valid(variable.name)
 
-        if variable not in scope:
+        if (bound_type := scope.get(variable.name)) is None:
             raise exceptions.UnboundNameError(
                 f"Cannot bind to name {variable.name!r}: name is not in scope", variable.name
             )
 
-        type_ = self._check_form(value, scope)
-        self._unifier.unify(scope[variable], type_)
+        type_ = yield set_.value, scope
+        self._unifier.unify(bound_type, type_)
 
         return type_
 
-    def _check_car(self, car: nodes.Car, scope: Scope) -> Type:
+    def _check_car(self, car: nodes.Car, scope: Scope) -> _Check[Type]:
         """Typecheck a `Car` and return the type of the list element it returns."""
-        type_ = self._check_form(car.list, scope)
+        type_ = yield car.list, scope
         element_type = UnknownType()
         expected_type = ListType(element_type)
 
@@ -110,9 +187,9 @@ class TypeChecker:
 
         return element_type
 
-    def _check_cdr(self, cdr: nodes.Cdr, scope: Scope) -> ListType:
+    def _check_cdr(self, cdr: nodes.Cdr, scope: Scope) -> _Check[ListType]:
         """Typecheck a `Cdr` and return the type of the list it returns."""
-        type_ = self._check_form(cdr.list, scope)
+        type_ = yield cdr.list, scope
         expected_type = ListType(UnknownType())
 
         # TODO: disallow nil here?
@@ -120,42 +197,119 @@ class TypeChecker:
 
         return expected_type
 
-    def _check_composed_form(self, form: ComposedForm, scope: Scope) -> Type:
+    def _check_composed_form(self, form: ComposedForm, scope: Scope) -> _Check[Type]:
         """Typecheck a `ComposedForm` and return the called function's return type."""
-        param_types = tuple(self._check_form(arg, scope) for arg in form.arguments)
-        expected_type = FunctionType(param_types, UnknownType())
-        current_type = self._check_form(form.name, scope)
+        match form.name:
+            case Variable(name) if name in SIGNATURES and name not in scope:
+                return (yield from self._check_built_in(form, name, scope))
+
+        param_types: list[Type] = []
+        for arg in form.arguments:
+            param_types.append((yield arg, scope))
+
+        expected_type = FunctionType(tuple(param_types), UnknownType())
+        current_type = yield form.name, scope
 
         self._unifier.unify(current_type, expected_type)
 
         return expected_type.return_type
 
-    def _check_cond(self, cond: nodes.Cond, scope: Scope) -> Type:
+    def _check_built_in(self, form: ComposedForm, name: str, scope: Scope) -> _Check[Type]:
+        """Typecheck a call of the built-in special form `name` and return its return type.
+
+        Arithmetic special forms return a float if any argument is a float, and an int if all of
+        them are ints. Otherwise, the arguments whose types are unknown are unified with each other
+        and with the return type, as if the arguments were of the same type.
+
+        Raise SpecialFormSyntaxError if the special form can't be called with as many arguments.
+        """
+        signature = SIGNATURES[name]
+        if (instance := signature.instantiate(len(form.arguments))) is None:
+            raise exceptions.SpecialFormSyntaxError(
+                f"Invalid syntax for special form {name}: expected {signature.describe_arity()} "
+                f"arguments but got {len(form.arguments)}"
+            )
+
+        parameter_types, return_type = instance
+        argument_types: list[Type] = []
+        numbers: list[Type] = []
+        for argument, parameter_type in zip(form.arguments, parameter_types):
+            argument_type = yield argument, scope
+            argument_types.append(argument_type)
+
+            if parameter_type is NUMBER:
+                numbers.append(self._assert_number(name, argument_type))
+            else:
+                self._unifier.unify(parameter_type, argument_type)
+
+        if return_type is NUMBER:
+            if any(isinstance(type_, FloatType) for type_ in numbers):
+                return_type = FloatType()
+            elif all(isinstance(type_, IntType) for type_ in numbers):
+                return_type = IntType()
+            else:
+                return_type = UnknownType()
+                for type_ in numbers:
+                    if isinstance(type_, UnknownType):
+                        self._unifier.unify(return_type, type_)
+
+        if self._records is not None:
+            self._records.append((form.name, FunctionType(argument_types, return_type)))
+
+        return return_type
+
+    def _assert_number(self, name: str, type_: Type) -> Type:
+        """Return the set representative of `type_`, an argument of the special form `name`.
+
+        If it's unknown, it's checked again later. Raise TypeError if it isn't an int or a float.
+        """
+        type_ = self._unifier.get_set_representative(type_)
+        if isinstance(type_, UnknownType):
+            self._numbers.append((name, type_))
+        elif not isinstance(type_, (IntType, FloatType)):
+            raise exceptions.TypeError(
+                f"Invalid argument for special form {name}: expected int or float but got {type_}"
+            )
+
+        return type_
+
+    def _check_numbers(self) -> None:
+        """Check that the arguments which must be numbers, but were unknown, aren't other types now.
+
+        Those which are still unknown may be of either type.
+        """
+        numbers, self._numbers = self._numbers, []
+        for name, type_ in numbers:
+            self._assert_number(name, type_)
+
+        self._numbers.clear()
+
+    def _check_cond(self, cond: nodes.Cond, scope: Scope) -> _Check[Type]:
         """Typecheck a `Cond` and return its type."""
         branches_iter = iter(cond.branches)
         first_branch = next(branches_iter)
 
-        first_predicate_type = self._check_form(first_branch.predicate, scope)
+        first_predicate_type = yield first_branch.predicate, scope
         self._unifier.unify(first_predicate_type, BoolType())
 
-        first_value_type = self._check_form(first_branch.value, scope)
+        first_value_type = yield first_branch.value, scope
 
         for branch in branches_iter:
-            predicate_type = self._check_form(branch.predicate, scope)
+            predicate_type = yield branch.predicate, scope
             self._unifier.unify(first_predicate_type, predicate_type)
 
-            value_type = self._check_form(branch.value, scope)
+            value_type = yield branch.value, scope
             self._unifier.unify(first_value_type, value_type)
 
-        default_type = self._check_form(cond.default, scope)
+        default_type = yield cond.default, scope
         self._unifier.unify(first_value_type, default_type)
 
         return default_type
 
-    def _check_cons(self, cons: nodes.Cons, scope: Scope) -> ListType:
+    def _check_cons(self, cons: nodes.Cons, scope: Scope) -> _Check[ListType]:
         """Typecheck a `Cons` and return the type of the list it returns."""
-        car_type = self._check_form(cons.car, scope)
-        cdr_type = self._check_form(cons.cdr, scope)
+        car_type = yield cons.car, scope
+        cdr_type = yield cons.cdr, scope
 
         cdr_element_type = UnknownType()
         expected_cdr_type = ListType(cdr_element_type)
@@ -165,7 +319,7 @@ class TypeChecker:
 
         return expected_cdr_type
 
-    def _check_lambda(self, lambda_: nodes.Lambda, scope: Scope) -> FunctionType:
+    def _check_lambda(self, lambda_: nodes.Lambda, scope: Scope) -> _Check[FunctionType]:
         """Typecheck a `Lambda` and return its type.
 
         Raise DuplicateNameError if there is a duplicate name in the lambda's parameters.
@@ -179,17 +333,17 @@ class TypeChecker:
             )
 
         param_types = tuple(param.type for param in lambda_.parameters)
-        return_type = self._check_form(lambda_.body, func_scope)
+        return_type = yield lambda_.body, func_scope
 
         return FunctionType(param_types, return_type)
 
-    def _check_let(self, let: nodes.Let, scope: Scope) -> Type:
+    def _check_let(self, let: nodes.Let, scope: Scope) -> _Check[Type]:
         """Typecheck a `Let` and return the type of its body's last form."""
         # Create FunctionParameters because it's a convenient data structure for storing pairs
         # of variables and types, which is what _create_scope() needs.
-        params = [
-            nodes.FunctionParameter(b.name, self._check_form(b.value, scope)) for b in let.bindings
-        ]
+        params: list[nodes.FunctionParameter] = []
+        for binding in let.bindings:
+            params.append(nodes.FunctionParameter(binding.name, (yield binding.value, scope)))
 
         try:
             let_scope = self._create_scope(params, scope)
@@ -201,9 +355,9 @@ class TypeChecker:
         # let's body has the same behaviour as progn, except let uses a new scope.
         progn = nodes.Progn(let.body)
 
-        return self._check_progn(progn, let_scope)
+        return (yield from self._check_progn(progn, let_scope))
 
-    def _check_list(self, list_: nodes.List, scope: Scope) -> ListType:
+    def _check_list(self, list_: nodes.List, scope: Scope) -> _Check[ListType]:
         """Typecheck a `List` and return its type.
 
         Raise TypeError if the list is not homogeneous.
@@ -213,11 +367,11 @@ class TypeChecker:
 
         # Get the type of the first element.
         elements_iter = iter(list_.elements)
-        first_type = self._check_form(next(elements_iter), scope)
+        first_type = yield next(elements_iter), scope
 
         # Unify all elements - the list must be homogeneous.
         for i, element in enumerate(elements_iter, 1):
-            current_type = self._check_form(element, scope)
+            current_type = yield element, scope
 
             try:
                 self._unifier.unify(first_type, current_type)
@@ -229,30 +383,30 @@ class TypeChecker:
 
         return ListType(first_type)
 
-    def _check_progn(self, progn: nodes.Progn, scope: Scope) -> Type:
+    def _check_progn(self, progn: nodes.Progn, scope: Scope) -> _Check[Type]:
         """Typecheck a `Progn` and return the type of its last form."""
         type_ = None
         for form in progn.forms:
-            type_ = self._check_form(form, scope)
+            type_ = yield form, scope
 
         # TODO: In practice the parser requires > 0 forms for Progn and Let, but I'm still scared.
         assert type_ is not None
 
         return type_
 
-    def _check_select(self, select: nodes.Select, scope: Scope) -> Type:
+    def _check_select(self, select: nodes.Select, scope: Scope) -> _Check[Type]:
         """Typecheck a `Select` and return its type."""
-        select_value_type = self._check_form(select.value, scope)
+        select_value_type = yield select.value, scope
         self._unifier.unify(select_value_type, UnknownType())
 
-        default_type = self._check_form(select.default, scope)
+        default_type = yield select.default, scope
 
         for branch in select.branches:
             # TODO: should it be the typechecker's responsibility to disallow comparing functions?
-            predicate_type = self._check_form(branch.predicate, scope)
+            predicate_type = yield branch.predicate, scope
             self._unifier.unify(select_value_type, predicate_type)
 
-            value_type = self._check_form(branch.value, scope)
+            value_type = yield branch.value, scope
             self._unifier.unify(default_type, value_type)
 
         return default_type
@@ -262,30 +416,33 @@ class TypeChecker:
 
         Raise DuplicateNameError if there is a duplicate name in `parameters`.
         """
-        names: set[str] = set()
-        nested_scope = copy.copy(scope)
+        bindings: dict[str, Type] = {}
+        if self._metrics is not None:
+            self._metrics.count("scopes_created")
 
         for param in parameters:
             self._assert_name_valid(param.name.name)
-            if param.name.name in names:
+            if param.name.name in bindings:
                 raise exceptions.DuplicateNameError(
                     f"Invalid syntax: duplicate name {param.name.name!r}", param.name.name
                 )
 
-            names.add(param.name.name)
-
             # TODO: show warning if name shadows same name in outer scope.
-            nested_scope[param.name] = param.type
+            bindings[param.name.name] = param.type
 
-        return nested_scope
+        return scope.nest(bindings)
 
     def _get_binding(self, variable: Variable, scope: Scope) -> Type:
         """Get the type of the value bound to the given `variable` in the given `scope`.
 
+        If the name isn't in scope, it may be that of a first-class built-in function.
+
         Raise UnboundNameError if the name is not in scope.
         Raise SpecialFormSyntaxError if the name is that of a special form.
         """
-        if variable.name in SpecialForm.forms_map:
+        if variable.name in SpecialForm.forms_map or (
+            variable.name in SIGNATURES and variable.name not in scope
+        ):
             raise exceptions.SpecialFormSyntaxError(
                 f"Invalid syntax for special form {variable.name!r}: "
                 f"a special form's name cannot be used as a reference to a binding"
@@ -295,9 +452,58 @@ class TypeChecker:
             # Just like in _check_list, each reference to nil must return a new instance of the type
             # to prevent nils referenced in different scopes from unifying with each other.
             return ListType(UnknownType())
-        elif variable in scope:
-            return scope[variable]
+        elif (type_ := scope.get(variable.name)) is not None:
+            return type_
+        elif (type_ := FUNCTION_TYPES.get(variable.name)) is not None:
+            return type_
         else:
             raise exceptions.UnboundNameError(
                 f"Cannot retrieve binding {variable.name!r}: name is not in scope", variable.name
             )
+
+
+# The forms which a worker process of `_check_forms_in_parallel` checks slices of.
+_worker_forms: Sequence[Form] = ()
+
+
+def _check_forms_in_parallel(forms: Sequence[Form], workers: int) -> list[Type]:
+    """Typecheck top-level `forms` in a pool of `workers` processes and return their types.
+
+    The forms are given to each process once, when it starts, rather than sent with each task;
+    if processes are forked, they aren't even copied. Each task checks a contiguous slice of the
+    forms, a few per process, to balance the load.
+    """
+    chunk_size = max(1, len(forms) // (workers * 4))
+    starts = range(0, len(forms), chunk_size)
+    stops = [min(start + chunk_size, len(forms)) for start in starts]
+
+    with futures.ProcessPoolExecutor(
+        workers, initializer=_initialise_worker, initargs=(forms,)
+    ) as executor:
+        try:
+            chunks = list(executor.map(_check_worker_forms, starts, stops))
+        except BaseException:
+            # Don't wait for the remaining chunks to be checked before raising the error.
+            executor.shutdown(cancel_futures=True)
+            raise
+
+    return [type_ for chunk in chunks for type_ in chunk]
+
+
+def _initialise_worker(forms: Sequence[Form]) -> None:
+    """Set the forms which this worker process checks slices of."""
+    global _worker_forms
+    _worker_forms = forms
+
+
+def _check_worker_forms(start: int, stop: int) -> list[Type]:
+    """Typecheck a slice of this worker process's forms as a program and return their types."""
+    return list(TypeChecker.check_program(Program(tuple(_worker_forms[start:stop]))))
+
+
+# Maps each type of non-elementary form to the method which checks it. Each special form is checked
+# by the method named after its id, e.g. `Cond` by `_check_cond`.
+_CHECKS: dict[type[Form], Callable[[TypeChecker, typing.Any, Scope], _Check[Type]]] = {
+    ComposedForm: TypeChecker._check_composed_form,
+    **{form: getattr(TypeChecker, f"_check_{id_}") for id_, form in SpecialForm.forms_map.items()},
+}
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+
+from lispyc.nodes import Type
+
+__all__ = ("Scope",)
+
+
+class Scope:
+    """A lexical scope; maps the names of bindings to their types.
+
+    Scopes are persistent. A nested scope only holds its own bindings and links to its outer scope
+    rather than copying it. Thus, creating a nested scope costs only as much as its new bindings.
+
+    Bindings are never removed or replaced once a scope is created. This makes it safe for a lookup
+    to memoise a binding found in an outer scope, so repeated lookups of the same name are direct.
+    """
+
+    __slots__ = ("_bindings", "_parent")
+
+    def __init__(self, bindings: Mapping[str, Type] | None = None, parent: Scope | None = None):
+        self._bindings: dict[str, Type] = dict(bindings) if bindings else {}
+        self._parent = parent
+
+    def nest(self, bindings: Mapping[str, Type]) -> Scope:
+        """Return a new scope nested in this one with the given `bindings`."""
+        return Scope(bindings, self)
+
+    def get(self, name: str) -> Type | None:
+        """Return the type of the binding for `name`, or None if `name` is not in scope."""
+        if (type_ := self._bindings.get(name)) is not None:
+            return type_
+
+        scope = self._parent
+        while scope is not None:
+            if (type_ := scope._bindings.get(name)) is not None:
+                self._bindings[name] = type_
+                return type_
+
+            scope = scope._parent
+
+        return None
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
@@ -0,0 +1,156 @@
+"""The types of the built-in functions from the manual.
+
+Most built-in functions are special forms, which can only be called directly: they are generic
+or variadic, so the types of their parameters depend on each call. Their `Signature`s use the
+type variables `A` and `B`, which stand for any type, and `NUMBER`, which stands for an int or a
+float. The rest are first-class functions, which have a single type in `FUNCTION_TYPES`.
+
+A binding with the same name as a built-in function shadows it.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from lispyc.nodes import Type
+from lispyc.nodes.types import (
+    BoolType,
+    FloatType,
+    FunctionType,
+    IntType,
+    ListType,
+    UnknownType,
+    is_closed,
+)
+
+__all__ = ("Signature", "SIGNATURES", "FUNCTION_TYPES")
+
+# Type variables. Each call of a special form replaces them with new unknown types.
+A = UnknownType()
+B = UnknownType()
+
+# An argument which may be an int or a float. A special form which returns a `NUMBER` returns a
+# float if any of these arguments is a float, and otherwise an int.
+NUMBER = UnknownType()
+
+
+@dataclass(frozen=True, slots=True)
+class Signature:
+    """The type of a built-in special form.
+
+    If `rest` isn't None, any number of arguments of that type may follow the `parameters`.
+    """
+
+    parameters: tuple[Type, ...]
+    return_type: Type
+    rest: Type | None = None
+
+    def describe_arity(self) -> str:
+        """Return a description of the number of arguments the special form must be called with."""
+        count = len(self.parameters)
+        return f"{count}" if self.rest is None else f"at least {count}"
+
+    def instantiate(self, arity: int) -> tuple[list[Type], Type] | None:
+        """Return the parameter and return types of a call with `arity` arguments.
+
+        The type variables `A` and `B` are replaced with new unknown types. Each repetition of
+        `rest` has its own, so variadic arguments needn't have the same type. Return None if the
+        special form can't be called with `arity` arguments.
+        """
+        count = len(self.parameters)
+        if arity < count or (self.rest is None and arity > count):
+            return None
+
+        variables: dict[Type, Type] = {A: UnknownType(), B: UnknownType()}
+        parameters = [_substitute(parameter, variables) for parameter in self.parameters]
+        for _ in range(arity - count):
+            rest: Type = self.rest  # type: ignore[assignment]
+            parameters.append(_substitute(rest, {A: UnknownType(), B: UnknownType()}))
+
+        return parameters, _substitute(self.return_type, variables)
+
+
+def _substitute(type_: Type, variables: dict[Type, Type]) -> Type:
+    """Return `type_` with the type variables which are keys of `variables` replaced."""
+    if is_closed(type_):
+        return type_
+
+    match type_:
+        case ListType(element_type):
+            return ListType(_substitute(element_type, variables))
+        case FunctionType(parameter_types, return_type):
+            return FunctionType(
+                tuple(_substitute(parameter, variables) for parameter in parameter_types),
+                _substitute(return_type, variables),
+            )
+        case _:
+            return variables.get(type_, type_)
+
+
+_ARITHMETIC_1 = Signature((NUMBER,), NUMBER)
+_ARITHMETIC_2 = Signature((NUMBER, NUMBER), NUMBER)
+_ARITHMETIC_N = Signature((NUMBER, NUMBER), NUMBER, rest=NUMBER)
+_COMPARISON = Signature((NUMBER, NUMBER), BoolType())
+_CONNECTIVE = Signature((BoolType(), BoolType()), BoolType(), rest=BoolType())
+_OUTPUT = Signature((), ListType(A), rest=B)
+
+# Maps the names of the built-in special forms to their signatures.
+SIGNATURES: dict[str, Signature] = {
+    # Predicates
+    "eq": Signature((A, A), BoolType()),
+    "equal": Signature((A, A), BoolType()),
+    "greaterp": _COMPARISON,
+    "lessp": _COMPARISON,
+    "null": Signature((ListType(A),), BoolType()),
+    "member": Signature((A, ListType(A)), BoolType()),
+    "and": _CONNECTIVE,
+    "or": _CONNECTIVE,
+    # Arithmetic
+    "sum": _ARITHMETIC_N,
+    "prod": _ARITHMETIC_N,
+    "diff": _ARITHMETIC_2,
+    "neg": _ARITHMETIC_1,
+    "inc": _ARITHMETIC_1,
+    "dec": _ARITHMETIC_1,
+    "div": _ARITHMETIC_2,
+    "mod": _ARITHMETIC_2,
+    "expt": _ARITHMETIC_2,
+    "sqrt": _ARITHMETIC_1,
+    "log": _ARITHMETIC_2,
+    "lb": _ARITHMETIC_1,
+    "lg": _ARITHMETIC_1,
+    "ln": _ARITHMETIC_1,
+    "recip": _ARITHMETIC_1,
+    "abs": _ARITHMETIC_1,
+    "min": _ARITHMETIC_N,
+    "max": _ARITHMETIC_N,
+    # Lists
+    "append": Signature((A, ListType(A)), ListType(A)),
+    "extend": Signature((ListType(A), ListType(A)), ListType(A)),
+    "copy": Signature((ListType(A),), ListType(A)),
+    "reverse": Signature((ListType(A),), ListType(A)),
+    "length": Signature((ListType(A),), IntType()),
+    "efface": Signature((A, ListType(A)), ListType(A)),
+    # Input and output
+    "print": _OUTPUT,
+    "println": _OUTPUT,
+    # Mapping
+    "map": Signature((ListType(A), FunctionType((ListType(A),), B)), ListType(B)),
+    "mapcar": Signature((ListType(A), FunctionType((A,), B)), ListType(B)),
+}
+
+# Maps the names of the first-class built-in functions to their types.
+FUNCTION_TYPES: dict[str, FunctionType] = {
+    "evenp": FunctionType((IntType(),), BoolType()),
+    "not": FunctionType((BoolType(),), BoolType()),
+    "float": FunctionType((IntType(),), FloatType()),
+    "floor": FunctionType((FloatType(),), IntType()),
+    "ceil": FunctionType((FloatType(),), IntType()),
+    "trunc": FunctionType((FloatType(),), IntType()),
+    "round": FunctionType((FloatType(),), IntType()),
+    "logand": FunctionType((IntType(), IntType()), IntType()),
+    "logior": FunctionType((IntType(), IntType()), IntType()),
+    "logxor": FunctionType((IntType(), IntType()), IntType()),
+    "lognot": FunctionType((IntType(),), IntType()),
+    "shift": FunctionType((IntType(), IntType()), IntType()),
+}
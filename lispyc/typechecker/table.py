@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import typing
+
+from lispyc.nodes import Form, Program, Type
+
+__all__ = ("TypeTable",)
+
+T = typing.TypeVar("T")
+
+
+class TypeTable:
+    """The inferred types of the forms of a program, looked up by the identity of the forms.
+
+    Forms are looked up by identity rather than equality since equal forms, such as references to
+    the same name in different scopes, can have different types. The table keeps its program
+    alive, so the ids of the program's forms can't be reused by other objects.
+    """
+
+    __slots__ = ("_program", "_types")
+
+    def __init__(self, program: Program, types: dict[int, Type]):
+        self._program = program
+        self._types = types
+
+    @property
+    def program(self) -> Program:
+        """The program whose forms' types are in this table."""
+        return self._program
+
+    def get(self, form: Form, default: T | None = None) -> Type | T | None:
+        """Return the type of `form`, or `default` if it's not a form of the program."""
+        return self._types.get(id(form), default)
+
+    def __getitem__(self, form: Form) -> Type:
+        try:
+            return self._types[id(form)]
+        except KeyError:
+            raise KeyError(form) from None
+
+    def __contains__(self, form: Form) -> bool:
+        return id(form) in self._types
+
+    def __len__(self) -> int:
+        return len(self._types)
@@ -1,49 +1,69 @@
-from collections.abc import Iterable
+import operator
 from itertools import zip_longest
 
 from lispyc.exceptions import CyclicTypeError, UnificationError
-from lispyc.nodes import FunctionType, ListType, Type, UnknownType
+from lispyc.instrumentation import Metrics
+from lispyc.nodes import FunctionType, ListType, Type, UnknownType, is_closed
 
-__all__ = ("Unifier",)
+__all__ = ("Unifier", "InstrumentedUnifier")
 
 
 class Unifier:
-    """Perform unification for type inference."""
+    """Perform unification for type inference.
+
+    The sets of unified types form a disjoint-set forest: `_map` maps an unknown type to its parent.
+    Known types are never mapped, so a set which contains a known type has it as its representative.
+    Sets of only unknown types are merged by rank, and paths are compressed on lookups.
+
+    Transitive set representatives of compound types are memoised in `_resolved`, keyed by the id
+    of the type; the type is kept as well so that its id can't be reused. Adding to the forest
+    increments `_generation`, which invalidates the memo.
+    """
 
     def __init__(self):
         self._map: dict[UnknownType, Type] = {}
+        self._ranks: dict[UnknownType, int] = {}
+        self._generation = 0
+        self._resolved: dict[int, tuple[Type, Type]] = {}
+        self._resolved_generation = 0
 
     def unify(self, left: Type, right: Type) -> None:
         """Unify the `left` and `right` types.
 
         Raise UnificationError if unifying the two types fails.
         """
-        left = self.get_set_representative(left)
-        right = self.get_set_representative(right)
+        # Nested types are unified with an explicit stack rather than recursively. Pairs are pushed
+        # in reverse so they are unified in the same order as depth-first recursion would.
+        # A pair containing None represents a mismatch in the number of types to unify.
+        pairs: list[tuple[Type | None, Type | None]] = [(left, right)]
+
+        while pairs:
+            left, right = pairs.pop()
+            if left is None or right is None:
+                raise UnificationError("Unification failed: unequal number of types")
+
+            left = self.get_set_representative(left)
+            right = self.get_set_representative(right)
 
-        if left == right:
-            return
+            if left is right:
+                continue
 
-        match left, right:
-            case UnknownType() as left, _:
-                self._add_mapping(left, right)
-            case _, UnknownType() as right:
+            if isinstance(left, UnknownType):
+                if isinstance(right, UnknownType):
+                    self._union(left, right)
+                else:
+                    self._add_mapping(left, right)
+            elif isinstance(right, UnknownType):
                 self._add_mapping(right, left)
-            case ListType() as left, ListType() as right:
-                self.unify(left.element_type, right.element_type)
-            case FunctionType() as left, FunctionType() as right:
-                self.unify(left.return_type, right.return_type)
-                self._unify_many(left.parameter_types, right.parameter_types)
-            case _:
+            elif type(left) is not type(right):
                 raise UnificationError(f"Unification failed: mismatched types {left} and {right}")
-
-    def _unify_many(self, left: Iterable[Type], right: Iterable[Type]) -> None:
-        """Unify pairs from `left` and `right`."""
-        for left_type, right_type in zip_longest(left, right):
-            if left_type is None or right_type is None:
-                raise UnificationError("Unification failed: unequal number of types")
-            else:
-                self.unify(left_type, right_type)
+            elif isinstance(left, ListType):
+                pairs.append((left.element_type, right.element_type))  # type: ignore
+            elif isinstance(left, FunctionType):
+                params = zip_longest(left.parameter_types, right.parameter_types)  # type: ignore
+                pairs.extend(reversed(list(params)))
+                pairs.append((left.return_type, right.return_type))  # type: ignore
+            # Otherwise, they're identical basic types.
 
     def _add_mapping(self, source: UnknownType, dest: Type) -> None:
         """Map the unknown `source` type to `dest` type if it's not cyclic."""
@@ -52,39 +72,158 @@ class Unifier:
             raise CyclicTypeError("Unification failed: attempt to create cyclic type")
         else:
             self._map[source] = dest
+            self._generation += 1
+
+    def _union(self, left: UnknownType, right: UnknownType) -> None:
+        """Merge the sets of the set representatives `left` and `right` by their ranks."""
+        left_rank = self._ranks.get(left, 0)
+        right_rank = self._ranks.get(right, 0)
+        self._generation += 1
+
+        if left_rank < right_rank:
+            self._map[left] = right
+        elif left_rank > right_rank:
+            self._map[right] = left
+        else:
+            self._map[left] = right
+            self._ranks[right] = right_rank + 1
 
     def get_set_representative(self, t: Type) -> Type:
         """Return the set representative type for `t`."""
-        # Assume all keys are of UnknownType as denoted by the map's type annotation.
-        while next_type := self._map.get(t):  # type: ignore
-            t = next_type
+        # Only unknown types are mapped. Also, hashing a compound type hashes all its nested types.
+        if not isinstance(t, UnknownType):
+            return t
 
-        return t
+        representative = t
+        while isinstance(representative, UnknownType) and (
+            next_type := self._map.get(representative)
+        ):
+            representative = next_type
+
+        # Compress the path so subsequent lookups are direct.
+        while (next_type := self._map.get(t)) and next_type is not representative:
+            self._map[t] = representative
+            t = next_type  # type: ignore
+
+        return representative
 
     def get_transitive_set_representative(self, t: Type) -> Type:
-        """Return the set representative for `t` with set representatives for its nested types."""
-        match t := self.get_set_representative(t):
-            case ListType(element):
-                return ListType(self.get_transitive_set_representative(element))
-            case FunctionType(params, ret):
-                return FunctionType(
-                    tuple(map(self.get_transitive_set_representative, params)),
-                    self.get_transitive_set_representative(ret),
-                )
-            case _:
-                return t
+        """Return the set representative for `t` with set representatives for its nested types.
+
+        Closed types are returned as they are. A nested type which is already fully resolved is
+        reused rather than rebuilt, and each compound type is only resolved once until the sets
+        change, even if it's nested in many types.
+        """
+        if self._resolved_generation != self._generation:
+            self._resolved.clear()
+            self._resolved_generation = self._generation
+
+        memo = self._resolved
+
+        # Nested types are resolved with an explicit stack rather than recursively.
+        # A type is pushed a second time, as expanded, to be rebuilt after its nested types.
+        stack: list[tuple[Type, bool]] = [(t, False)]
+        resolved: list[Type] = []
+
+        while stack:
+            t, expanded = stack.pop()
+
+            if expanded:
+                match t:
+                    case ListType(element):
+                        element_type = resolved.pop()
+                        rebuilt = t if element_type is element else ListType(element_type)
+                    case FunctionType(params, ret):
+                        return_type = resolved.pop()
+                        split = len(resolved) - len(params)
+                        param_types = tuple(resolved[split:])
+                        del resolved[split:]
+
+                        if return_type is ret and all(map(operator.is_, param_types, params)):
+                            rebuilt = t
+                        else:
+                            rebuilt = FunctionType(param_types, return_type)
+                    case _:  # pragma: no cover
+                        raise AssertionError("Only compound types are expanded.")
+
+                memo[id(t)] = (t, rebuilt)
+                resolved.append(rebuilt)
+                continue
+
+            if is_closed(t):
+                resolved.append(t)
+                continue
+
+            t = self.get_set_representative(t)
+            if (memoised := memo.get(id(t))) is not None:
+                resolved.append(memoised[1])
+                continue
+
+            match t:
+                case ListType(element):
+                    stack.append((t, True))
+                    stack.append((element, False))
+                case FunctionType(params, ret):
+                    stack.append((t, True))
+                    stack.append((ret, False))
+                    stack.extend((param, False) for param in reversed(params))
+                case _:
+                    resolved.append(t)
+
+        return resolved[0]
 
     def _has_unknown(self, t: Type, unknown: UnknownType) -> bool:
         """Return True if `t` is `unknown` or contains it."""
-        match t := self.get_set_representative(t):
-            case UnknownType():
-                return t is unknown
-            case ListType(element):
-                return element is unknown
-            case FunctionType(params, ret):
-                # Check if it's the return type or one of the parameters.
-                return self._has_unknown(ret, unknown) or any(
-                    self._has_unknown(p, unknown) for p in params
-                )
-            case _:
-                return False
+        # Nested types are checked with an explicit stack rather than recursively.
+        stack = [t]
+
+        while stack:
+            match t := self.get_set_representative(stack.pop()):
+                case UnknownType() if t is unknown:
+                    return True
+                case ListType(element):
+                    stack.append(element)
+                case FunctionType(params, ret):
+                    # Check if it's the return type or one of the parameters.
+                    stack.extend(params)
+                    stack.append(ret)
+                case _:
+                    pass
+
+        return False
+
+
+class InstrumentedUnifier(Unifier):
+    """A `Unifier` which records the metrics of its work; see `lispyc.instrumentation`.
+
+    It counts and times calls to `unify`, and records the longest chain of unknown types followed
+    to find a set representative.
+    """
+
+    def __init__(self, metrics: Metrics):
+        super().__init__()
+        self._metrics = metrics
+
+    def unify(self, left: Type, right: Type) -> None:
+        """Unify the `left` and `right` types, and record the call.
+
+        Raise UnificationError if unifying the two types fails.
+        """
+        self._metrics.count("unify_calls")
+
+        with self._metrics.time("unify"):
+            super().unify(left, right)
+
+    def get_set_representative(self, t: Type) -> Type:
+        """Return the set representative type for `t`, and record the length of its chain."""
+        length = 0
+        representative = t
+        while isinstance(representative, UnknownType) and (
+            next_type := self._map.get(representative)
+        ):
+            representative = next_type
+            length += 1
+
+        self._metrics.maximise("max_union_find_chain", length)
+
+        return super().get_set_representative(t)
@@ -0,0 +1,214 @@
+import json
+import os
+import subprocess
+import sys
+import typing
+from pathlib import Path
+
+import pytest
+
+from lispyc import cache, cli
+from lispyc.cli import batch
+from lispyc.codegen import execute
+
+VALID = {
+    "a.lispy": "(let ((f (lambda ((x int)) (cons x nil)))) (f 1))",
+    "nested/b.lispy": "(lambda ((b bool)) b) 1.5",
+    "nested/deeper/c.lispy": "(list nil nil)",
+}
+
+INVALID = {
+    "syntax.lispy": ("(car (list 1)", "syntax.lispy:1:13: syntax error: Unexpected token"),
+    "type.lispy": ("(car 1)", "type.lispy: UnificationError: Unification failed"),
+    "unbound.lispy": ("y", "unbound.lispy: UnboundNameError: Cannot retrieve binding 'y'"),
+    "encoding.lispy": (b"\xff", "encoding.lispy: error: 'utf-8' codec can't decode"),
+}
+
+
+def write_files(directory: Path, files: dict[str, str | bytes]) -> None:
+    for name, source in files.items():
+        path = directory / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        if isinstance(source, bytes):
+            path.write_bytes(source)
+        else:
+            path.write_text(source)
+
+
+@pytest.fixture
+def sources(tmp_path: Path) -> Path:
+    write_files(tmp_path, VALID)  # type: ignore
+    (tmp_path / "ignored.txt").write_text("(")
+    return tmp_path
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_check_directory(sources: Path, jobs: str, capsys: pytest.CaptureFixture[str]):
+    assert cli.main(["check", "-j", jobs, str(sources)]) == 0
+
+    err = capsys.readouterr().err
+    assert err.startswith("3 files checked in ")
+    assert ", 0 failed." in err
+    assert "  parse" in err and "  check" in err and "generate" not in err
+    assert not (sources / cache.CACHE_DIRECTORY).exists()
+
+
+@pytest.mark.parametrize("jobs", ["1", "3"])
+def test_diagnostics(sources: Path, jobs: str, capsys: pytest.CaptureFixture[str]):
+    write_files(sources, {name: source for name, (source, _) in INVALID.items()})
+
+    assert cli.main(["check", "-j", jobs, str(sources)]) == 1
+
+    lines = capsys.readouterr().err.splitlines()
+    expected = sorted(message for _, message in INVALID.values())
+    for diagnostic, message in zip(sorted(lines[:4]), expected, strict=True):
+        assert diagnostic.startswith(f"{sources}{os.sep}{message}")
+
+    assert lines[4].startswith("7 files checked in ") and lines[4].endswith(", 4 failed.")
+
+
+def test_build_skips_compiled_files(sources: Path, capsys: pytest.CaptureFixture[str]):
+    assert cli.main(["build", "-j", "1", str(sources / "a.lispy")]) == 0
+    err = capsys.readouterr().err
+    assert "  generate" in err and "  write" in err
+
+    compiled = cache.load(VALID["a.lispy"], sources / cache.CACHE_DIRECTORY)
+    assert compiled is not None and execute(compiled.code) == [(1,)]
+
+    assert cli.main(["build", "-j", "1", str(sources)]) == 0
+    err = capsys.readouterr().err
+    assert err.startswith("3 files built in ")
+    assert cache.load(VALID["nested/deeper/c.lispy"], sources / "nested/deeper/__lispycache__")
+
+    assert cli.main(["build", "-j", "1", str(sources / "a.lispy")]) == 0
+    err = capsys.readouterr().err
+    assert "  load" in err and "parse" not in err
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_build_reports_deeply_nested_file(
+    sources: Path, jobs: str, capsys: pytest.CaptureFixture[str]
+):
+    write_files(sources, {"deep.lispy": "(cons 1 " * 3000 + "nil" + ")" * 3000})
+
+    assert cli.main(["check", "-j", jobs, str(sources)]) == 0
+    capsys.readouterr()
+
+    assert cli.main(["build", "-j", jobs, str(sources)]) == 1
+
+    lines = capsys.readouterr().err.splitlines()
+    assert lines[0].startswith(f"{sources / 'deep.lispy'}: ")
+    assert lines[1].startswith("4 files built in ") and lines[1].endswith(", 1 failed.")
+    assert cache.load(VALID["a.lispy"], sources / cache.CACHE_DIRECTORY) is not None
+
+
+def test_internal_error_diagnostic(
+    sources: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+):
+    def parse_program(program: object) -> typing.NoReturn:
+        raise RuntimeError("bug")
+
+    monkeypatch.setattr(batch, "parse_program", parse_program)
+
+    assert cli.main(["check", "-j", "1", str(sources)]) == 1
+
+    lines = capsys.readouterr().err.splitlines()
+    assert lines[0] == f"{sources / 'a.lispy'}: internal error: RuntimeError: bug"
+    assert lines[3].endswith(", 3 failed.")
+
+
+def test_local_error_is_not_blamed_on_server(
+    sources: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+):
+    def process_files(*args: object) -> typing.Iterator[object]:
+        yield from ()
+        raise OSError("cannot start the processes")
+
+    monkeypatch.setattr(batch, "process_files", process_files)
+
+    with pytest.raises(OSError, match="cannot start the processes"):
+        cli.main(["check", "-j", "1", str(sources)])
+
+    assert "server" not in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(["command", "jobs"], [("check", "1"), ("build", "2")])
+def test_metrics(sources: Path, command: str, jobs: str, capsys: pytest.CaptureFixture[str]):
+    metrics_path = sources / "metrics.json"
+
+    assert cli.main([command, "-j", jobs, "--metrics", str(metrics_path), str(sources)]) == 0
+
+    metrics = json.loads(metrics_path.read_text())
+    assert metrics["timings"].keys() >= {"sexpression_read", "parse_form", "check", "unify"}
+    assert ("generate" in metrics["timings"]) == (command == "build")
+    assert ("optimise" in metrics["timings"]) == (command == "build")
+    assert metrics["counters"]["forms_checked"] == 14
+    # Building resolves the types of all forms, not only the top-level ones, for the generator.
+    assert metrics["counters"]["max_union_find_chain"] == (2 if command == "build" else 1)
+
+
+def test_metrics_cannot_be_written(sources: Path, capsys: pytest.CaptureFixture[str]):
+    assert cli.main(["check", "-j", "1", "--metrics", str(sources), str(sources)]) == 2
+    assert "lispyc: error: cannot write the metrics: " in capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    ["patterns", "count"],
+    [
+        (["**/*.lispy"], 3),
+        (["nested/*.lispy"], 1),
+        (["a.lispy", "*.lispy", "."], 3),
+        (["nested/deeper/c.lispy"], 1),
+    ],
+)
+def test_patterns(
+    sources: Path,
+    patterns: list[str],
+    count: int,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+):
+    monkeypatch.chdir(sources)
+
+    assert cli.main(["check", "-j", "1", *patterns]) == 0
+    assert capsys.readouterr().err.startswith(f"{count} files checked in ")
+
+
+@pytest.mark.parametrize(
+    ["args", "message"],
+    [
+        ([], "the following arguments are required"),
+        (["check"], "the following arguments are required: PATH"),
+        (["check", "missing"], "no .lispy files match 'missing'"),
+        (["check", "-j", "0", "."], "expected a positive integer but got '0'"),
+        (["check", "-j", "x", "."], "expected a positive integer but got 'x'"),
+        (["build", "--parser", "standalone", "."], "invalid choice: 'standalone'"),
+    ],
+)
+def test_usage_errors(
+    sources: Path,
+    args: list[str],
+    message: str,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+):
+    monkeypatch.chdir(sources)
+
+    with pytest.raises(SystemExit) as e:
+        cli.main(args)
+
+    assert e.value.code == 2
+    assert message in capsys.readouterr().err
+
+
+def test_run_as_module(sources: Path):
+    result = subprocess.run(
+        [sys.executable, "-m", "lispyc", "check", "--parser", "lalr", str(sources)],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0
+    assert result.stdout == ""
+    assert "3 files checked in " in result.stderr
@@ -0,0 +1,304 @@
+import json
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import typing
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+
+from lispyc import cache, cli, incremental
+from lispyc.cli import protocol, server
+from lispyc.cli.protocol import Options, Result
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix sockets")
+
+
+@pytest.fixture
+def socket_path() -> Iterator[str]:
+    # Paths of Unix sockets are limited to about 100 characters, so tmp_path may be too long.
+    with tempfile.TemporaryDirectory(prefix="lispyc") as directory:
+        yield str(Path(directory, "server.sock"))
+
+
+@pytest.fixture
+def compile_server(socket_path: str) -> Iterator[server.Server]:
+    with server.Server(socket_path) as compile_server:
+        thread = threading.Thread(target=compile_server.serve_forever)
+        thread.start()
+
+        yield compile_server
+
+        compile_server.shutdown()
+        thread.join()
+
+
+def process_request(socket_path: str, request: bytes) -> Iterator[Result]:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(request)
+
+        with client.makefile("rb") as stream:
+            yield from map(protocol.decode_result, stream)
+
+
+def run(args: list[str], capsys: pytest.CaptureFixture[str]) -> tuple[int, list[str]]:
+    status = cli.main(args)
+    return status, capsys.readouterr().err.splitlines()
+
+
+@pytest.mark.parametrize("parser", ["native", "lalr"])
+def test_check(
+    compile_server: server.Server,
+    socket_path: str,
+    parser: str,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+):
+    (tmp_path / "valid.lispy").write_text("(let ((x 1)) (cons x nil))")
+    (tmp_path / "invalid.lispy").write_text("(let ((x 1)) (cond (x 2) 3))")
+    args = ["check", "--parser", parser, str(tmp_path)]
+
+    local = run(args, capsys)
+    remote = run([*args, "--server", socket_path], capsys)
+
+    assert remote[0] == local[0] == 1
+    assert remote[1][0] == local[1][0]
+    assert remote[1][0].startswith(f"{tmp_path / 'invalid.lispy'}: UnificationError")
+    assert remote[1][1].startswith("2 files checked in ")
+
+
+def test_checking_again_is_incremental(
+    compile_server: server.Server,
+    socket_path: str,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+):
+    file = tmp_path / "file.lispy"
+    file.write_text("(list 1 2) (lambda ((b bool)) b)")
+    monkeypatch.chdir(tmp_path)
+    args = ["check", "--server", socket_path, "file.lispy"]
+
+    assert run(args, capsys)[0] == 0
+
+    checked: list[str] = []
+    check_form = incremental._check_form  # type: ignore
+
+    def record(sexp: object, text: str):
+        checked.append(text)
+        return check_form(sexp, text)
+
+    monkeypatch.setattr("lispyc.incremental._check_form", record)
+    file.write_text("(list 1 2) (lambda ((b bool)) (car b))")
+
+    status, lines = run(args, capsys)
+    assert status == 1
+    assert lines[0].startswith(f"{file}: UnificationError")
+    assert checked == ["(lambda ((b bool)) (car b))"]
+
+
+def test_metrics(
+    compile_server: server.Server,
+    socket_path: str,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+):
+    (tmp_path / "file.lispy").write_text("(let ((x 1)) (cons x nil))")
+    metrics_path = tmp_path / "metrics.json"
+    args = ["check", "--server", socket_path, "--metrics", str(metrics_path), str(tmp_path)]
+
+    assert run(args, capsys)[0] == 0
+    assert json.loads(metrics_path.read_text())["counters"]["forms_checked"] == 5
+
+
+def test_build(
+    compile_server: server.Server,
+    socket_path: str,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+):
+    source = "(let ((f (lambda ((x int)) (cons x nil)))) (f 1))"
+    (tmp_path / "file.lispy").write_text(source)
+    args = ["build", "--server", socket_path, str(tmp_path)]
+
+    status, lines = run(args, capsys)
+    assert status == 0
+    assert "  write" in "\n".join(lines)
+    assert cache.load(source, tmp_path / cache.CACHE_DIRECTORY) is not None
+
+    status, lines = run(args, capsys)
+    assert status == 0
+    assert "  load" in "\n".join(lines) and "  parse" not in "\n".join(lines)
+
+
+def test_least_recently_checked_files_are_evicted(
+    compile_server: server.Server,
+    socket_path: str,
+    tmp_path: Path,
+    capsys: pytest.CaptureFixture[str],
+):
+    compile_server.max_checkers = 2
+    files = [tmp_path / f"{name}.lispy" for name in "abc"]
+    for file in files:
+        file.write_text("1")
+
+    for file in (files[0], files[1], files[0], files[2]):
+        assert run(["check", "--server", socket_path, str(file)], capsys)[0] == 0
+
+    assert list(compile_server._checkers) == [files[0].resolve(), files[2].resolve()]
+
+
+def test_unknown_backend_is_answered(compile_server: server.Server, socket_path: str):
+    request = protocol.encode_request([Path("a.lispy"), Path("b.lispy")], Options(False, "x"))
+    results = list(process_request(socket_path, request))
+
+    assert [result.diagnostic for result in results] == [
+        "a.lispy: error: unknown parser backend 'x'",
+        "b.lispy: error: unknown parser backend 'x'",
+    ]
+
+
+def test_internal_error_is_answered(
+    compile_server: server.Server,
+    socket_path: str,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+):
+    def process_file(path: Path, options: Options) -> typing.NoReturn:
+        raise RecursionError("too deep")
+
+    (tmp_path / "file.lispy").write_text("1")
+    monkeypatch.setattr(compile_server, "process_file", process_file)
+
+    status, lines = run(["check", "--server", socket_path, str(tmp_path)], capsys)
+
+    assert status == 1
+    # The server prints the traceback to the same stderr as the client here.
+    assert lines[0].startswith("Traceback")
+    assert f"{tmp_path / 'file.lispy'}: internal error: RecursionError: too deep" in lines
+
+
+def test_invalid_request_is_not_answered(compile_server: server.Server, socket_path: str):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(b'{"paths": ["file.lispy"]}\n')
+
+        assert client.recv(1) == b""
+
+
+def test_missing_results(
+    socket_path: str,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture[str],
+):
+    (tmp_path / "file.lispy").write_text("1")
+    monkeypatch.setattr(server._Handler, "handle", lambda self: self.rfile.readline())
+
+    with server.Server(socket_path) as compile_server:
+        thread = threading.Thread(target=compile_server.serve_forever)
+        thread.start()
+
+        try:
+            status, lines = run(["check", "--server", socket_path, str(tmp_path)], capsys)
+        finally:
+            compile_server.shutdown()
+            thread.join()
+
+    assert status == 2
+    assert lines == [
+        f"lispyc: error: cannot use the server at {socket_path}: "
+        "The server closed the connection before processing every file."
+    ]
+
+
+def test_server_not_running(socket_path: str, tmp_path: Path, capsys: pytest.CaptureFixture[str]):
+    (tmp_path / "file.lispy").write_text("1")
+
+    status, lines = run(["check", "--server", socket_path, str(tmp_path)], capsys)
+
+    assert status == 2
+    assert lines[0].startswith(f"lispyc: error: cannot use the server at {socket_path}: ")
+
+
+def test_serve_until_terminated(socket_path: str, tmp_path: Path):
+    (tmp_path / "file.lispy").write_text("(car (list 1.5))")
+
+    # A socket which no server is listening on is replaced.
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale:
+        stale.bind(socket_path)
+
+    process = subprocess.Popen(
+        [sys.executable, "-m", "lispyc", "serve", socket_path], stderr=subprocess.PIPE, text=True
+    )
+
+    try:
+        assert process.stderr is not None
+        assert process.stderr.readline() == f"Listening on {socket_path}\n"
+
+        results = list(
+            cli.client.process_files(
+                socket_path, [tmp_path / "file.lispy"], Options(True, "native")
+            )
+        )
+        assert results[0].diagnostic is None and "write" in results[0].timings
+
+        with pytest.raises(FileExistsError, match="already listening"):
+            server.serve(socket_path)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(10) == 0
+
+    assert not Path(socket_path).exists()
+
+
+def test_serve_fails_if_path_is_not_a_socket(socket_path: str, capsys: pytest.CaptureFixture[str]):
+    Path(socket_path).write_text("not a socket")
+
+    status, lines = run(["serve", socket_path], capsys)
+
+    assert status == 2
+    assert lines[0].startswith(f"lispyc: error: cannot serve at {socket_path}: ")
+    assert Path(socket_path).read_text() == "not a socket"
+
+
+def test_serve_needs_unix_sockets(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+):
+    monkeypatch.delattr(socket, "AF_UNIX")
+
+    with pytest.raises(SystemExit) as e:
+        cli.main(["serve", "server.sock"])
+
+    assert e.value.code == 2
+    assert "needs Unix sockets" in capsys.readouterr().err
+
+
+def test_protocol_round_trip():
+    files, options = protocol.decode_request(
+        protocol.encode_request([Path("a.lispy"), Path("b/c.lispy")], Options(True, "lalr", True))
+    )
+    assert files == [Path("a.lispy"), Path("b/c.lispy")]
+    assert options == Options(True, "lalr", True)
+
+    for metrics in (None, {"timings": {"check": 0.25}, "counters": {"unify_calls": 2}}):
+        result = Result(Path("a.lispy"), "a.lispy: error", {"read": 0.5}, metrics)
+        assert protocol.decode_result(protocol.encode_result(result)) == result
+
+
+@pytest.mark.parametrize(
+    "line",
+    [b"", b"not json", json.dumps({"paths": []}).encode(), json.dumps([1]).encode()],
+)
+def test_invalid_messages(line: bytes):
+    with pytest.raises(ValueError):
+        protocol.decode_request(line)
+
+    with pytest.raises(ValueError):
+        protocol.decode_result(line)
@@ -0,0 +1,266 @@
+import ast
+import typing
+
+import pytest
+
+from lispyc import exceptions
+from lispyc.codegen import CodeGenerator, compile_program, execute
+from lispyc.nodes import Program
+from lispyc.parser import parse
+
+SPECIAL_FORMS = [
+    ("(list)", ()),
+    ("()", ()),
+    ("nil", ()),
+    ("(list 1 2.5 true)", (1, 2.5, True)),
+    ("(list (list 1) nil (list 2 3))", ((1,), (), (2, 3))),
+    ("(cons 1 nil)", (1,)),
+    ("(cons 1 (cons 2 (list 3)))", (1, 2, 3)),
+    ("(car (list 1 2))", 1),
+    ("(cdr (list 1 2 3))", (2, 3)),
+    ("(cdr (list 1))", ()),
+    ("(car (cdr (list (list 1) (list 2))))", (2,)),
+    ("(progn 1 2.0)", 2.0),
+    ("(progn 1 (progn 2 3) 4)", 4),
+    ("(let ((x 1)) x)", 1),
+    ("(let ((x 1) (y 2)) x y)", 2),
+    ("(let ((x 1)) (set x 2))", 2),
+    ("(let ((x 1)) (set x 2) x)", 2),
+    ("((lambda () 1))", 1),
+    ("((lambda ((x int) (y int)) y) 1 2)", 2),
+    ("(((lambda () (lambda ((x int)) x))) 3)", 3),
+    ("(cond (true 1) 2)", 1),
+    ("(cond (false 1) 2)", 2),
+    ("(cond (false 1) (true 2) (true 3) 4)", 2),
+    ("(select 2 (1 10) (2 20) (2 21) 0)", 20),
+    ("(select 5 (1 10) 0)", 0),
+    ("(select 1.5 (1.5 1) 0)", 1),
+    ("(select (list 1 2) ((list 1) 1) ((list 1 2) 2) 0)", 2),
+]
+
+SCOPES = [
+    ("(let ((x 1)) (let ((x 2)) x))", 2),
+    ("(let ((x 1)) (let ((x 2)) x) x)", 1),
+    ("(let ((x 1)) (let ((x 2) (y x)) y))", 1),
+    ("(let ((x 1)) ((lambda ((x int)) x) 2))", 2),
+    ("(let ((x 1)) ((lambda () x)))", 1),
+    ("(let ((x 1)) (let ((f (lambda () (set x 2)))) (f) x))", 2),
+    ("(let ((x 1)) (let ((f (lambda () (lambda () (set x 3))))) ((f)) x))", 3),
+    ("((lambda ((x int)) (let ((f (lambda () (set x 2)))) (f) x)) 1)", 2),
+    ("((lambda ((x int)) (let ((x 2) (f (lambda () (set x 3)))) (f) x)) 1)", 2),
+    ("(let ((x 1)) (let ((x 2)) (set x 3)) x)", 1),
+    (
+        "(let ((make (lambda ((n int)) (lambda () (set n (sum n 1)))))) "
+        "(let ((a (make 0)) (b (make 10))) (a) (a) (b) (list (a) (b))))",
+        (3, 12),
+    ),
+    ("(let ((sum (lambda ((x int) (y int)) (diff x y)))) (sum 3 1))", 2),
+    ("(let ((and (lambda ((x bool) (y bool)) x))) (and true false))", True),
+]
+
+README_EXAMPLES = [
+    (
+        """
+        (let
+          ((a 1) (b nil))
+          (set b
+            (cond
+              ((greaterp a 1) (list 1 2))
+              (list 3 4)
+            )
+          )
+          (car b)
+        )
+        """,
+        3,
+    ),
+    (
+        """
+        (let
+          (
+            (add_10
+              (lambda
+                ((sum_floats (func (float float) float)) (x float))
+                (progn
+                  (set x (sum_floats x 5.0))
+                  (sum_floats x 5.0)
+                )
+              )
+            )
+            (wrapped_sum
+              (lambda
+                ((a float) (b float))
+                (sum a b)
+              )
+            )
+          )
+          (add_10 wrapped_sum 2.1)
+        )
+        """,
+        12.1,
+    ),
+]
+
+COUNT_DOWN = """
+(let ((count nil))
+  (set count
+    (lambda ((n int) (acc int))
+      (cond ((eq n 0) acc) (count (dec n) (inc acc)))))
+  (count {n} 0))
+"""
+
+EVEN_ODD = """
+(let ((even nil) (odd nil))
+  (set even (lambda ((n int)) (cond ((eq n 0) true) (odd (dec n)))))
+  (set odd (lambda ((n int)) (cond ((eq n 0) false) (even (dec n)))))
+  (list (even {n}) (odd {n})))
+"""
+
+TAIL_CALLS = [
+    (COUNT_DOWN.format(n=100_000), 100_000),
+    (EVEN_ODD.format(n=100_001), (False, True)),
+    (
+        "(let ((f nil)) (set f (lambda ((a int) (b int) (n int)) "
+        "(cond ((eq n 0) (list a b)) (f b a (dec n))))) (f 1 2 3))",
+        (2, 1),
+    ),
+    (
+        "(let ((f nil)) (set f (lambda ((n int)) "
+        "(select n (0 nil) (progn n (let ((m (dec n))) (f m)))))) (f 100000))",
+        (),
+    ),
+    (
+        "(let ((f nil)) (set f (lambda ((n int)) (progn n (f (dec n))))) "
+        "(set f (lambda ((n int)) n)) (f 5))",
+        5,
+    ),
+    (
+        "(let ((f nil) (g (lambda ((n int)) (neg n)))) "
+        "(set f (lambda ((n int)) (cond ((eq n 0) (f n)) (progn (set f g) (f n))))) (f 1))",
+        -1,
+    ),
+    (
+        "(let ((f nil)) (set f (lambda () (f))) (set f (lambda () 1)) (f))",
+        1,
+    ),
+    (
+        "(let ((f nil)) (set f (lambda ((n int) (fs (list (func () int)))) "
+        "(cond ((eq n 0) fs) (f (dec n) (cons (lambda () n) fs))))) "
+        "(mapcar (f 3 nil) (lambda ((g (func () int))) (g))))",
+        (1, 2, 3),
+    ),
+    ("((lambda ((f (func (int) int))) (f 1)) (lambda ((x int)) (inc x)))", 2),
+]
+
+
+def run(program: str) -> list[typing.Any]:
+    return execute(compile_program(parse(program)))
+
+
+@pytest.mark.parametrize(["program", "value"], SPECIAL_FORMS)
+def test_special_form_runs(program: str, value: typing.Any):
+    assert run(program) == [value]
+
+
+@pytest.mark.parametrize(["program", "value"], SCOPES)
+def test_scope_runs(program: str, value: typing.Any):
+    assert run(program) == [value]
+
+
+@pytest.mark.parametrize(["program", "value"], README_EXAMPLES)
+def test_readme_example_runs(program: str, value: typing.Any):
+    assert run(program) == [pytest.approx(value)]
+
+
+@pytest.mark.parametrize(["program", "value"], TAIL_CALLS)
+def test_tail_call_runs(program: str, value: typing.Any):
+    assert run(program) == [value]
+
+
+def test_self_tail_call_loops():
+    module = CodeGenerator.generate_program(parse(COUNT_DOWN.format(n=1)))
+
+    assert any(isinstance(node, ast.While) for node in ast.walk(module))
+    assert not any(
+        isinstance(node, ast.alias) and node.name == "trampoline" for node in ast.walk(module)
+    )
+
+
+def test_mutual_tail_call_uses_trampoline():
+    module = CodeGenerator.generate_program(parse(EVEN_ODD.format(n=1)))
+    imports = {node.name for node in ast.walk(module) if isinstance(node, ast.alias)}
+
+    assert not any(isinstance(node, ast.While) for node in ast.walk(module))
+    assert {"TailCall", "trampoline"} <= imports
+
+
+def test_multiple_forms_run_in_order():
+    program = "(let ((x 1)) x) 2 (list 3) (lambda () 4)"
+    values = run(program)
+
+    assert values[:3] == [1, 2, (3,)]
+    assert values[3]() == 4
+
+
+def test_top_level_bindings_are_separate():
+    assert run("(let ((x 1)) (lambda () (set x 2)) x) (let ((x 3)) x)") == [1, 3]
+
+
+def test_arguments_are_evaluated_left_to_right(capsys: pytest.CaptureFixture[str]):
+    run("(list (println 1) (let ((x (println 2))) x) (println 3))")
+
+    assert capsys.readouterr().out == "1\n2\n3\n"
+
+
+def test_cond_only_evaluates_taken_branch(capsys: pytest.CaptureFixture[str]):
+    run("(cond ((progn (println 1) false) (println 2)) ((progn (println 3) true) (println 4)) nil)")
+
+    assert capsys.readouterr().out == "1\n3\n4\n"
+
+
+def test_select_evaluates_value_once(capsys: pytest.CaptureFixture[str]):
+    assert run("(select (progn (println 0) 2) (1 10) (2 20) 0)") == [20]
+    assert capsys.readouterr().out == "0\n"
+
+
+@pytest.mark.parametrize("name", ["and", "or"])
+def test_short_circuits(name: str, capsys: pytest.CaptureFixture[str]):
+    stop = "false" if name == "and" else "true"
+    [value] = run(f"({name} (progn (println 1) {stop}) (progn (println 2) {stop}))")
+
+    assert value == (name == "or")
+    assert capsys.readouterr().out == "1\n"
+
+
+@pytest.mark.parametrize("name", ["car", "cdr"])
+def test_nil_runtime_error(name: str):
+    with pytest.raises(exceptions.RuntimeError):
+        run(f"({name} nil)")
+
+
+@pytest.mark.parametrize("program", ["x", "(set x 1)", "(let ((x 1)) y)", "(lambda () (f))"])
+def test_unbound_name_error(program: str):
+    with pytest.raises(exceptions.UnboundNameError):
+        compile_program(parse(program))
+
+
+@pytest.mark.parametrize("depth", [1000, 10000])
+def test_deeply_nested_program_nesting_error(depth: int):
+    program = parse("(cons 1 " * depth + "nil" + ")" * depth)
+
+    with pytest.raises(exceptions.NestingError, match="nested too deeply"):
+        compile_program(program)
+
+    assert run("(cons 1 " * 100 + "nil" + ")" * 100) == [(1,) * 100]
+
+
+def test_generates_module():
+    module = CodeGenerator.generate_program(parse("(let ((f (lambda ((x int)) x))) (f 1))"))
+
+    assert isinstance(module, ast.Module)
+    assert any(isinstance(statement, ast.FunctionDef) for statement in module.body)
+
+
+def test_unknown_form_type_error():
+    with pytest.raises(TypeError, match="Unknown form"):
+        CodeGenerator.generate_program(Program((Program(()),)))  # type: ignore
@@ -0,0 +1,308 @@
+import array
+import functools
+import math
+import typing
+
+import pytest
+
+from lispyc import cache
+from lispyc.codegen import compile_program, execute, runtime
+from lispyc.codegen.patterns import Fold, Map, match_recursion
+from lispyc.codegen.runtime import make_array_list, make_list
+from lispyc.nodes import ComposedForm, Constant, Variable
+from lispyc.parser import parse
+
+RECOGNISED = [
+    (
+        "(lambda ((l (list int)) (acc int)) (cond ((null l) acc) (f (cdr l) (sum acc (car l)))))",
+        Fold("sum", "l", accumulator="acc"),
+    ),
+    (
+        "(lambda ((a float) (l (list float))) (cond ((null l) a) (f (max (car l) a) (cdr l))))",
+        Fold("max", "l", accumulator="a", element_first=True),
+    ),
+    (
+        "(lambda ((l (list int))) (cond ((null l) 1) (prod (f (cdr l)) (car l))))",
+        Fold("prod", "l", initial=Constant(1)),
+    ),
+    (
+        "(lambda ((l (list int))) (cond ((null l) nil) (cons (inc (prod 2 (car l))) (f (cdr l)))))",
+        Map(
+            "l",
+            ComposedForm(
+                Variable("inc"),
+                (ComposedForm(Variable("prod"), (Constant(2), Variable("l"))),),
+            ),
+        ),
+    ),
+]
+
+NOT_RECOGNISED = [
+    ("(lambda ((l (list int))) l)", ()),
+    ("(lambda ((l (list int))) (cond ((null l) 0) ((null l) 1) (f (cdr l))))", ()),
+    ("(lambda ((l (list int))) (cond ((null m) 0) (sum (car l) (f (cdr l)))))", ("m",)),
+    (
+        "(lambda ((l (list int)) (acc int)) (cond ((null l) acc) (f (cdr l) (diff acc (car l)))))",
+        (),
+    ),
+    (
+        "(lambda ((l (list int)) (acc int)) (cond ((null l) acc) (f (cdr l) (sum acc (car l)))))",
+        ("sum",),
+    ),
+    ("(lambda ((l (list int)) (acc int)) (cond ((null l) acc) (g (cdr l) (sum acc (car l)))))", ()),
+    ("(lambda ((l (list int)) (acc int)) (cond ((null l) 0) (f (cdr l) (sum acc (car l)))))", ()),
+    (
+        "(lambda ((l (list int)) (a int)) (cond ((null l) a) (f (cdr (cdr l)) (sum a (car l)))))",
+        (),
+    ),
+    ("(lambda ((l (list int)) (acc int)) (cond ((null l) acc) (f (cdr l) (sum acc acc))))", ()),
+    ("(lambda ((l (list int)) (n int) (acc int)) (cond ((null l) acc) (f (cdr l) n acc)))", ()),
+    ("(lambda ((l (list bool))) (cond ((null l) true) (and (car l) (f (cdr l)))))", ()),
+    ("(lambda ((l (list bool))) (cond ((null l) 0) (sum (car l) (f (cdr l)))))", ()),
+    (
+        "(lambda ((l (list int)) (acc float)) (cond ((null l) acc) (f (cdr l) (sum acc (car l)))))",
+        (),
+    ),
+    ("(lambda ((l (list float))) (cond ((null l) 1) (prod (car l) (f (cdr l)))))", ()),
+    ("(lambda ((l (list bool))) (cond ((null l) nil) (cons (inc (car l)) (f (cdr l)))))", ()),
+    ("(lambda ((l (list int))) (cond ((null l) 0) (sum (car l) (car l))))", ()),
+    ("(lambda ((l (list int))) (cond ((null l) 0) (sum (car l) (g (cdr l)))))", ()),
+    ("(lambda ((l (list int))) (cond ((null l) nil) (cons 1 (f (cdr l)))))", ()),
+    ("(lambda ((l (list int))) (cond ((null l) nil) (cons (div (car l) 2) (f (cdr l)))))", ()),
+    ("(lambda ((l (list int))) (cond ((null l) nil) (cons (sum (car l) true) (f (cdr l)))))", ()),
+    ("(lambda ((l (list int))) (cond ((null l) nil) (cons (inc (car l)) (f l))))", ()),
+    ("(lambda ((l (list int))) (cond ((null l) nil) (cons (inc (car l)) (f (cdr l)))))", ("inc",)),
+    ("(lambda ((l (list int))) (cond ((null l) nil) (cons (inc (car l)) (f (cdr l)))))", ("nil",)),
+]
+
+PROGRAM = """
+(let ((total nil) (rtotal nil) (biggest nil) (scale nil))
+  (set total
+    (lambda ((l (list int)) (acc int)) (cond ((null l) acc) (total (cdr l) (sum acc (car l))))))
+  (set rtotal (lambda ((l (list int))) (cond ((null l) 1) (prod (car l) (rtotal (cdr l))))))
+  (set biggest
+    (lambda ((acc float) (l (list float)))
+      (cond ((null l) acc) (biggest (max acc (car l)) (cdr l)))))
+  (set scale
+    (lambda ((l (list int))) (cond ((null l) nil) (cons (sum (prod 2 (car l)) 1) (scale (cdr l))))))
+  (list total rtotal biggest scale))
+"""
+
+
+def match(source: str, bound: tuple[str, ...]) -> Fold | Map | None:
+    lambda_ = parse(source).body[0]
+    names = {"f", "g", *(param.name.name for param in lambda_.parameters), *bound}  # type: ignore
+
+    return match_recursion(lambda_, lambda name: name == "f", names.__contains__)  # type: ignore
+
+
+@pytest.fixture
+def functions() -> list[typing.Callable[..., typing.Any]]:
+    [functions] = execute(compile_program(parse(PROGRAM)))
+    return list(functions)
+
+
+@pytest.fixture(params=[False, True], ids=["python", "numpy"])
+def numpy(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> bool:
+    if request.param:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(runtime, "_import_numpy", lambda: None)
+
+    return request.param
+
+
+@pytest.mark.parametrize(["source", "pattern"], RECOGNISED)
+def test_recognised(source: str, pattern: Fold | Map):
+    assert match(source, ()) == pattern
+
+
+@pytest.mark.parametrize(["source", "bound"], NOT_RECOGNISED)
+def test_not_recognised(source: str, bound: tuple[str, ...]):
+    assert match(source, bound) is None
+
+
+@pytest.mark.parametrize(
+    "create", [lambda *x: make_array_list("q", *x), make_list], ids=["array", "tuple"]
+)
+def test_vectorised_results_match_recursion(
+    functions: list[typing.Callable[..., typing.Any]], create: typing.Callable[..., typing.Any]
+):
+    total, rtotal, _, scale = functions
+
+    assert total(create(1, 2, 3), 10) == 16
+    assert rtotal(create(2, 3, 4)) == 24
+    assert scale(create(1, 2, 3)) == (3, 5, 7)
+
+
+def test_vectorised_floats(functions: list[typing.Callable[..., typing.Any]], numpy: bool):
+    [_, _, biggest, _] = functions
+
+    assert biggest(1.5, make_array_list("d", 0.5, 2.5, -1.0)) == 2.5
+    assert biggest(3.5, make_array_list("d", 0.5, 2.5).cdr) == 3.5
+    assert biggest(0.0, runtime.NIL) == 0.0
+
+
+@pytest.mark.parametrize(
+    ["operator", "values"],
+    [("sum", [1e16, 1.0, -1e16, 0.1, 0.2, 0.3]), ("prod", [1e308, 10.0, 1e-308, 0.1, 3.0])],
+)
+@pytest.mark.parametrize("right", [False, True])
+def test_vectorised_float_folds_round_like_recursion(
+    operator: str, values: list[float], right: bool, numpy: bool
+):
+    if right:
+        step = f"({operator} (car l) (f (cdr l)))"
+        lambda_ = f"(lambda ((l (list float))) (cond ((null l) 1.0) {step}))"
+        arguments: tuple[float, ...] = ()
+    else:
+        step = f"(f (cdr l) ({operator} acc (car l)))"
+        lambda_ = f"(lambda ((l (list float)) (acc float)) (cond ((null l) acc) {step}))"
+        arguments = (1.0,)
+
+    [function] = execute(compile_program(parse(f"(let ((f nil)) (set f {lambda_}) f)")))
+    conses = runtime.NIL
+    for value in reversed(values):
+        conses = runtime.ConsCell(value, conses)
+
+    recursive = function(conses, *arguments)
+
+    items = make_array_list("d", *values)
+
+    assert function(items, *arguments) == recursive
+    assert runtime.fold_numeric(operator, items, 1.0, right, element_first=right) == recursive
+
+
+@pytest.mark.parametrize("operator", ["max", "min"])
+@pytest.mark.parametrize(
+    "values", [[math.nan, 1.0], [1.0, math.nan, 2.0], [1.0, 2.0, math.nan], [-0.0, 0.0, -0.0]]
+)
+@pytest.mark.parametrize("element_first", [False, True])
+@pytest.mark.parametrize("right", [False, True])
+def test_vectorised_float_max_min_keep_argument_order(
+    operator: str, values: list[float], element_first: bool, right: bool, numpy: bool
+):
+    if right:
+        arguments = "(car l) (f (cdr l))" if element_first else "(f (cdr l)) (car l)"
+        lambda_ = f"(lambda ((l (list float))) (cond ((null l) 0.0) ({operator} {arguments})))"
+        initial: tuple[float, ...] = ()
+    else:
+        arguments = "(car l) acc" if element_first else "acc (car l)"
+        step = f"(f (cdr l) ({operator} {arguments}))"
+        lambda_ = f"(lambda ((l (list float)) (acc float)) (cond ((null l) acc) {step}))"
+        initial = (0.0,)
+
+    [function] = execute(compile_program(parse(f"(let ((f nil)) (set f {lambda_}) f)")))
+    conses = runtime.NIL
+    for value in reversed(values):
+        conses = runtime.ConsCell(value, conses)
+
+    recursive = function(conses, *initial)
+    vectorised = function(make_array_list("d", *values), *initial)
+    direct = runtime.fold_numeric(
+        operator, make_array_list("d", *values), 0.0, right, element_first
+    )
+
+    assert repr(vectorised) == repr(direct) == repr(recursive)
+
+
+def test_vectorised_float_map(numpy: bool):
+    program = """
+    (let ((f nil))
+      (set f
+        (lambda ((l (list float)))
+          (cond ((null l) nil) (cons (neg (diff (car l) 0.5)) (f (cdr l))))))
+      f)
+    """
+    [function] = execute(compile_program(parse(program)))
+    result = function(make_array_list("d", 1.0, 2.5))
+
+    assert isinstance(result._items, array.array) and result == (-0.5, -2.0)
+
+
+def test_bool_list_is_not_vectorised():
+    bools = make_array_list("b", True, False)
+
+    assert runtime.fold_numeric("sum", bools, 0, False, False) is runtime.NOT_VECTORISED
+    assert runtime.map_numeric(runtime.not_, bools) is runtime.NOT_VECTORISED
+
+
+def test_numpy_is_imported_if_installed():
+    try:
+        import numpy
+    except ModuleNotFoundError:
+        numpy = None
+
+    assert runtime._import_numpy() is numpy
+
+
+def test_vectorised_ints_are_exact(functions: list[typing.Callable[..., typing.Any]]):
+    total, rtotal, _, scale = functions
+    large = make_array_list("q", 2**62, 2**62, 2**62)
+
+    assert total(large, 0) == 3 * 2**62
+    assert rtotal(large) == 2**186
+    assert type(scale(large)._items) is tuple and scale(large) == (2**63 + 1,) * 3
+
+
+def test_vectorised_fold_skips_mismatched_initial(
+    functions: list[typing.Callable[..., typing.Any]],
+):
+    total, *_ = functions
+
+    assert (
+        runtime.fold_numeric("sum", make_array_list("q", 1, 2), 0.5, False, False)
+        is runtime.NOT_VECTORISED
+    )
+    assert total(make_array_list("q", 1, 2), 0.5) == 3.5
+
+
+def test_vectorised_recursion_is_not_limited_by_stack(
+    functions: list[typing.Callable[..., typing.Any]],
+):
+    _, rtotal, _, scale = functions
+    ones = make_array_list("q", *[1] * 100_000)
+
+    assert rtotal(ones) == 1
+    assert len(scale(ones)) == 100_000
+
+
+def test_reassigned_binding_is_not_vectorised():
+    program = """
+    (let ((f nil) (g nil))
+      (set f (lambda ((l (list int))) (cond ((null l) 0) (sum (car l) (f (cdr l))))))
+      (set g f)
+      (set f (lambda ((l (list int))) 100))
+      (g (list 1 2 3)))
+    """
+
+    assert execute(compile_program(parse(program))) == [101]
+
+
+def test_typechecked_program_is_vectorised(monkeypatch: pytest.MonkeyPatch):
+    source = """
+    (let ((total (lambda ((l (list float)) (acc float)) acc)))
+      (set total
+        (lambda ((l (list float)) (acc float))
+          (cond ((null l) acc) (total (cdr l) (sum acc (car l))))))
+      (total (list 0.5 1.5 2.5) 1.0))
+    (let ((scale (lambda ((l (list int))) l)))
+      (set scale
+        (lambda ((l (list int))) (cond ((null l) nil) (cons (inc (car l)) (scale (cdr l))))))
+      (scale (list 1 2 3)))
+    """
+    results = []
+
+    def record(function: typing.Callable[..., typing.Any]) -> typing.Callable[..., typing.Any]:
+        @functools.wraps(function)
+        def recorded(*arguments: typing.Any) -> typing.Any:
+            results.append(function(*arguments))
+            return results[-1]
+
+        return recorded
+
+    monkeypatch.setattr(runtime, "fold_numeric", record(runtime.fold_numeric))
+    monkeypatch.setattr(runtime, "map_numeric", record(runtime.map_numeric))
+
+    assert execute(cache.compile_source(source).code) == [5.5, (2, 3, 4)]
+    assert results == [5.5, (2, 3, 4)]
@@ -0,0 +1,264 @@
+import array
+import typing
+
+import pytest
+
+from lispyc.codegen import compile_program, execute
+from lispyc.codegen.runtime import (
+    BUILTINS,
+    NIL,
+    BoolListView,
+    ConsCell,
+    ListView,
+    format_value,
+    make_array_list,
+    make_list,
+)
+from lispyc.parser import parse
+from lispyc.typechecker import TypeChecker
+
+MANUAL_BUILTINS = """
+    eq equal greaterp evenp lessp null member not and or
+    sum prod diff neg inc dec div mod expt sqrt log lb lg ln recip abs min max
+    float floor ceil trunc round logand logior logxor lognot shift
+    append extend copy reverse length efface print println map mapcar
+"""
+
+BUILTIN_CALLS = [
+    ("(eq true true)", True),
+    ("(eq nil nil)", True),
+    ("(let ((l (list 1))) (eq l l))", True),
+    ("(let ((x 1)) (eq (list x) (list x)))", False),
+    ("(equal (list 1 (list 2.0)) (list 1 (list 2.0)))", True),
+    ("(equal (list 1 2) (list 1))", False),
+    ("(equal 0.1 (diff 0.3 0.2))", True),
+    ("(equal 1 2)", False),
+    ("(greaterp 2 1.5)", True),
+    ("(lessp 2 1.5)", False),
+    ("(evenp 4)", True),
+    ("(evenp -3)", False),
+    ("(null nil)", True),
+    ("(null (list 1))", False),
+    ("(member 2 (list 1 2))", True),
+    ("(member 3 (list 1 2))", False),
+    ("(not true)", False),
+    ("(and true true true)", True),
+    ("(or false false)", False),
+    ("(and true)", True),
+    ("(or false)", False),
+    ("(sum 1 2 3)", 6),
+    ("(sum 1 2.5)", 3.5),
+    ("(prod 2 3 4)", 24),
+    ("(diff 1 3)", -2),
+    ("(neg 2.5)", -2.5),
+    ("(inc 1)", 2),
+    ("(dec 1)", 0),
+    ("(div 7 2)", 3),
+    ("(div -7 2)", -3),
+    ("(div 7 2.0)", 3.5),
+    ("(mod 7 3)", 1),
+    ("(mod -7 3)", -1),
+    ("(mod 7.5 2)", 1.5),
+    ("(expt 2 10)", 1024),
+    ("(expt 2 -1)", 0),
+    ("(expt 2.0 -1)", 0.5),
+    ("(sqrt 17)", 4),
+    ("(sqrt 2.25)", 1.5),
+    ("(log 8 2)", 3),
+    ("(log 8.0 2)", pytest.approx(3.0)),
+    ("(lb 8)", 3),
+    ("(lg 1000.0)", pytest.approx(3.0)),
+    ("(ln 1)", 0),
+    ("(recip 2)", 0),
+    ("(recip 2.0)", 0.5),
+    ("(abs -3)", 3),
+    ("(min 3 1 2)", 1),
+    ("(min 3 1 2.0)", 1.0),
+    ("(max 3 1 2.0)", 3.0),
+    ("(float 3)", 3.0),
+    ("(floor -1.5)", -2),
+    ("(ceil 1.2)", 2),
+    ("(trunc -1.5)", -1),
+    ("(round 0.5)", 0),
+    ("(round 1.5)", 2),
+    ("(logand 6 3)", 2),
+    ("(logior 6 3)", 7),
+    ("(logxor 6 3)", 5),
+    ("(lognot 6)", -7),
+    ("(shift 1 3)", 8),
+    ("(shift 8 -2)", 2),
+    ("(append 3 (list 1 2))", (1, 2, 3)),
+    ("(extend (list 1) (list 2 3))", (1, 2, 3)),
+    ("(copy (list 1 2))", (1, 2)),
+    ("(let ((l (list 1))) (eq (copy l) l))", False),
+    ("(reverse (list 1 2 3))", (3, 2, 1)),
+    ("(length nil)", 0),
+    ("(length (list 1 2))", 2),
+    ("(efface 2 (list 1 2 3 2))", (1, 3, 2)),
+    ("(efface 4 (list 1 2))", (1, 2)),
+    ("(extend nil nil)", ()),
+    ("(reverse (cons 1 (cons 2 (list 3))))", (3, 2, 1)),
+    ("(length (cons 1 (cdr (list 2 3))))", 2),
+    ("(equal (cons 1 (list 2)) (list 1 2))", True),
+    ("(equal (cons 1 (list 2)) (cons 1 nil))", False),
+    ("(member 3 (cons 1 (cdr (list 2 3))))", True),
+    ("(map (cons 1 (list 2 3)) (lambda ((l (list int))) (length l)))", (3, 2, 1)),
+    ("(mapcar (list 1 2 3) (lambda ((x int)) (prod x x)))", (1, 4, 9)),
+]
+
+OUTPUTS = [
+    ("(print 1 2.5 true)", "1 2.5 true"),
+    ("(print)", " "),
+    ("(println (list 1 (list false)) nil)", "(1 (false)) nil\n"),
+    ("(println)", "\n"),
+]
+
+
+def run(program: str, typed: bool = False) -> list[typing.Any]:
+    ast = parse(program)
+    return execute(compile_program(ast, table=TypeChecker.infer_types(ast) if typed else None))
+
+
+@pytest.mark.parametrize(["program", "value"], BUILTIN_CALLS)
+def test_builtin_runs(program: str, value: typing.Any):
+    assert run(program) == [value]
+
+
+@pytest.mark.parametrize(["program", "output"], OUTPUTS)
+def test_output(program: str, output: str, capsys: pytest.CaptureFixture[str]):
+    assert execute(compile_program(parse(program))) == [()]
+    assert capsys.readouterr().out == output
+
+
+def test_format_function():
+    assert format_value(test_format_function) == f"<function at {id(test_format_function):#x}>"
+
+
+@pytest.mark.parametrize("program", ["(div 1 0)", "(sqrt -1)", "(log 0 2)"])
+def test_domain_error(program: str):
+    with pytest.raises((ArithmeticError, ValueError)):
+        execute(compile_program(parse(program)))
+
+
+def test_builtins_cover_manual():
+    assert set(BUILTINS) == set(MANUAL_BUILTINS.split())
+
+
+def test_cdr_of_view_shares_items():
+    list_ = make_list(1, 2, 3)
+    cdr = list_.cdr
+
+    assert type(cdr) is ListView and cdr._items is list_._items
+    assert cdr == (2, 3) and len(cdr) == 2
+    assert cdr.cdr.cdr is NIL
+
+
+def test_cons_shares_cdr():
+    cdr = make_list(2, 3)
+    list_ = ConsCell(1, cdr)
+
+    assert list_.cdr is cdr
+    assert list(list_) == [1, 2, 3] and len(list_) == 3
+
+
+@pytest.mark.parametrize(
+    ["list_", "representation"],
+    [(NIL, "NIL"), (make_list(1, 2), "ListView(1, 2)"), (ConsCell(1, NIL), "ConsCell(1,)")],
+)
+def test_list_repr(list_: typing.Any, representation: str):
+    assert repr(list_) == representation
+
+
+def test_lists_compare_by_elements():
+    assert ConsCell(1, make_list(2)) == make_list(1, 2) == (1, 2)
+    assert make_list(1) != ConsCell(2, NIL) and make_list(1) != [1]
+    assert hash(ConsCell(1, make_list(2))) == hash((1, 2))
+    assert not NIL and make_list(0) and ConsCell(0, NIL)
+
+
+def test_recursion_over_long_list_is_linear():
+    program = """
+    (let ((total nil) (build nil))
+      (set build
+        (lambda ((n int) (acc (list int)))
+          (cond ((eq n 0) acc) (build (dec n) (cons n acc)))))
+      (set total
+        (lambda ((l (list int)) (acc int))
+          (cond ((null l) acc) (total (cdr l) (sum acc (car l))))))
+      (list (total (build 100000 nil) 0) (total (reverse (build 100000 nil)) 0)))
+    """
+
+    assert execute(compile_program(parse(program))) == [(5000050000, 5000050000)]
+
+
+@pytest.mark.parametrize(
+    ["program", "typecode", "element_type"],
+    [("(list 1 2)", "q", int), ("(list 1.5 2.0)", "d", float), ("(list true false)", "b", bool)],
+)
+def test_typed_list_literal_uses_array(program: str, typecode: str, element_type: type):
+    [list_] = run(program, typed=True)
+
+    assert isinstance(list_._items, array.array) and list_._items.typecode == typecode
+    assert type(list_.car) is type(list_.cdr.car) is element_type
+    assert all(type(element) is element_type for element in list_)
+
+
+@pytest.mark.parametrize("typed", [False, True])
+def test_constant_list_literal_uses_array(typed: bool):
+    [list_] = run("(list 1 2)", typed)
+
+    assert isinstance(list_._items, array.array) and list_ == (1, 2)
+
+
+@pytest.mark.parametrize(["typed", "uses_array"], [(False, False), (True, True)])
+def test_variable_list_literal_uses_array_if_typed(typed: bool, uses_array: bool):
+    [list_] = run("(let ((x 1)) (list x 2))", typed)
+
+    assert isinstance(list_._items, array.array) == uses_array and list_ == (1, 2)
+
+
+@pytest.mark.parametrize("program", ["(list 1 2.0)", "(list (list 1) (list 2 3))"])
+def test_mixed_list_literal_uses_tuple(program: str):
+    [list_] = run(program)
+
+    assert type(list_._items) is tuple
+
+
+def test_nested_typed_list_literal():
+    [list_] = run("(list (list 1) (list 2 3))", typed=True)
+
+    assert type(list_._items) is tuple
+    assert isinstance(list_.car._items, array.array) and list_ == ((1,), (2, 3))
+
+
+def test_array_list_falls_back_to_tuple():
+    [list_] = run(f"(list 1 {2**63})", typed=True)
+
+    assert type(list_._items) is tuple and list_ == (1, 2**63)
+
+
+@pytest.mark.parametrize(
+    ["program", "value"],
+    [
+        ("(append 3 (list 1 2))", (1, 2, 3)),
+        ("(extend (list 1) (cons 2 nil))", (1, 2)),
+        ("(extend nil (list 1 2))", (1, 2)),
+        ("(copy (list 1 2))", (1, 2)),
+        ("(reverse (list 1 2))", (2, 1)),
+        ("(efface 1 (list 1 2))", (2,)),
+        ("(efface 3 (list 1 2))", (1, 2)),
+    ],
+)
+def test_builtin_keeps_array(program: str, value: typing.Any):
+    [list_] = run(program)
+
+    assert isinstance(list_._items, array.array) and list_ == value
+
+
+def test_bool_array_list():
+    list_ = make_array_list("b", True, False, True)
+
+    assert type(list_) is type(list_.cdr) is BoolListView and list_.cdr.cdr.cdr is NIL
+    assert list(list_) == [True, False, True] and format_value(list_) == "(true false true)"
+    assert type(make_array_list("b", True, False).cdr.car) is bool
+    assert make_array_list("q") is NIL
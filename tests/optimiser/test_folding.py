@@ -0,0 +1,166 @@
+import pytest
+
+from lispyc import cache
+from lispyc.codegen import compile_program, execute
+from lispyc.instrumentation import instrument
+from lispyc.nodes import Constant, Program
+from lispyc.optimiser import ConstantFolder, count_nodes, optimise, walk
+from lispyc.parser import parse
+from lispyc.typechecker import TypeChecker
+
+FOLDED = [
+    ("(sum 1 2 3)", "6"),
+    ("(div 7 2)", "3"),
+    ("(div 7.0 2)", "3.5"),
+    ("(not (lessp 1 2))", "false"),
+    ("(and true (or false true))", "true"),
+    ("(expt 2 64)", "18446744073709551616"),
+    ("(expt 2.0 3)", "8.0"),
+    ("(float (inc (prod 2 3)))", "7.0"),
+    ("(list (neg 1) (abs -2))", "(list -1 2)"),
+    ("(car (cdr (list (neg 1) (abs -2))))", "(car (cdr (list -1 2)))"),
+    ("(cond (false 1) (true 2) (x 3) 4)", "2"),
+    ("(cond (x 1) ((greaterp 1 2) 2) (y 3) 4)", "(cond (x 1) (y 3) 4)"),
+    ("(cond (x 1) ((equal 1 1) 2) (y 3) 4)", "(cond (x 1) 2)"),
+    ("(select 2 (1 10) (x 11) ((inc 1) 12) (y 13) 14)", "(select 2 (x 11) 12)"),
+    ("(select 2 (1 10) (3 11) 12)", "12"),
+    ("(select x (1 10) (2 11) 12)", "(select x (1 10) (2 11) 12)"),
+    ("(progn 1 (sum 2 3))", "5"),
+    ("(progn (set x 1) 2 nil sum (lambda ((a int)) a) x)", "(progn (set x 1) x)"),
+    ("(progn (progn (set x 1) (list 1 nil)) (progn 2 (set y 3)))", "(progn (set x 1) (set y 3))"),
+    ("(let ((a 1)) a (cons a nil) (set a 2) a)", "(let ((a 1)) (set a 2) a)"),
+    ("(lambda ((a int)) (cond ((not true) 1) (sum a (sum 1 1))))", "(lambda ((a int)) (sum a 2))"),
+    ("(let ((b 1)) (lambda ((a int)) (list a b (sum a nil))) b)", "(let ((b 1)) b)"),
+    ("(progn (lambda () (let ((c 1)) (set c 2))) 3)", "3"),
+]
+
+NOT_FOLDED = [
+    "(div 1 0)",
+    "(sqrt -1.0)",
+    "(expt 2 2000)",
+    "(shift 1 2000)",
+    "(expt 2 3 4)",
+    f"(prod {2**600} {2**600})",
+    "(sum 1 nil)",
+    "(and 1 2)",
+    "(eq 1 1)",
+    "(print 1)",
+    "(let ((sum (lambda ((x int)) x))) (sum 1 2))",
+    "(lambda ((not int)) (not true))",
+    "(progn x (set x 1) 2)",
+    "(progn (car nil) 1)",
+    "(progn (print 1) 2)",
+    "(progn (lambda () y) 1)",
+    "(progn (lambda ((a int)) (set b a)) 1)",
+    "(progn (lambda () (set sum 2)) 3)",
+]
+
+
+def folded(source: str) -> Program:
+    return ConstantFolder.transform_program(parse(source)).program
+
+
+@pytest.mark.parametrize(["source", "expected"], FOLDED)
+def test_folded(source: str, expected: str):
+    assert folded(source) == parse(expected)
+
+
+@pytest.mark.parametrize("source", NOT_FOLDED)
+def test_not_folded(source: str):
+    program = parse(source)
+    optimised = ConstantFolder.transform_program(program)
+
+    assert optimised.program is program and optimised.removed == 0
+
+
+def test_deeply_nested_program_is_folded():
+    depth = 10_000
+    source = "(progn 1 " * depth + "(car (cons (sum 1 2) " * depth + "nil" + "))" * depth
+    program = parse(source + ")" * depth)
+    optimised = ConstantFolder.transform_program(program)
+
+    # Each progn and its constant are removed, and each sum of 4 nodes is replaced with a constant.
+    assert optimised.removed == 2 * depth + 3 * depth
+    assert all(node.value == 3 for node in walk(optimised.program) if isinstance(node, Constant))
+
+
+def test_removed_nodes_are_counted():
+    program = parse("(cond ((not true) (list 1 2)) (progn 1 (sum 2 3)))")
+    optimised = optimise(program)
+
+    assert optimised.program == parse("5")
+    assert optimised.removed == count_nodes(program) - 1 == 13
+
+
+def test_types_are_kept():
+    program = parse("""
+        (let ((f (lambda ((x float)) (cond (false (list x)) (true (list x 2.5)) nil))))
+          (progn 1 (f 0.5)))
+        (cond (false (list 1)) (list 2 3))
+        """)
+    table = TypeChecker.infer_types(program)
+    optimised = ConstantFolder.transform_program(program, table)
+
+    assert optimised.table is not None and optimised.table.program is optimised.program
+    for old, new in zip(program.body, optimised.program.body):
+        assert optimised.table[new] is table[old]
+
+    let, list_ = optimised.program.body
+    assert let.body == parse("(f 0.5)").body  # type: ignore
+    assert let.bindings[0].value.body in optimised.table  # type: ignore
+    assert list_ is program.body[1].default  # type: ignore
+
+    [floats, ints] = execute(compile_program(optimised.program, table=optimised.table))
+    assert floats == (0.5, 2.5) and floats._items.typecode == "d"
+    assert ints == (2, 3) and ints._items.typecode == "q"
+
+
+def test_unchanged_program_keeps_table():
+    program = parse("(let ((x 1)) (cons x nil))")
+    table = TypeChecker.infer_types(program)
+    optimised = optimise(program, table)
+
+    assert optimised.program is program and optimised.table is table
+
+
+def test_results_are_unchanged():
+    source = """
+    (let ((f nil) (n (sum 2 3)))
+      (set f (lambda ((x int))
+        (cond
+          ((lessp x (prod 2 (neg 1))) (diff x 1))
+          ((greaterp 1 2) (div 1 0))
+          (true (select (mod 7 4) (1 x) ((inc 2) (sum x n)) 0))
+          x)))
+      (progn 1 (list (f 4) (f -5) (cond ((not false) (expt 2 10)) 0))))
+    """
+    program = parse(source)
+
+    assert execute(compile_program(optimise(program).program)) == [(9, -6, 1024)]
+    assert execute(compile_program(program)) == [(9, -6, 1024)]
+
+
+def test_typechecked_program_is_optimised():
+    source = """
+    (cond ((greaterp 2 1) (sum 1 2)) 3)
+    (select (inc 1) (1 10) (2 (prod 2 10)) 30)
+    (let ((x 1.5)) x (list x x) (cond ((not true) 4.0) (sum x (float 2))))
+    """
+    program = parse(source)
+    optimised = optimise(program, TypeChecker.infer_types(program))
+
+    assert optimised.program == parse("3 20 (let ((x 1.5)) (sum x 2.0))")
+
+    with instrument() as metrics:
+        compiled = cache.compile_source(source)
+
+    assert execute(compiled.code) == [3, 20, 3.5]
+    assert metrics.counters["nodes_removed"] == optimised.removed
+
+
+def test_metrics():
+    with instrument() as metrics:
+        optimise(parse("(progn 1 2 (sum 3 4))"))
+
+    assert metrics.counters["nodes_removed"] == 6
+    assert metrics.timings["optimise"] > 0
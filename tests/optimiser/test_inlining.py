@@ -0,0 +1,222 @@
+import pytest
+
+from lispyc import cache
+from lispyc.codegen import compile_program, execute
+from lispyc.instrumentation import instrument
+from lispyc.nodes import Cons, Variable
+from lispyc.optimiser import INLINE_BUDGET, LambdaInliner, optimise, walk
+from lispyc.parser import parse
+from lispyc.typechecker import TypeChecker
+
+README_EXAMPLE = """
+(let
+  (
+    (add_10
+      (lambda
+        ((sum_floats (func (float float) float)) (x float))
+        (progn (set x (sum_floats x 5.0)) (sum_floats x 5.0))))
+    (wrapped_sum (lambda ((a float) (b float)) (sum a b))))
+  (add_10 wrapped_sum 2.1))
+"""
+
+INLINED = [
+    ("(let ((f (lambda ((x int)) (sum x 1)))) (f 2))", "(sum 2 1)"),
+    ("(let ((f (lambda () 5)) (y 1)) (f) y)", "(let ((y 1)) 5 y)"),
+    ("(let ((f (lambda ((x int)) x)) (y 1)) y)", "(let ((y 1)) y)"),
+    ("(let ((f (lambda ((x int)) x)) (g (lambda () 1))) (f (g)) (g))", "(progn 1 1)"),
+    ("(let ((f (lambda ((x int)) (inc x)))) (f (f 1)))", "(inc (inc 1))"),
+    (
+        "(let ((f (lambda ((x int)) (sum x y)))) (lambda ((x int)) (f x)))",
+        "(lambda ((x int)) (sum x y))",
+    ),
+    (
+        "(let ((f (lambda ((x int)) (inc x)))) (let ((f (lambda ((x int)) (dec x)))) (f 1)) (f 2))",
+        "(progn (dec 1) (inc 2))",
+    ),
+    (
+        "(let ((f (lambda ((x int)) (sum x 2)))) (let ((g (lambda ((y int)) (f y)))) (g 1)))",
+        "(sum 1 2)",
+    ),
+    (
+        "(let ((f (lambda ((x int)) x)) (g (lambda ((x int)) x))) (list (f 1) g))",
+        "(let ((g (lambda ((x int)) x))) (list 1 g))",
+    ),
+    ("(let ((f (lambda ((x int)) (progn (set n x) n)))) (f 1))", "(progn (set n 1) n)"),
+    (
+        "(let ((f (lambda ((x int)) (progn (set x (inc x)) x)))) (f 1))",
+        "(let ((x 1)) (progn (set x (inc x)) x))",
+    ),
+    (
+        "(let ((f (lambda ((a int) (b int)) (diff a b)))) (f (inc 1) (dec 2)))",
+        "(let ((a (inc 1))) (diff a (dec 2)))",
+    ),
+    (
+        "(let ((f (lambda ((a int) (b int)) (diff b a)))) (f (inc 1) (dec 2)))",
+        "(let ((a (inc 1))) (diff (dec 2) a))",
+    ),
+    (
+        "(let ((f (lambda ((a int) (b int)) (diff a b)))) (f (inc b) a))",
+        "(let ((a (inc b)) (b a)) (diff a b))",
+    ),
+    (
+        "(let ((f (lambda ((a int) (b int)) (diff a b)))) (f 1 (inc a)))",
+        "(let ((b (inc a))) (diff 1 b))",
+    ),
+    (
+        "(let ((f (lambda ((x int)) (sum n x)))) (set n 1) (f (inc 2)))",
+        "(progn (set n 1) (let ((x (inc 2))) (sum n x)))",
+    ),
+    (
+        "(let ((f (lambda ((x int)) (inc x)))) (lambda ((y int)) (progn (set y 1) (f y))))",
+        "(lambda ((y int)) (progn (set y 1) (inc y)))",
+    ),
+    (
+        "(let ((f (lambda ((x int)) (sum x x)))) (lambda ((y int)) (progn (set y 1) (f y))))",
+        "(lambda ((y int)) (progn (set y 1) (let ((x y)) (sum x x))))",
+    ),
+]
+
+# Bodies of a lambda whose parameter `x` is bound to a call, and whether the call can be moved to
+# the parameter's only use in the body, or has to be evaluated first.
+MOVED = [
+    ("(cons x nil)", True),
+    ("(cons 1 x)", True),
+    ("(car (list x))", True),
+    ("(sum (car nil) x)", False),
+    ("(sum (print 1) x)", False),
+    ("(let ((y 1)) (sum y x))", True),
+    ("(let ((y z)) (sum y x))", True),
+    ("(cond (x 1) 2)", True),
+    ("(cond (b 1) x)", False),
+    ("(select x (1 2) 3)", True),
+    ("(select 1 (1 x) 3)", False),
+    ("(progn (set n 1) x)", False),
+    ("(progn (lambda ((a int)) a) x)", True),
+    ("(lambda ((a int)) x)", False),
+    ("(sum x x)", False),
+    ("(let ((z 1)) (sum z x))", False),
+]
+NOT_INLINED = [
+    "(let ((f (lambda ((x int)) x))) f)",
+    "(let ((f (lambda ((x int)) x))) (map (list 1) f))",
+    "(let ((f (lambda ((x int)) x))) (set f f) (f 1))",
+    "(let ((f (lambda ((x int)) x))) (progn (set f (lambda ((x int)) 2)) (f 1)))",
+    "(let ((f (lambda ((x int)) x))) (f 1 2))",
+    "(let ((f (lambda ((x int)) (sum x y))) (y 1)) (f 1))",
+    "(let ((f (lambda ((x int)) (sum x y)))) (let ((y 2)) (f 1)))",
+    "(let ((f (lambda ((x int)) (sum x y)))) (lambda ((y int)) (f 1)))",
+    "(let ((f (lambda ((x int)) (sum x 1)))) (let ((sum nil)) (f 1)))",
+    "(let ((f (lambda ((x int)) (f x)))) (f 1))",
+    "(let ((f (lambda ((x int)) x)) (f (lambda ((x int)) 1))) (f 1))",
+    "(let ((f 1)) (f 1))",
+    f"(let ((f (lambda ((x int)) (sum {' '.join(['x'] * INLINE_BUDGET)})))) (f 1))",
+]
+
+
+@pytest.mark.parametrize(["source", "expected"], INLINED)
+def test_inlined(source: str, expected: str):
+    assert LambdaInliner.transform_program(parse(source)).program == parse(expected)
+
+
+@pytest.mark.parametrize("source", NOT_INLINED)
+def test_not_inlined(source: str):
+    program = parse(source)
+    optimised = LambdaInliner.transform_program(program)
+
+    assert optimised.program is program and optimised.removed == 0
+
+
+@pytest.mark.parametrize(["body", "moved"], MOVED)
+def test_argument_is_moved_into_body(body: str, moved: bool):
+    program = parse(f"(let ((f (lambda ((x int)) {body}))) (f (inc z)))")
+    optimised = LambdaInliner.transform_program(program).program
+
+    assert (Variable("x") not in walk(optimised)) == moved
+
+
+def test_budget_is_inclusive():
+    arguments = " ".join(["x"] * (INLINE_BUDGET - 2))
+    program = parse(f"(let ((f (lambda ((x int)) (sum {arguments})))) (f 1))")
+
+    expected = " ".join(["1"] * (INLINE_BUDGET - 2))
+
+    assert LambdaInliner.transform_program(program).program == parse(f"(sum {expected})")
+
+
+def test_readme_example():
+    program = parse(README_EXAMPLE)
+    optimised = optimise(program)
+
+    assert "add_10" not in repr(optimised.program) and "wrapped_sum" in repr(optimised.program)
+    assert execute(compile_program(optimised.program)) == execute(compile_program(program))
+
+
+def test_typechecked_program_is_inlined():
+    source = """
+    (let ((wrap (lambda ((x int)) (cons x nil)))
+          (first (lambda ((l (list int))) (car l))))
+      (first (wrap 1))
+      (wrap (first (wrap 2))))
+    """
+    with instrument() as metrics:
+        compiled = cache.compile_source(source)
+
+    [result] = execute(compiled.code)
+    assert tuple(result) == (2,)
+    assert metrics.counters["nodes_removed"] == 20
+
+
+def test_readme_example_is_compiled():
+    program = parse(README_EXAMPLE)
+    optimised = optimise(program, TypeChecker.infer_types(program))
+
+    with instrument() as metrics:
+        compiled = cache.compile_source(README_EXAMPLE)
+
+    assert "add_10" not in repr(optimised.program)
+    assert metrics.counters["nodes_removed"] == optimised.removed > 0
+    assert execute(compiled.code) == pytest.approx([12.1])
+
+
+def test_deeply_nested_calls_are_inlined():
+    depth = 1000
+    program = parse(
+        f"(let ((f (lambda ((x int)) (car (cons x nil))))) {'(f ' * depth}1{')' * depth})"
+    )
+    optimised = LambdaInliner.transform_program(program).program
+
+    assert Variable("f") not in walk(optimised)
+    assert sum(isinstance(form, Cons) for form in walk(optimised)) == depth
+
+
+def test_types_are_kept():
+    program = parse(
+        "(let ((f (lambda ((x float)) (list x x))) (g (lambda ((y int)) (cons y nil)))) (f 1.5))"
+    )
+    table = TypeChecker.infer_types(program)
+    optimised = optimise(program, table)
+
+    assert optimised.table is not None
+    assert optimised.table[optimised.program.body[0]] is table[program.body[0]]
+
+    [result] = execute(compile_program(optimised.program, table=optimised.table))
+    assert result == (1.5, 1.5) and result._items.typecode == "d"
+
+
+def test_results_are_unchanged():
+    source = """
+    (let ((n 0) (total 0))
+      (let ((bump (lambda ((k int)) (progn (set n (sum n k)) n)))
+            (twice (lambda ((x int)) (sum x x)))
+            (loop nil))
+        (set loop
+          (lambda ((i int))
+            (cond ((lessp i 1) total) (progn (set total (sum total (twice i))) (loop (dec i))))))
+        (list (bump 1) (twice (bump 10)) n (loop 100))))
+    """
+    program = parse(source)
+    optimised = optimise(program)
+
+    assert "bump" not in repr(optimised.program) and "twice" not in repr(optimised.program)
+    assert execute(compile_program(optimised.program)) == [(1, 22, 11, 10100)]
+    assert execute(compile_program(program)) == [(1, 22, 11, 10100)]
@@ -1,5 +1,8 @@
+import re
+
 import pytest
 
+import lispyc.parser
 from lispyc import exceptions, nodes
 from lispyc.nodes import ComposedForm, Constant, List, Program, Variable
 from lispyc.parser import parse
@@ -82,6 +85,20 @@ INVALID_MULTIPLE_PROGRAMS = [
     "(x 3) 7.8 (cons 19) (list 2) 1 (select a b c)",
 ]
 
+NESTED_PROGRAMS = [
+    *(program for program, _ in MULTIPLE_PROGRAMS),
+    "(let ((x (list 1 2)) (y (lambda ((a (list int))) (car a)))) (y (cdr x)))",
+    "(cond ((f 1) (g 2)) (true (select x (1 (progn 2 3)) (3 (list 4)))))",
+    "((lambda ((f (func (int) int))) (f 1)) (lambda ((lambda int)) lambda))",
+]
+
+INVALID_NESTED_PROGRAMS = [
+    *INVALID_MULTIPLE_PROGRAMS,
+    "(list 1 (cons 2 (car)) (lambda))",
+    "(let ((x (cdr 1 2))) (list (let)))",
+    "(lambda ((x (func int))) (cons x))",
+]
+
 
 @pytest.mark.parametrize("program", ["x", "y1", "z_A", "C", "nil", "not", "float"])
 def test_variable_parses(program: str):
@@ -121,3 +138,41 @@ def test_multiple_programs_parses(program: str, nodes_: tuple[nodes.Form, ...]):
 def test_multiple_programs_propagates_failures(program: str):
     with pytest.raises(exceptions.SyntaxError):
         parse(program)
+
+
+@pytest.mark.parametrize("program", NESTED_PROGRAMS)
+def test_iterative_parsing_matches_recursive_parsing(program: str, monkeypatch: pytest.MonkeyPatch):
+    expected = parse(program)
+    monkeypatch.setattr(lispyc.parser, "_MAX_RECURSION_DEPTH", 0)
+
+    assert parse(program) == expected
+
+
+@pytest.mark.parametrize("program", INVALID_NESTED_PROGRAMS)
+def test_iterative_parsing_raises_same_error(program: str, monkeypatch: pytest.MonkeyPatch):
+    with pytest.raises(exceptions.SyntaxError) as expected:
+        parse(program)
+
+    monkeypatch.setattr(lispyc.parser, "_MAX_RECURSION_DEPTH", 0)
+
+    with pytest.raises(type(expected.value), match=re.escape(str(expected.value))):
+        parse(program)
+
+
+def test_deeply_nested_form_parses():
+    depth = 100_000
+    result = parse("(cons 1 " * depth + "nil" + ")" * depth)
+
+    form = result.body[0]
+    for _ in range(depth):
+        assert isinstance(form, nodes.Cons) and form.car == Constant(1)
+        form = form.cdr
+
+    assert form == Variable("nil")
+
+
+def test_deeply_nested_form_propagates_failure():
+    depth = 100_000
+
+    with pytest.raises(exceptions.SpecialFormSyntaxError):
+        parse("(cons 1 " * depth + "(car)" + ")" * depth)
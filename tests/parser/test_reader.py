@@ -0,0 +1,59 @@
+from typing import Any
+
+import pytest
+from lark.exceptions import UnexpectedInput
+
+from lispyc.sexpression import nodes, parser, reader
+
+from .test_sexpression_parser import (
+    LIST_NESTED_PARAMS,
+    MISSING_PAREN_PARAMS,
+    PROGRAM_PARAMS,
+    inject_random_ws,
+)
+
+PROGRAMS = [program for program, _ in PROGRAM_PARAMS + LIST_NESTED_PARAMS] + ["$", "$($)$"]
+
+ERROR_ATTRIBUTES = ("line", "column", "pos_in_stream")
+
+
+def get_metas(node: nodes.Node) -> list[dict[str, Any]]:
+    metas = [vars(node.meta)]
+    match node:
+        case nodes.List(children) | nodes.Program(children):
+            for child in children:
+                metas += get_metas(child)
+        case _:
+            pass
+
+    return metas
+
+
+@pytest.mark.parametrize("program", PROGRAMS)
+def test_meta_same_as_lalr(program: str):
+    program = inject_random_ws(program, "$")
+
+    ast = reader.read(program)
+    expected = parser.parse(program, "lalr")
+
+    assert ast == expected
+    assert get_metas(ast) == get_metas(expected)
+
+
+@pytest.mark.parametrize(
+    "program", MISSING_PAREN_PARAMS + ["$1e$", "$($a$ $1.2.3$)$", "$a\vb$", "$($abc"]
+)
+def test_error_same_as_lalr(program: str):
+    program = inject_random_ws(program, "$")
+
+    with pytest.raises(UnexpectedInput) as expected:
+        parser.parse(program, "lalr")
+
+    with pytest.raises(type(expected.value)) as actual:
+        reader.read(program)
+
+    for attribute in ERROR_ATTRIBUTES:
+        assert getattr(actual.value, attribute) == getattr(expected.value, attribute)
+
+    if token := getattr(expected.value, "token", None):
+        assert actual.value.token.type == token.type  # pyright: ignore
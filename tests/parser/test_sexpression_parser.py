@@ -3,6 +3,9 @@ from __future__ import annotations
 import math
 import random
 import string
+import subprocess
+import sys
+from pathlib import Path
 from typing import Any, Union
 
 import pytest
@@ -307,3 +310,55 @@ def test_missing_parenthesis_ws(program: str):
 
     with pytest.raises(UnexpectedInput):
         parser.parse(program)
+
+
+@pytest.mark.parametrize("backend", ["lalr", "earley", "standalone"])
+@pytest.mark.parametrize(["program", "value"], PROGRAM_PARAMS + LIST_NESTED_PARAMS)
+def test_backends_agree(program: str, value: List, backend: parser.Backend):
+    if backend == "standalone":
+        pytest.importorskip("lispyc.sexpression._standalone")
+
+    program = inject_random_ws(program, "$")
+
+    ast = parser.parse(program, backend)
+
+    assert ast == value
+    assert ast == parser.parse(program)
+
+
+@pytest.mark.parametrize("backend", ["lalr", "earley"])
+@pytest.mark.parametrize("program", INVALID_ATOM_PARAMS)
+def test_backend_invalid_atom(program: str, backend: parser.Backend):
+    with pytest.raises(UnexpectedCharacters):
+        parser.parse(program, backend)
+
+
+def test_unknown_backend_raises_value_error():
+    with pytest.raises(ValueError, match="Unknown parser backend"):
+        parser.parse("1", "cyk")  # pyright: ignore[reportGeneralTypeIssues]
+
+
+def test_missing_standalone_raises_module_not_found_error(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(parser, "_STANDALONE_MODULE", "lispyc.sexpression._does_not_exist")
+
+    with pytest.raises(ModuleNotFoundError, match="make standalone"):
+        parser._load_standalone()  # pyright: ignore[reportPrivateUsage]
+
+
+def test_import_does_not_create_parsers():
+    code = "from lispyc.sexpression import parser; print(parser._get_parser.cache_info().currsize)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+
+    assert result.stdout == "0\n"
+
+
+@pytest.mark.parametrize("backend", ["lalr", "earley"])
+def test_grammar_is_independent_of_working_directory(
+    backend: parser.Backend, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    monkeypatch.chdir(tmp_path)
+    parser._get_parser.cache_clear()  # pyright: ignore[reportPrivateUsage]
+
+    assert parser.parse("(a 1)", backend) == parser.parse("(a 1)")
@@ -0,0 +1,149 @@
+import marshal
+import threading
+from pathlib import Path
+
+import pytest
+
+import lispyc
+from lispyc import cache
+from lispyc.codegen import execute
+from lispyc.instrumentation import Metrics
+from lispyc.nodes.types import BoolType, FunctionType, IntType, ListType, UnknownType
+
+PROGRAM = (
+    "(let ((f (lambda ((x int)) (cons x nil)))) (f 1)) (lambda ((b bool)) b) nil (list nil nil) 1.5"
+)
+
+
+def entry_path(directory: Path, source: str) -> Path:
+    return directory / f"{cache.get_cache_key(source)}.lispyc"
+
+
+def test_compile_source_without_cache():
+    compiled = cache.compile_source(PROGRAM)
+    values = execute(compiled.code)
+
+    assert values[0] == (1,) and values[1](True) is True and values[2:] == [(), ((), ()), 1.5]
+    assert compiled.types[:2] == (ListType(IntType()), FunctionType((BoolType(),), BoolType()))
+
+
+def test_warm_start_skips_compiling(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    cold = cache.compile_source(PROGRAM, tmp_path)
+    assert entry_path(tmp_path, PROGRAM).is_file()
+
+    def fail(*args: object):  # pragma: no cover
+        raise AssertionError("The program was compiled again.")
+
+    monkeypatch.setattr(cache, "parse_program", fail)
+    monkeypatch.setattr(cache.TypeChecker, "check_program", fail)
+    warm = cache.compile_source(PROGRAM, tmp_path)
+
+    assert warm.code == cold.code
+    assert warm.types[:2] == cold.types[:2]
+    assert execute(warm.code)[0] == (1,)
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_compile_source_timings(tmp_path: Path, cached: bool):
+    if cached:
+        cache.compile_source(PROGRAM, tmp_path)
+
+    timings = Metrics()
+    cache.compile_source(PROGRAM, tmp_path, backend="lalr", timings=timings)
+
+    if cached:
+        assert timings.timings.keys() == {"load"}
+    else:
+        phases = {"load", "parse", "check", "optimise", "generate", "write"}
+        assert timings.timings.keys() == phases
+
+
+def test_unknown_types_are_shared():
+    [nil, nested] = cache.compile_source("nil (let ((l nil)) (list l l))").types
+    stored = marshal.loads(marshal.dumps(cache._encode_types((nil, nested, nil))))
+    nil_1, nested_1, nil_2 = cache._decode_types(stored)
+
+    assert isinstance(nil_1, ListType) and isinstance(nil_1.element_type, UnknownType)
+    assert nil_1.element_type is nil_2.element_type  # type: ignore
+    assert nil_1.element_type != nil.element_type  # type: ignore
+    assert isinstance(nested_1, ListType) and isinstance(nested_1.element_type, ListType)
+    assert nested_1.element_type.element_type is not nil_1.element_type
+
+
+def test_key_depends_on_version(monkeypatch: pytest.MonkeyPatch):
+    key = cache.get_cache_key(PROGRAM)
+    monkeypatch.setattr(lispyc, "__version__", "0.0.0+other")
+
+    assert cache.get_cache_key(PROGRAM) != key
+    assert cache.get_cache_key(PROGRAM + " ") != cache.get_cache_key(PROGRAM)
+
+
+def test_load_missing_entry(tmp_path: Path):
+    assert cache.load(PROGRAM, tmp_path) is None
+    assert cache.load(PROGRAM, tmp_path / "missing") is None
+
+
+@pytest.mark.parametrize(
+    "entry",
+    [
+        b"",
+        b"not marshalled",
+        marshal.dumps(None),
+        (None, None, ()),
+        ("bad-key", compile("", "", "exec"), ()),
+        (None, compile("", "", "exec"), (("unknown", "x"),)),
+        (None, compile("", "", "exec"), (("list",),)),
+    ],
+)
+def test_invalid_entry_is_recompiled(tmp_path: Path, entry: bytes | tuple[object, ...]):
+    if isinstance(entry, tuple):
+        key = entry[0] or cache.get_cache_key(PROGRAM)
+        entry = marshal.dumps((key, *entry[1:]))
+
+    entry_path(tmp_path, PROGRAM).write_bytes(entry)
+
+    assert cache.load(PROGRAM, tmp_path) is None
+    assert execute(cache.compile_source(PROGRAM, tmp_path).code)[0] == (1,)
+    assert cache.load(PROGRAM, tmp_path) is not None
+
+
+def test_store_ignores_os_errors(tmp_path: Path):
+    file = tmp_path / "file"
+    file.write_text("")
+
+    cache.compile_source(PROGRAM, file)  # The cache directory is a file.
+    assert file.read_text() == ""
+
+
+def test_failed_write_removes_temporary_file(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    def fail(*args: object):
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(cache.os, "replace", fail)
+
+    with pytest.raises(KeyboardInterrupt):
+        cache.compile_source(PROGRAM, tmp_path)
+
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_concurrent_writes(tmp_path: Path):
+    compiled = cache.compile_source(PROGRAM)
+    errors: list[BaseException] = []
+
+    def write():
+        try:
+            for _ in range(20):
+                cache.store(PROGRAM, compiled, tmp_path)
+                assert cache.load(PROGRAM, tmp_path) is not None
+        except BaseException as e:  # pragma: no cover
+            errors.append(e)
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert list(tmp_path.iterdir()) == [entry_path(tmp_path, PROGRAM)]
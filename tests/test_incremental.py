@@ -0,0 +1,145 @@
+import random
+
+import pytest
+from lark.exceptions import UnexpectedInput
+
+from lispyc import exceptions, incremental
+from lispyc.incremental import IncrementalChecker
+from lispyc.nodes import BoolType, FloatType, IntType, ListType
+from lispyc.parser import parse
+from lispyc.sexpression import SExpression
+from lispyc.typechecker import TypeChecker
+
+random.seed(1)
+
+FORMS = [
+    "1",
+    "2.5",
+    "true",
+    "(list 1 2)",
+    "(let ((x 1)) (cons x nil))",
+    "(lambda ((f (func (int) bool)) (x int)) (f x))",
+    "(cond ((car (list false)) 1.0) 2.0)",
+    "(select 1 (2 (list true)) (cdr (list false)))",
+    "(progn (list (list 1)) (car (list 1.5)))",
+]
+
+EDITS = ["", " ", "(", ")", "1", "x", "(list 1)", "\n", "true", "2.0 "]
+
+
+def check(source: str) -> list[str] | type[Exception]:
+    try:
+        return [repr(type_) for type_ in TypeChecker.check_program(parse(source))]
+    except (exceptions.LispyError, UnexpectedInput) as e:
+        return type(e)
+
+
+def check_incremental(checker: IncrementalChecker, source: str) -> list[str] | type[Exception]:
+    try:
+        return [repr(type_) for type_ in checker.check(source)]
+    except (exceptions.LispyError, UnexpectedInput) as e:
+        return type(e)
+
+
+def test_random_edits_match_full_check():
+    checker = IncrementalChecker()
+    source = "\n".join(random.choices(FORMS, k=30))
+
+    for _ in range(300):
+        if random.random() < 0.1:
+            source = "\n".join(random.choices(FORMS, k=random.randint(0, 30)))
+        else:
+            start = random.randint(0, len(source))
+            end = min(len(source), start + random.choice([0, 0, 1, 2, 10]))
+            edit = random.choice(EDITS + FORMS)
+            source = source[:start] + edit + source[end:]
+
+        assert check_incremental(checker, source) == check(source), source
+
+
+def record_checked_forms(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    checked: list[str] = []
+    check_form = incremental._check_form
+
+    def record(sexp: SExpression, text: str) -> incremental._Entry:
+        checked.append(text)
+        return check_form(sexp, text)
+
+    monkeypatch.setattr(incremental, "_check_form", record)
+    return checked
+
+
+def test_only_changed_forms_are_checked(monkeypatch: pytest.MonkeyPatch):
+    checked = record_checked_forms(monkeypatch)
+    checker = IncrementalChecker()
+
+    assert checker.check("1 (list 2.0) true") == [IntType(), ListType(FloatType()), BoolType()]
+    assert checked == ["1", "(list 2.0)", "true"]
+
+    checked.clear()
+    assert checker.check("1 (list 2.0 3.0) true") == [IntType(), ListType(FloatType()), BoolType()]
+    assert checked == ["(list 2.0 3.0)"]
+
+    checked.clear()
+    assert checker.check("1  (list 2.0 3.0)\ntrue false") == [
+        IntType(),
+        ListType(FloatType()),
+        BoolType(),
+        BoolType(),
+    ]
+    assert checked == ["false"]
+
+    checked.clear()
+    assert checker.check("(list 2.0 3.0) 1") == [ListType(FloatType()), IntType()]
+    assert checked == []
+
+
+def test_adjacent_atoms_merge():
+    checker = IncrementalChecker()
+
+    assert checker.check("1 2") == [IntType(), IntType()]
+    assert checker.check("12") == [IntType()]
+    assert checker.check("1.2") == [FloatType()]
+
+
+def test_errors_are_raised_in_order():
+    checker = IncrementalChecker()
+
+    with pytest.raises(exceptions.UnboundNameError):
+        checker.check("1 x (car 1)")
+
+    with pytest.raises(exceptions.UnificationError):
+        checker.check("1 (car 1) x")
+
+    with pytest.raises(exceptions.SpecialFormSyntaxError):
+        checker.check("(cons 1) (car 1)")
+
+    assert checker.check("(cons 1 nil)") == [ListType(IntType())]
+
+
+def test_read_error_keeps_previous_version():
+    checker = IncrementalChecker()
+    checker.check("1 (list true) 2.0")
+
+    with pytest.raises(UnexpectedInput) as error:
+        checker.check("1 (list true 2.0")
+
+    assert error.value.pos_in_stream == len("1 (list true 2.0") - 3  # type: ignore
+
+    with pytest.raises(UnexpectedInput):
+        checker.check("1 (list true)) 2.0")
+
+    assert checker.check("1 (list false) 2.0") == [IntType(), ListType(BoolType()), FloatType()]
+
+
+def test_edit_in_large_source(monkeypatch: pytest.MonkeyPatch):
+    checker = IncrementalChecker()
+    forms = [FORMS[i % len(FORMS)] for i in range(1000)]
+    checker.check("\n".join(forms))
+
+    checked = record_checked_forms(monkeypatch)
+    forms[500] = "(list 1.0)"
+    source = "\n".join(forms)
+
+    assert check_incremental(checker, source) == check(source)
+    assert checked == ["(list 1.0)"]
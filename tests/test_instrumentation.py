@@ -0,0 +1,125 @@
+import json
+import threading
+
+import pytest
+
+from lispyc import instrumentation, sexpression
+from lispyc.codegen import compile_program
+from lispyc.exceptions import UnificationError
+from lispyc.instrumentation import Metrics, instrument
+from lispyc.nodes import UnknownType
+from lispyc.parser import parse, parse_program
+from lispyc.typechecker import InstrumentedUnifier, TypeChecker
+
+PROGRAM = "(let ((l nil) (x 1)) (set l (cons x nil)) (car l)) (lambda ((b bool)) b)"
+
+
+def test_phases_and_counters():
+    with instrument() as metrics:
+        program = parse(PROGRAM)
+        list(TypeChecker.check_program(program))
+        compile_program(program)
+
+    assert metrics.timings.keys() == {
+        "sexpression_read",
+        "parse_form",
+        "check",
+        "unify",
+        "generate",
+    }
+    assert all(seconds > 0 for seconds in metrics.timings.values())
+    assert metrics.timings["unify"] < metrics.timings["check"]
+    assert metrics.counters == {
+        "forms_checked": 11,
+        "scopes_created": 2,
+        "unify_calls": 4,
+        "unknown_types_created": 4,
+        "max_union_find_chain": 1,
+    }
+
+
+@pytest.mark.parametrize("backend", ["lalr", "earley"])
+def test_lark_phases(backend: sexpression.Backend):
+    with instrument() as metrics:
+        parse_program(sexpression.parse(PROGRAM, backend))
+
+    assert metrics.timings.keys() == {"lark_parse", "lark_transform", "parse_form"}
+
+
+def test_infer_types_is_instrumented():
+    with instrument() as metrics:
+        TypeChecker.infer_types(parse(PROGRAM))
+
+    assert metrics.timings.keys() >= {"check", "unify"}
+    assert metrics.counters["forms_checked"] == 11
+
+
+def test_failed_phase_is_timed():
+    with instrument() as metrics:
+        with pytest.raises(UnificationError):
+            list(TypeChecker.check_program(parse("(car 1)")))
+
+    assert metrics.timings.keys() >= {"check", "unify"}
+    assert metrics.counters["unify_calls"] == 1
+
+
+def test_not_instrumenting():
+    assert instrumentation.current_metrics() is None
+
+    checker = TypeChecker(parse(PROGRAM))
+    assert not isinstance(checker._unifier, InstrumentedUnifier)  # type: ignore
+
+    with instrumentation.phase("check"):
+        pass
+
+
+def test_nested_instrumentation_is_separate():
+    with instrument() as outer:
+        parse("1")
+
+        with instrument() as inner:
+            assert instrumentation.current_metrics() is inner
+            list(TypeChecker.check_program(parse("1")))
+
+        assert instrumentation.current_metrics() is outer
+
+    assert "check" not in outer.timings and "check" in inner.timings
+
+
+def test_other_threads_are_not_instrumented():
+    with instrument() as metrics:
+        thread = threading.Thread(target=lambda: parse(PROGRAM))
+        thread.start()
+        thread.join()
+
+    assert metrics.timings == {}
+
+
+def test_union_find_chain_length():
+    metrics = Metrics()
+    unifier = InstrumentedUnifier(metrics)
+    a, b, c, d = (UnknownType() for _ in range(4))
+
+    unifier.unify(a, b)
+    unifier.unify(c, d)
+    unifier.unify(b, d)
+    assert metrics.counters["max_union_find_chain"] == 0
+
+    unifier.get_set_representative(a)
+    assert metrics.counters["max_union_find_chain"] == 2
+    assert metrics.counters["unify_calls"] == 3
+
+    unifier.get_set_representative(a)  # The path was compressed.
+    assert metrics.counters["max_union_find_chain"] == 2
+
+
+def test_merge_and_export():
+    metrics = Metrics({"check": 1.0}, {"unify_calls": 2, "max_union_find_chain": 3})
+    metrics.merge(
+        Metrics({"check": 0.5, "unify": 0.25}, {"unify_calls": 1, "max_union_find_chain": 2})
+    )
+
+    assert metrics.timings == {"check": 1.5, "unify": 0.25}
+    assert metrics.counters == {"unify_calls": 3, "max_union_find_chain": 3}
+    assert json.loads(metrics.to_json()) == metrics.as_dict()
+    assert Metrics.from_dict(json.loads(metrics.to_json())) == metrics
@@ -1,4 +1,7 @@
 # pyright: reportUnusedClass=false
+import copy
+import pickle
+from collections.abc import Callable
 from dataclasses import dataclass
 from unittest.mock import MagicMock
 
@@ -94,3 +97,75 @@ def test_special_form_dc_with_slots_duplicate_id_raises_value_error():
             @classmethod
             def from_sexp(cls, sexp):  # pyright: ignore
                 pass  # pragma: no cover
+
+
+def test_unknown_types_are_distinct():
+    unknowns = [nodes.UnknownType() for _ in range(100)]
+
+    assert len(set(unknowns)) == len(unknowns)
+    assert len({hash(unknown) for unknown in unknowns}) == len(unknowns)
+    assert unknowns[0] != unknowns[1]
+    assert unknowns[0] == unknowns[0]
+
+
+CLOSED_TYPE_PARAMS: list[Callable[[], nodes.Type]] = [
+    lambda: nodes.IntType(),
+    lambda: nodes.BoolType(),
+    lambda: nodes.ListType(nodes.FloatType()),
+    lambda: nodes.ListType(nodes.ListType(nodes.IntType())),
+    lambda: nodes.FunctionType(
+        [nodes.IntType(), nodes.BoolType()], nodes.ListType(nodes.IntType())
+    ),
+    lambda: nodes.FunctionType((), nodes.FunctionType((nodes.IntType(),), nodes.IntType())),
+]
+
+
+@pytest.mark.parametrize("create", CLOSED_TYPE_PARAMS)
+def test_closed_types_are_interned(create: Callable[[], nodes.Type]):
+    type_ = create()
+
+    assert create() is type_
+    assert create() == type_ and hash(create()) == hash(type_)
+    assert pickle.loads(pickle.dumps(type_)) is type_
+    assert copy.deepcopy(type_) is type_
+
+
+def test_function_type_parameters_become_tuple():
+    type_ = nodes.FunctionType([nodes.IntType()], nodes.IntType())
+
+    assert type_.parameter_types == (nodes.IntType(),)
+    assert type_ is nodes.FunctionType((nodes.IntType(),), nodes.IntType())
+
+
+def test_open_types_are_equal_but_not_interned():
+    unknown = nodes.UnknownType()
+    type_ = nodes.FunctionType([nodes.ListType(unknown)], nodes.IntType())
+    other = nodes.FunctionType([nodes.ListType(unknown)], nodes.IntType())
+
+    assert type_ is not other
+    assert type_ == other and hash(type_) == hash(other)
+    assert type_ != nodes.FunctionType([nodes.ListType(nodes.UnknownType())], nodes.IntType())
+    assert nodes.ListType(unknown) != nodes.ListType(nodes.IntType())
+    assert nodes.ListType(nodes.IntType()) != nodes.ListType(unknown)
+
+
+def test_types_of_different_classes_are_not_equal():
+    assert nodes.IntType() != nodes.FloatType()
+    assert nodes.ListType(nodes.IntType()) != nodes.IntType()
+    assert nodes.ListType(nodes.UnknownType()) != 1
+
+
+@pytest.mark.parametrize("arguments", [(), (nodes.IntType(), nodes.IntType())])
+def test_type_wrong_argument_count_raises_type_error(arguments: tuple[nodes.Type, ...]):
+    with pytest.raises(TypeError, match="takes 1 arguments"):
+        nodes.ListType(*arguments)
+
+
+def test_unpickled_unknown_types_are_new():
+    unknown = nodes.UnknownType()
+    first, second, other = pickle.loads(pickle.dumps((unknown, unknown, nodes.UnknownType())))
+
+    assert first is second
+    assert first != unknown and first.id != unknown.id
+    assert other != first
+    assert pickle.loads(pickle.dumps(nodes.ListType(unknown))) != nodes.ListType(unknown)
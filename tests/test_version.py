@@ -0,0 +1,13 @@
+import pytest
+
+import lispyc
+
+
+def test_version():
+    assert isinstance(lispyc.__version__, str)
+    assert lispyc.__version__ == vars(lispyc)["__version__"]
+
+
+def test_unknown_attribute_raises_attribute_error():
+    with pytest.raises(AttributeError, match="no attribute 'version'"):
+        lispyc.version  # type: ignore
@@ -0,0 +1,97 @@
+import pytest
+
+from lispyc import exceptions
+from lispyc.codegen import runtime
+from lispyc.nodes import BoolType, FloatType, FunctionType, IntType, ListType, UnknownType
+from lispyc.parser import parse
+from lispyc.typechecker import FUNCTION_TYPES, SIGNATURES, TypeChecker, TypeTable
+
+VALID_CALLS = [
+    ("(sum 1 2 3)", IntType()),
+    ("(sum 1 2.5)", FloatType()),
+    ("(prod 2.0 3)", FloatType()),
+    ("(diff 1 2)", IntType()),
+    ("(neg 1.5)", FloatType()),
+    ("(sqrt 4)", IntType()),
+    ("(max 1 2 3.0)", FloatType()),
+    ("(lambda ((x int) (y float)) (div x y))", FunctionType((IntType(), FloatType()), FloatType())),
+    ("(greaterp 1 2.5)", BoolType()),
+    ("(lessp 1 2)", BoolType()),
+    ("(eq true false)", BoolType()),
+    ("(equal (list 1) nil)", BoolType()),
+    ("(null nil)", BoolType()),
+    ("(member 1.5 (list 2.5))", BoolType()),
+    ("(and true false true)", BoolType()),
+    ("(or true false)", BoolType()),
+    ("(append 1 (list 2))", ListType(IntType())),
+    ("(extend nil (list true))", ListType(BoolType())),
+    ("(copy (list 1.5))", ListType(FloatType())),
+    ("(reverse (list (list 1)))", ListType(ListType(IntType()))),
+    ("(length nil)", IntType()),
+    ("(efface 1 (list 1 2))", ListType(IntType())),
+    ("(mapcar (list 1 2) (lambda ((x int)) (float x)))", ListType(FloatType())),
+    ("(map (list 1 2) (lambda ((l (list int))) (car l)))", ListType(IntType())),
+    ("(mapcar (list 1 2) evenp)", ListType(BoolType())),
+    ("(not (evenp (logand 3 (shift 1 (lognot 2)))))", BoolType()),
+    ("(round (float (trunc 1.5)))", IntType()),
+    ("(let ((sum (lambda ((x bool)) x))) (sum true))", BoolType()),
+    ("(let ((f floor)) (f 2.5))", IntType()),
+]
+
+INVALID_CALLS = [
+    ("(sum 1 true)", exceptions.TypeError),
+    ("(inc nil)", exceptions.TypeError),
+    ("(lessp (list 1) 2)", exceptions.TypeError),
+    ("(let ((l nil)) (sum (car l) 1) (cons true l))", exceptions.TypeError),
+    ("(equal 1 2.0)", exceptions.UnificationError),
+    ("(null 1)", exceptions.UnificationError),
+    ("(member 1 (list true))", exceptions.UnificationError),
+    ("(and true 1)", exceptions.UnificationError),
+    ("(mapcar (list 1) (lambda ((x float)) x))", exceptions.UnificationError),
+    ("(evenp 1.5)", exceptions.UnificationError),
+    ("(float 1 2)", exceptions.UnificationError),
+    ("(sum 1)", exceptions.SpecialFormSyntaxError),
+    ("(neg 1 2)", exceptions.SpecialFormSyntaxError),
+    ("(null)", exceptions.SpecialFormSyntaxError),
+    ("(mapcar (list 1 2) inc)", exceptions.SpecialFormSyntaxError),
+    ("(let ((f sum)) f)", exceptions.SpecialFormSyntaxError),
+]
+
+
+@pytest.mark.parametrize(["program", "expected_type"], VALID_CALLS)
+def test_valid_call(program: str, expected_type: FunctionType):
+    [result] = TypeChecker.check_program(parse(program))
+
+    assert result == expected_type
+
+
+@pytest.mark.parametrize(["program", "error"], INVALID_CALLS)
+def test_invalid_call(program: str, error: type[exceptions.LispyError]):
+    with pytest.raises(error):
+        TypeChecker.check_program(parse(program))
+
+
+def test_print_arguments_may_differ():
+    [result] = TypeChecker.check_program(parse("(println 1 true (list 1.5))"))
+
+    assert isinstance(result, ListType) and isinstance(result.element_type, UnknownType)
+
+
+def test_arithmetic_with_unknown_arguments():
+    [result] = TypeChecker.check_program(
+        parse("(let ((l nil)) (let ((n (sum (car l) 1))) (cons 1.5 l) n))")
+    )
+
+    assert result == FloatType()
+
+
+def test_callee_type_is_recorded():
+    program = parse("(sum 1 2.5)")
+    table: TypeTable = TypeChecker.infer_types(program)
+
+    assert table[program.body[0].name] == FunctionType((IntType(), FloatType()), FloatType())
+
+
+def test_every_built_in_function_has_a_type():
+    assert SIGNATURES.keys() | FUNCTION_TYPES.keys() == runtime.BUILTINS.keys()
+    assert SIGNATURES.keys().isdisjoint(FUNCTION_TYPES)
@@ -1,7 +1,17 @@
 import pytest
 
 from lispyc import exceptions
-from lispyc.nodes import BoolType, FloatType, FunctionType, IntType, ListType, Type
+from lispyc.nodes import (
+    BoolType,
+    FloatType,
+    FunctionParameter,
+    FunctionType,
+    IntType,
+    ListType,
+    Program,
+    Type,
+    Variable,
+)
 from lispyc.parser import parse
 from lispyc.typechecker import TypeChecker
 
@@ -27,6 +37,12 @@ VALID_PROGNS = [
     ("(progn false (progn 1 2) 3.0)", IntType()),
 ]
 
+DEEPLY_NESTED = [
+    ("(cons 1 " * 100_000 + "nil" + ")" * 100_000, ListType(IntType())),
+    ("(progn 1 " * 100_000 + "1.0" + ")" * 100_000, FloatType()),
+    ("(let ((x " * 50_000 + "true" + ")) x)" * 50_000, BoolType()),
+]
+
 INVALID_PROGNS = [
     "(progn (list 1) (list 1 2.0 3))",
     "(progn 1 2 3.0 (car 7) 4.0 false)",
@@ -56,3 +72,18 @@ def test_invalid_form_in_progn_type_error(program: str):
 
     with pytest.raises(exceptions.TypeError):
         TypeChecker.check_program(program_node)
+
+
+@pytest.mark.parametrize(["program", "type_"], DEEPLY_NESTED)
+def test_deeply_nested_form_typechecks(program: str, type_: Type):
+    program_node = parse(program)
+    result = list(TypeChecker.check_program(program_node))
+
+    assert result == [type_]
+
+
+def test_unknown_form_type_error():
+    program_node = Program((FunctionParameter(Variable("x"), IntType()),))  # type: ignore
+
+    with pytest.raises(TypeError, match="Unknown form"):
+        TypeChecker.check_program(program_node)
@@ -0,0 +1,77 @@
+import pickle
+
+import pytest
+
+from lispyc import exceptions
+from lispyc.nodes import BoolType, FloatType, FunctionType, IntType, ListType, UnknownType
+from lispyc.parser import parse
+from lispyc.typechecker import TypeChecker
+
+PROGRAM = (
+    "1 (lambda ((x int)) (list x)) (let ((l nil)) (set l (cons 2.0 l))) "
+    "(cond ((car (list true)) false) true) (select 1 (2 3) 4)"
+)
+
+INVALID_PROGRAMS = [
+    ("1 (let ((x 1) (x 2)) x) y", exceptions.DuplicateNameError),
+    ("(list 1 2.0) (let ((x 1) (x 2)) x)", exceptions.TypeError),
+    ("true false (cond (1 2) 3) (car 2.0)", exceptions.UnificationError),
+]
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_types_match_sequential_check(workers: int):
+    ast = parse(" ".join([PROGRAM] * 10))
+    types = list(TypeChecker.check_program(ast, workers=workers))
+
+    assert types == list(TypeChecker.check_program(ast))
+    assert types[:5] == [
+        IntType(),
+        FunctionType((IntType(),), ListType(IntType())),
+        ListType(FloatType()),
+        BoolType(),
+        IntType(),
+    ]
+
+
+def test_unknown_types_are_distinct():
+    nil_1, nil_2 = TypeChecker.check_program(parse("nil nil"), workers=2)
+
+    assert isinstance(nil_1, ListType) and isinstance(nil_1.element_type, UnknownType)
+    assert isinstance(nil_2, ListType) and isinstance(nil_2.element_type, UnknownType)
+    assert nil_1.element_type != nil_2.element_type
+
+
+@pytest.mark.parametrize("workers", [0, -1])
+def test_invalid_workers_value_error(workers: int):
+    with pytest.raises(ValueError, match="at least 1"):
+        TypeChecker.check_program(parse(PROGRAM), workers=workers)
+
+
+@pytest.mark.parametrize(["program", "error"], INVALID_PROGRAMS)
+def test_first_error_is_raised(program: str, error: type[exceptions.LispyError]):
+    ast = parse(program)
+
+    with pytest.raises(error) as sequential:
+        list(TypeChecker.check_program(ast))
+
+    with pytest.raises(error) as parallel:
+        TypeChecker.check_program(ast, workers=2)
+
+    assert parallel.value.message == sequential.value.message
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        exceptions.TypeError("message"),
+        exceptions.DuplicateNameError("message", "x"),
+        exceptions.UnboundNameError("message", "y"),
+    ],
+)
+def test_errors_can_be_pickled(error: exceptions.LispyError):
+    unpickled = pickle.loads(pickle.dumps(error))
+
+    assert type(unpickled) is type(error)
+    assert unpickled.message == error.message and unpickled.args == error.args
+    assert getattr(unpickled, "name", None) == getattr(error, "name", None)
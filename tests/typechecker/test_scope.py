@@ -0,0 +1,45 @@
+from lispyc.nodes import BoolType, FloatType, IntType
+from lispyc.typechecker import Scope
+
+
+def test_nested_scope_sees_outer_bindings():
+    outer = Scope({"a": IntType(), "b": FloatType()})
+    inner = outer.nest({"c": BoolType()})
+
+    assert inner.get("a") == IntType()
+    assert inner.get("b") == FloatType()
+    assert inner.get("c") == BoolType()
+    assert "a" in inner
+    assert "d" not in inner
+    assert inner.get("d") is None
+
+
+def test_nested_scope_shadows_outer_bindings():
+    outer = Scope({"a": IntType()})
+    inner = outer.nest({"a": FloatType()})
+
+    assert inner.get("a") == FloatType()
+    assert outer.get("a") == IntType()
+
+
+def test_outer_scope_unaffected_by_nested_scope():
+    outer = Scope({"a": IntType()})
+    inner = outer.nest({"b": FloatType()})
+    sibling = outer.nest({"c": BoolType()})
+
+    assert inner.get("a") == IntType()
+    assert "b" not in outer
+    assert "b" not in sibling
+    assert "c" not in inner
+
+
+def test_memoised_lookup_respects_shadowing():
+    outer = Scope({"a": IntType()})
+    middle = outer.nest({"b": BoolType()})
+
+    assert middle.get("a") == IntType()
+
+    inner = middle.nest({"a": FloatType()})
+
+    assert inner.get("a") == FloatType()
+    assert middle.get("a") == IntType()
@@ -0,0 +1,71 @@
+import pytest
+
+from lispyc import nodes
+from lispyc.nodes import BoolType, FloatType, FunctionType, IntType, ListType, Variable
+from lispyc.parser import parse
+from lispyc.typechecker import TypeChecker
+
+PROGRAMS = [
+    "1 2.0 true",
+    "(let ((l nil) (x 1)) (set l (cons x nil)) (car l))",
+    "(lambda ((f (func (int) float)) (x int)) (cond ((car (list true)) (f x)) 1.0))",
+    "(select (list 1) ((list 2) nil) (cdr (list (list 3.0) nil)))",
+    "(progn (list 1 2) (lambda () (list 1.0)))",
+]
+
+
+@pytest.mark.parametrize("program", PROGRAMS)
+def test_top_level_types_match_check_program(program: str):
+    ast = parse(program)
+    table = TypeChecker.infer_types(ast)
+
+    assert [table[form] for form in ast.body] == list(TypeChecker.check_program(ast))
+    assert table.program is ast
+
+
+def test_nested_types_are_resolved():
+    ast = parse("(let ((l nil) (x 1)) (set l (cons x nil)) (car l))")
+    table = TypeChecker.infer_types(ast)
+
+    let = ast.body[0]
+    assert isinstance(let, nodes.Let)
+    set_, car = let.body
+    assert isinstance(set_, nodes.Set) and isinstance(set_.value, nodes.Cons)
+
+    assert table[let] == table[car] == table[let.bindings[1].value] == IntType()
+    assert table[let.bindings[0].value] == ListType(IntType())  # nil, unified by the set.
+    assert table[set_] == table[set_.value] == table[set_.value.cdr] == ListType(IntType())
+    assert table[set_.value.car] == IntType()
+    assert len(table) == 9
+
+
+def test_equal_forms_have_separate_types():
+    ast = parse("(lambda ((x int)) x) (lambda ((x float)) x) (list nil) (list 1) (list (list 1.0))")
+    table = TypeChecker.infer_types(ast)
+    first, second, *lists = ast.body
+    assert isinstance(first, nodes.Lambda) and isinstance(second, nodes.Lambda)
+
+    assert first.body == second.body
+    assert table[first.body] == IntType()
+    assert table[second.body] == FloatType()
+    assert table[first] == FunctionType((IntType(),), IntType())
+    assert [table[list_] for list_ in lists][1:] == [
+        ListType(IntType()),
+        ListType(ListType(FloatType())),
+    ]
+
+
+def test_forms_not_in_program():
+    ast = parse("(lambda ((b bool)) b)")
+    table = TypeChecker.infer_types(ast)
+    lambda_ = ast.body[0]
+    assert isinstance(lambda_, nodes.Lambda)
+
+    assert lambda_.body in table
+    assert table.get(lambda_.body) == BoolType()
+    assert Variable("b") not in table
+    assert table.get(Variable("b")) is None
+    assert table.get(lambda_.parameters[0].name, IntType()) == IntType()
+
+    with pytest.raises(KeyError):
+        table[Variable("b")]
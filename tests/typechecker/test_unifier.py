@@ -249,3 +249,95 @@ def test_cyclic_function_return_fails(unifier: Unifier):
 
     with pytest.raises(CyclicTypeError):
         unifier.unify(unknown, func)
+
+
+def test_union_by_rank_keeps_higher_rank_representative(unifier: Unifier):
+    high = [UnknownType() for _ in range(4)]
+    low = UnknownType()
+
+    unifier.unify(high[0], high[1])
+    unifier.unify(high[2], high[3])
+    unifier.unify(high[0], high[2])
+    representative = unifier.get_set_representative(high[0])
+
+    unifier.unify(low, high[3])
+    assert unifier.get_set_representative(low) is representative
+
+    unifier.unify(high[1], UnknownType())
+    assert unifier.get_set_representative(high[1]) is representative
+
+
+def test_path_compression(unifier: Unifier):
+    unknowns = [UnknownType() for _ in range(10)]
+    for unknown in unknowns[1:]:
+        unifier.unify(unknowns[0], unknown)
+
+    unifier.unify(unknowns[-1], IntType())
+
+    for unknown in unknowns:
+        assert unifier.get_set_representative(unknown) == IntType()
+        assert unifier._map[unknown] == IntType()  # pyright: ignore[reportPrivateUsage]
+
+
+def test_deeply_nested_types_unify(unifier: Unifier):
+    depth = 100_000
+    unknown = UnknownType()
+    left: Type = unknown
+    right: Type = IntType()
+    for _ in range(depth):
+        left = ListType(left)
+        right = ListType(right)
+
+    unifier.unify(left, right)
+    result = unifier.get_transitive_set_representative(left)
+
+    for _ in range(depth):
+        assert isinstance(result, ListType)
+        result = result.element_type
+
+    assert result == IntType()
+    assert unifier.get_set_representative(unknown) == IntType()
+
+
+def test_shared_nested_types_resolve_once(unifier: Unifier):
+    # Resolving each nested type separately would visit 3 ** 100 types.
+    unknown = UnknownType()
+    type_: Type = unknown
+    for _ in range(100):
+        type_ = FunctionType((type_, type_), type_)
+
+    unifier.unify(unknown, IntType())
+    result = unifier.get_transitive_set_representative(type_)
+
+    for _ in range(100):
+        assert isinstance(result, FunctionType)
+        assert result.parameter_types[0] is result.parameter_types[1] is result.return_type
+        result = result.return_type
+
+    assert result is IntType()
+
+
+def test_resolved_types_are_reused(unifier: Unifier):
+    unknown = UnknownType()
+    closed = FunctionType((IntType(),), ListType(BoolType()))
+    open_ = FunctionType((ListType(unknown), closed), ListType(ListType(unknown)))
+
+    assert unifier.get_transitive_set_representative(closed) is closed
+    assert unifier.get_transitive_set_representative(open_) is open_
+    assert unifier.get_transitive_set_representative(open_) is open_
+
+
+def test_resolution_reflects_later_unification(unifier: Unifier):
+    unknowns = [UnknownType() for _ in range(3)]
+    type_ = FunctionType((ListType(unknowns[0]),), unknowns[1])
+
+    assert unifier.get_transitive_set_representative(type_) is type_
+
+    unifier.unify(unknowns[0], unknowns[2])
+    assert unifier.get_transitive_set_representative(unknowns[0]) is unknowns[2]
+
+    unifier.unify(unknowns[2], FloatType())
+    unifier.unify(unknowns[1], BoolType())
+    resolved = unifier.get_transitive_set_representative(type_)
+
+    assert resolved is FunctionType((ListType(FloatType()),), BoolType())